@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark SyncEngine (thread pool) against AsyncSyncEngine (asyncio).
+
+Both engines run a first sync of N new reminders against the in-process
+fake Calendar service from tests/fakes.py, which sleeps for a fixed latency
+per request, while the fake reader takes a small delay per reminder to
+stand in for EventKit conversion. Reports wall time and requests/s per
+engine for each concurrency level (`sync.max_workers`).
+
+Usage:
+    python benchmarks/bench_async_engine.py [--count 500] [--latency 0.02]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tests'))
+
+from async_engine import AsyncSyncEngine
+from fakes import FakeCalendarService, FakeRemindersReader, make_reminder
+from gcal_writer import GoogleCalendarWriter
+from sync_engine import MemoryMappingStore, SyncEngine
+
+ENGINES = {'thread': SyncEngine, 'async': AsyncSyncEngine}
+
+
+def run(engine_class, reminders, concurrency: int, latency: float, fetch_delay: float):
+    """Run one sync and return (seconds, requests served)."""
+    service = FakeCalendarService(latency=latency)
+    writer = GoogleCalendarWriter(service, service_factory=lambda: service)
+    engine = engine_class(
+        FakeRemindersReader(reminders, delay=fetch_delay),
+        writer,
+        MemoryMappingStore(),
+        {'sync': {'max_workers': concurrency}},
+    )
+    start = time.perf_counter()
+    stats = engine.sync()
+    elapsed = time.perf_counter() - start
+    assert stats.errors == 0 and stats.created == len(reminders)
+    return elapsed, service.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=500, help='Reminders to create (default: 500)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds per API request (default: 0.02)')
+    parser.add_argument('--fetch-delay', type=float, default=0.0002,
+                        help='Seconds to read each reminder (default: 0.0002)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64],
+                        help='Concurrency levels (default: 1 8 32 64)')
+    args = parser.parse_args()
+
+    reminders = [make_reminder(f"uuid-{i}") for i in range(args.count)]
+    print(f"{args.count} creates, {args.latency * 1000:.0f} ms per request")
+    print(f"{'workers':>8}" + ''.join(f"{name + ' s':>10}{name + ' req/s':>14}" for name in ENGINES))
+    for concurrency in args.concurrency:
+        row = f"{concurrency:>8}"
+        for engine_class in ENGINES.values():
+            elapsed, requests = run(engine_class, reminders, concurrency, args.latency, args.fetch_delay)
+            row += f"{elapsed:>10.2f}{requests / elapsed:>14.0f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
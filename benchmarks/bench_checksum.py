@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark change-detection checksum throughput.
+
+Compares the legacy MD5 hex checksum (CHECKSUM_VERSION_MD5) with the
+current BLAKE2b digest over synthetic reminders.
+
+Usage:
+    python benchmarks/bench_checksum.py [--count 100000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sync_engine import SyncEngine
+
+
+def make_reminders(count: int):
+    """Build synthetic reminders with a realistic mix of fields."""
+    base = datetime(2025, 1, 1, 9, 0)
+    return [
+        SimpleNamespace(
+            uuid=f"uuid-{i}",
+            title=f"Reminder number {i}",
+            notes="Pick up the dry cleaning before the shop closes" if i % 4 == 0 else "",
+            due_date=base + timedelta(hours=i) if i % 5 else None,
+            priority=i % 10,
+            completed=i % 7 == 0,
+            location="Office" if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100000, help='Synthetic reminders (default: 100000)')
+    args = parser.parse_args()
+
+    reminders = make_reminders(args.count)
+    engine = SyncEngine(None, None, None, {})
+
+    print(f"Checksumming {args.count} reminders")
+    print(f"{'algorithm':<12} {'seconds':>9} {'reminders/s':>14} {'bytes/row':>10}")
+    for name, checksum in (
+        ('md5 hex', engine._generate_legacy_checksum),
+        ('blake2b', engine._generate_checksum),
+    ):
+        start = time.perf_counter()
+        digests = [checksum(reminder) for reminder in reminders]
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {elapsed:>9.3f} {args.count / elapsed:>14,.0f} {len(digests[0]):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the mapping-store backends against each other.
+
+Runs the same workload on every backend selectable via `database.backend`:
+  write    buffered save_mapping() of N new mappings
+  update   buffered rewrite of every mapping (a full re-sync)
+  reopen   close and open the store again (journal replay for 'journal')
+  index    load_index() of all mappings
+  lookup   N single get_mapping() calls
+
+Usage:
+    python benchmarks/bench_mapping_store.py [--count 10000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from mapping_store import open_mapping_store
+
+BACKENDS = ('sqlite', 'journal', 'memory')
+PHASES = ('write', 'update', 'reopen', 'index', 'lookup')
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_backend(backend: str, data_dir: Path, count: int) -> dict:
+    """Run every phase on one backend and return seconds per phase."""
+    config = {'backend': backend}
+    modified = datetime(2025, 1, 1, 9, 0)
+    uuids = [f"uuid-{i}" for i in range(count)]
+    results = {}
+
+    store = open_mapping_store(config, base_dir=data_dir)
+
+    def write(prefix):
+        with store.buffered_writes():
+            for i, uuid in enumerate(uuids):
+                store.save_mapping(uuid, f"{prefix}-{i}", modified, i.to_bytes(8, 'big'))
+
+    results['write'] = timed(lambda: write('event'))
+    results['update'] = timed(lambda: write('moved'))
+
+    def reopen():
+        nonlocal store
+        store.close()
+        if backend != 'memory':
+            store = open_mapping_store(config, base_dir=data_dir)
+
+    results['reopen'] = timed(reopen)
+    results['index'] = timed(store.load_index)
+    results['lookup'] = timed(lambda: [store.get_mapping(uuid) for uuid in uuids])
+    store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help='Mappings per phase (default: 10000)')
+    args = parser.parse_args()
+
+    print(f"{args.count} mappings, seconds per phase")
+    print(f"{'backend':<9}" + ''.join(f"{phase:>10}" for phase in PHASES))
+    for backend in BACKENDS:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = bench_backend(backend, Path(temp_dir), args.count)
+        print(f"{backend:<9}" + ''.join(f"{results[phase]:>10.3f}" for phase in PHASES))
+
+
+if __name__ == '__main__':
+    main()
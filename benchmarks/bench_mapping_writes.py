@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark mapping write throughput.
+
+Compares three ways of writing N reminder mappings:
+  connect-per-call  sqlite3.connect() + INSERT OR REPLACE + commit per write
+                    (how MappingDatabase worked originally)
+  per-call commit   one WAL connection, one transaction per write
+  buffered          MappingDatabase.buffered_writes(), executemany upserts
+
+Usage:
+    python benchmarks/bench_mapping_writes.py [--count 10000]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sync_engine import MappingDatabase
+
+
+def bench_connect_per_call(db_path: Path, count: int) -> float:
+    """Original implementation: a fresh connection and commit per write."""
+    MappingDatabase(str(db_path), {'journal_mode': 'DELETE', 'synchronous': 'FULL'}).close()
+
+    start = time.perf_counter()
+    for i in range(count):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO mappings (reminder_uuid, event_id, last_synced, last_modified, checksum)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (f"uuid-{i}", f"event-{i}", datetime.now(), None, f"{i:032x}"))
+            conn.commit()
+    return time.perf_counter() - start
+
+
+def bench_per_call_commit(db_path: Path, count: int) -> float:
+    """Persistent WAL connection, unbuffered: one transaction per write."""
+    with MappingDatabase(str(db_path)) as db:
+        start = time.perf_counter()
+        for i in range(count):
+            db.save_mapping(f"uuid-{i}", f"event-{i}", None, f"{i:032x}")
+        return time.perf_counter() - start
+
+
+def bench_buffered(db_path: Path, count: int) -> float:
+    """Persistent WAL connection with the write-behind buffer."""
+    with MappingDatabase(str(db_path)) as db:
+        start = time.perf_counter()
+        with db.buffered_writes():
+            for i in range(count):
+                db.save_mapping(f"uuid-{i}", f"event-{i}", None, f"{i:032x}")
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help='Mappings to write (default: 10000)')
+    args = parser.parse_args()
+
+    benchmarks = [
+        ('connect-per-call', bench_connect_per_call),
+        ('per-call commit', bench_per_call_commit),
+        ('buffered', bench_buffered),
+    ]
+
+    print(f"Writing {args.count} mappings")
+    print(f"{'mode':<18} {'seconds':>9} {'writes/s':>12}")
+    for name, bench in benchmarks:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            elapsed = bench(Path(temp_dir) / 'bench.db', args.count)
+        print(f"{name:<18} {elapsed:>9.3f} {args.count / elapsed:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
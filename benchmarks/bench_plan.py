@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark SyncEngine.plan() on a large synthetic reminder set.
+
+Builds a mapping index in which most reminders are unchanged, some have
+changed, some are new and some mapped reminders have disappeared, then
+times plan() against it, both incrementally (mappings trusted by
+modification date) and as a full verify. No database or API is involved.
+
+Usage:
+    python benchmarks/bench_plan.py [--count 50000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sync_engine import MappingRecord, SyncEngine
+
+
+def make_reminders(count: int):
+    """Build synthetic reminders with a realistic mix of fields."""
+    base = datetime(2025, 1, 1, 9, 0)
+    return [
+        SimpleNamespace(
+            uuid=f"uuid-{i}",
+            title=f"Reminder number {i}",
+            notes="Pick up the dry cleaning before the shop closes" if i % 4 == 0 else "",
+            due_date=base + timedelta(hours=i) if i % 5 else None,
+            priority=i % 10,
+            completed=i % 50 == 0,
+            completion_date=datetime.now() if i % 50 == 0 else None,
+            location="Office" if i % 3 == 0 else None,
+            calendar_title="Reminders",
+            modification_date=base,
+        )
+        for i in range(count)
+    ]
+
+
+def make_index(engine: SyncEngine, reminders: list) -> dict:
+    """Map 95% of reminders (5% of those changed) plus 1% vanished ones."""
+    index = {}
+    for i, reminder in enumerate(reminders):
+        if i % 20 == 0:
+            continue
+        if i % 19:
+            checksum, modified = engine._generate_checksum(reminder), reminder.modification_date
+        else:
+            checksum, modified = b'changed!', reminder.modification_date - timedelta(days=1)
+        index[reminder.uuid] = MappingRecord(reminder.uuid, f"event-{i}", datetime.now(), modified, checksum)
+    for i in range(len(reminders) // 100):
+        index[f"gone-{i}"] = MappingRecord(f"gone-{i}", f"event-gone-{i}", datetime.now())
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=50000, help='Synthetic reminders (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs; best is reported (default: 5)')
+    args = parser.parse_args()
+
+    engine = SyncEngine(None, None, None, {})
+    reminders = make_reminders(args.count)
+    index = make_index(engine, reminders)
+
+    print(f"Planning {args.count} reminders against {len(index)} mappings")
+    for label, full_verify in (('incremental', False), ('full verify', True)):
+        engine._full_verify = full_verify
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            plan = engine.plan(reminders, index)
+            best = min(best, time.perf_counter() - start)
+        print(plan)
+        print(f"{label}: best of {args.repeat}: {best:.3f} s ({args.count / best:,.0f} reminders/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory of list-mode and streaming syncs on large libraries.
+
+Each (mode, size) pair runs in a fresh subprocess so ru_maxrss reports that
+run alone. A run is a first sync of N synthetic reminders (all creates)
+followed by a second, unchanged sync, against a SQLite mapping store in a
+temporary directory and a writer that answers immediately without keeping
+events, so the engine's own memory is what is measured. The synthetic
+reader builds reminders lazily, like RemindersReader.iter_reminders().
+
+Usage:
+    python benchmarks/bench_streaming.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sync_engine import MappingDatabase, SyncEngine
+
+
+class SyntheticReader:
+    """Reader that generates `count` reminders on demand."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def iter_reminders(self, calendar_names=None, timings=None):
+        base = datetime(2025, 1, 1, 9, 0)
+        for i in range(self.count):
+            yield SimpleNamespace(
+                uuid=f"uuid-{i:08d}",
+                title=f"Reminder number {i}",
+                notes="Pick up the dry cleaning before the shop closes" if i % 4 == 0 else "",
+                due_date=base + timedelta(hours=i) if i % 5 else None,
+                priority=i % 10,
+                completed=False,
+                completion_date=None,
+                location="Office" if i % 3 == 0 else None,
+                calendar_title=f"List {i % 8}",
+                modification_date=base,
+            )
+
+    def fetch_reminders(self, calendar_names=None, timings=None):
+        return list(self.iter_reminders(calendar_names, timings))
+
+
+class NullWriter:
+    """Calendar writer that succeeds immediately and stores nothing."""
+
+    def get_priority_color(self, priority, priority_colors):
+        return None
+
+    def create_event(self, **kwargs):
+        return {'id': f"evt-{kwargs['reminder_uuid']}"}
+
+    def patch_event(self, event_id, **kwargs):
+        return {'id': event_id}
+
+    def delete_event(self, event_id):
+        return True
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def child(count: int, streaming: bool, workers: int):
+    """Run both syncs in this process and print the result as JSON."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config = {'sync': {'streaming': streaming, 'max_workers': workers, 'full_verify_every': 0}}
+        timings = []
+        for _ in range(2):
+            engine = SyncEngine(
+                SyntheticReader(count), NullWriter(), MappingDatabase(str(Path(temp_dir) / 'bench.db')), config
+            )
+            start = time.perf_counter()
+            stats = engine.sync()
+            timings.append(time.perf_counter() - start)
+            engine.close()
+            assert stats.errors == 0 and stats.total_reminders == count
+        print(json.dumps({'rss': peak_rss_mb(), 'first': timings[0], 'second': timings[1]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Library sizes (default: 10000 100000 1000000)')
+    parser.add_argument('--workers', type=int, default=1, help='sync.max_workers (default: 1)')
+    parser.add_argument('--child', nargs=2, metavar=('COUNT', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(int(args.child[0]), args.child[1] == 'stream', args.workers)
+        return
+
+    baseline = subprocess.run(
+        [sys.executable, '-c', 'import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)'],
+        capture_output=True, text=True, check=True
+    )
+    print(f"Interpreter baseline: {int(baseline.stdout) / (1024 if sys.platform != 'darwin' else 1024 ** 2):.0f} MB")
+    print(f"{'reminders':>10}{'mode':>8}{'peak MB':>10}{'first s':>10}{'second s':>10}")
+    for count in args.sizes:
+        for mode in ('list', 'stream'):
+            result = subprocess.run(
+                [sys.executable, __file__, '--workers', str(args.workers), '--child', str(count), mode],
+                capture_output=True, text=True, check=True
+            )
+            row = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{count:>10}{mode:>8}{row['rss']:>10.0f}{row['first']:>10.1f}{row['second']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ Main entry point for Reminders to Google Calendar sync tool.
 
 import argparse
 import logging
+import signal
 import sys
 from pathlib import Path
 import yaml
@@ -12,10 +13,11 @@ import yaml
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from auth import get_authenticated_service
 from reminders_reader import RemindersReader
-from gcal_writer import GoogleCalendarWriter
-from sync_engine import SyncEngine, MappingDatabase
+from gcal_writer import build_writer
+from reconcile import reconcile, synced_calendars
+from sync_engine import SyncEngine, open_mapping_store, TIMING_KEYS
+from async_engine import AsyncSyncEngine
 
 
 def setup_logging(config: dict):
@@ -50,6 +52,9 @@ def load_config(config_path: str) -> dict:
         return yaml.safe_load(f)
 
 
+ENGINES = {'thread': SyncEngine, 'async': AsyncSyncEngine}
+
+
 def cmd_sync(args, config):
     """Execute sync command."""
     logger = logging.getLogger(__name__)
@@ -57,13 +62,17 @@ def cmd_sync(args, config):
     logger.info("Starting Reminders to Google Calendar Sync")
     logger.info("=" * 60)
 
+    # launchd stops jobs with SIGTERM: unwind like Ctrl-C so buffered
+    # mappings and the sync checkpoint are committed before exiting
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+    db = None
     try:
         # Initialize components
         logger.info("Initializing components...")
 
-        # Database
-        db_path = config.get('database', {}).get('path', 'data/mapping.db')
-        db = MappingDatabase(db_path)
+        # Mapping store (database.backend)
+        db = open_mapping_store(config.get('database', {}))
 
         # Reminders reader
         logger.info("Connecting to Apple Reminders...")
@@ -71,24 +80,23 @@ def cmd_sync(args, config):
 
         # Google Calendar
         logger.info("Authenticating with Google Calendar...")
-        credentials_file = config.get('auth', {}).get('credentials_file', 'credentials.json')
-        token_file = config.get('auth', {}).get('token_file', 'data/token.json')
-        calendar_id = config.get('google_calendar', {}).get('calendar_id', 'primary')
-
-        service = get_authenticated_service(credentials_file, token_file)
-        gcal_writer = GoogleCalendarWriter(service, calendar_id)
-
-        # Sync engine
-        logger.info("Starting sync engine...")
-        engine = SyncEngine(reminders_reader, gcal_writer, db, config)
-
-        # Check dry-run mode
-        dry_run = config.get('sync', {}).get('dry_run', False)
-        if dry_run:
-            logger.warning("DRY RUN MODE - No changes will be made to Google Calendar")
-
-        # Perform sync
-        stats = engine.sync()
+        gcal_writer = build_writer(config)
+
+        # Sync engine (--engine, else sync.engine)
+        engine_name = args.engine or config.get('sync', {}).get('engine', 'thread')
+        if args.stream:
+            config.setdefault('sync', {})['streaming'] = True
+        if args.deadline is not None:
+            config.setdefault('sync', {})['time_budget'] = args.deadline
+        logger.info(f"Starting sync engine ({engine_name})...")
+        with ENGINES[engine_name](reminders_reader, gcal_writer, db, config) as engine:
+            # Check dry-run mode
+            dry_run = config.get('sync', {}).get('dry_run', False)
+            if dry_run:
+                logger.warning("DRY RUN MODE - No changes will be made to Google Calendar")
+
+            # Perform sync
+            stats = engine.sync()
 
         # Print summary
         logger.info("=" * 60)
@@ -100,6 +108,8 @@ def cmd_sync(args, config):
         logger.info(f"Deleted: {stats.deleted}")
         logger.info(f"Skipped: {stats.skipped}")
         logger.info(f"Errors: {stats.errors}")
+        if stats.deferred:
+            logger.info(f"Deferred to next sync: {stats.deferred}")
         logger.info("=" * 60)
 
         return 0 if stats.errors == 0 else 1
@@ -113,6 +123,10 @@ def cmd_sync(args, config):
     except Exception as e:
         logger.error(f"Sync failed: {e}", exc_info=True)
         return 1
+    finally:
+        # Covers failures before the engine takes ownership of the database
+        if db is not None:
+            db.close()
 
 
 def cmd_list_calendars(args, config):
@@ -138,41 +152,79 @@ def cmd_list_calendars(args, config):
         return 1
 
 
-def cmd_status(args, config):
-    """Show sync status and statistics."""
-    logger = logging.getLogger(__name__)
+def percentile(values: list, pct: float):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
 
-    try:
-        db_path = config.get('database', {}).get('path', 'data/mapping.db')
-        db = MappingDatabase(db_path)
 
-        # Count mappings
-        import sqlite3
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
+def print_perf(timing_rows: list):
+    """Print per-phase timings of the last run and p50/p95 over all rows."""
+    print(f"\nPhase timings over the last {len(timing_rows)} timed run(s), ms:")
+    print("-" * 60)
+    if not timing_rows:
+        print("No timed runs recorded yet")
+        return
+
+    print(f"{'phase':<10} {'last':>10} {'p50':>10} {'p95':>10} {'share':>8}")
+    columns = list(zip(*timing_rows))[1:]
+    totals = [value or 0 for value in columns[-1]]
+    for key, values in zip(TIMING_KEYS, columns):
+        values = [value or 0 for value in values]
+        share = sum(values) / sum(totals) * 100 if sum(totals) else 0.0
+        print(
+            f"{key:<10} {values[0]:>10} {percentile(values, 50):>10} "
+            f"{percentile(values, 95):>10} {share:>7.1f}%"
+        )
 
-        cursor.execute('SELECT COUNT(*) FROM mappings')
-        mapping_count = cursor.fetchone()[0]
 
-        cursor.execute('SELECT sync_time, total_reminders, created, updated, deleted, errors FROM sync_history ORDER BY sync_time DESC LIMIT 5')
-        history = cursor.fetchall()
+def cmd_status(args, config):
+    """Show sync status and statistics."""
+    logger = logging.getLogger(__name__)
 
-        conn.close()
+    try:
+        with open_mapping_store(config.get('database', {})) as db:
+            mapping_count = db.count_mappings()
+            pending = db.load_pending_ops()
+            checkpoint = db.load_checkpoint()
+            history = db.get_recent_history(5)
+            daily = db.get_rollups('daily', 7)
+            timing_rows = db.get_recent_timings(args.perf) if args.perf else None
 
         # Print status
         print("\nSync Status")
         print("=" * 60)
         print(f"Total mapped reminders: {mapping_count}")
+        if pending:
+            next_due = min(op.next_attempt for op in pending.values())
+            print(f"Queued retries: {len(pending)} (next due {next_due:%Y-%m-%d %H:%M})")
+        if checkpoint:
+            run, processed = checkpoint
+            print(f"Interrupted sync {run.run_id} from {run.started:%Y-%m-%d %H:%M}: "
+                  f"{len(processed)} reminders done, resumes on next sync")
         print("\nRecent sync history:")
         print("-" * 60)
 
         if history:
             for row in history:
-                sync_time, total, created, updated, deleted, errors = row
-                print(f"{sync_time}: {total} total, {created} created, {updated} updated, {deleted} deleted, {errors} errors")
+                sync_time, total, created, updated, deleted, errors, shard = row
+                print(f"{sync_time}: {f'[{shard}] ' if shard else ''}{total} total, {created} created, "
+                      f"{updated} updated, {deleted} deleted, {errors} errors")
         else:
             print("No sync history available")
 
+        if daily:
+            print("\nDaily totals:")
+            print("-" * 60)
+            for row in daily:
+                day, runs, failed_runs, total, created, updated, deleted, errors = row
+                print(f"{day}: {runs} runs ({failed_runs} with errors), {created} created, "
+                      f"{updated} updated, {deleted} deleted, {errors} errors")
+
+        if timing_rows is not None:
+            print_perf(timing_rows)
+
         print("=" * 60)
 
         return 0
@@ -182,6 +234,65 @@ def cmd_status(args, config):
         return 1
 
 
+def cmd_db_maintain(args, config):
+    """Vacuum, analyze and integrity-check the mapping store."""
+    logger = logging.getLogger(__name__)
+
+    try:
+        with open_mapping_store(config.get('database', {})) as db:
+            report = db.maintain()
+
+        print("\nDatabase Maintenance")
+        print("=" * 60)
+        print(f"Backend: {report.backend}")
+        print(f"Steps: {', '.join(report.steps) or 'none'}")
+        print(f"{'':<12} {'before':>14} {'after':>14}")
+        print(f"{'size':<12} {report.size_before:>14,} {report.size_after:>14,}")
+        if report.pages_before is not None:
+            print(f"{'pages':<12} {report.pages_before:>14,} {report.pages_after:>14,}")
+            print(f"{'free pages':<12} {report.free_pages_before:>14,} {report.free_pages_after:>14,}")
+        print(f"Integrity: {'ok' if report.ok else '; '.join(report.integrity)}")
+        print("=" * 60)
+
+        return 0 if report.ok else 1
+
+    except Exception as e:
+        logger.error(f"Database maintenance failed: {e}")
+        return 1
+
+
+def cmd_reconcile(args, config):
+    """Verify the mapping store against the calendars, or rebuild it from them."""
+    logger = logging.getLogger(__name__)
+
+    try:
+        logger.info("Authenticating with Google Calendar...")
+        gcal_writer = build_writer(config)
+        with open_mapping_store(config.get('database', {})) as db:
+            report = reconcile(gcal_writer, db, synced_calendars(config), rebuild=args.rebuild)
+
+        print("\nReconcile" + (" (rebuild)" if args.rebuild else ""))
+        print("=" * 60)
+        print(f"Calendars scanned: {report.calendars} ({report.pages} list requests)")
+        print(f"Events: {report.events_scanned} ({report.tagged} synced from reminders)")
+        print(f"Matched: {report.matched}")
+        print(f"Orphaned events (no mapping): {len(report.orphaned)}")
+        print(f"Missing events (mapping only): {len(report.missing)}")
+        print(f"Repointed mappings: {len(report.repointed)}")
+        print(f"Duplicated reminders: {len(report.duplicates)}")
+        for uuid, event_ids in sorted(report.duplicates.items()):
+            print(f"  {uuid}: extra events {', '.join(event_ids)}")
+        if report.rebuilt and not report.ok:
+            print("Mappings rebuilt; the next sync rewrites the affected events")
+        print("=" * 60)
+
+        return 0 if report.ok or report.rebuilt else 1
+
+    except Exception as e:
+        logger.error(f"Reconcile failed: {e}", exc_info=True)
+        return 1
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -190,8 +301,15 @@ def main():
         epilog="""
 Examples:
   %(prog)s sync                  # Run sync operation
+  %(prog)s sync --engine async   # Overlap reading with Calendar requests
+  %(prog)s sync --stream         # Fetch, diff and apply in bounded batches
+  %(prog)s sync --deadline 20    # Stop after ~20s, most urgent reminders first
   %(prog)s list                  # List available reminder calendars
   %(prog)s status                # Show sync status
+  %(prog)s status --perf 50      # Add phase timings over the last 50 runs
+  %(prog)s db-maintain           # Vacuum, analyze and check the database
+  %(prog)s reconcile             # Check the database against the calendars
+  %(prog)s reconcile --rebuild   # Rebuild the database from the calendars
   %(prog)s --config custom.yaml sync  # Use custom config file
         """
     )
@@ -205,13 +323,50 @@ Examples:
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
 
     # Sync command
-    subparsers.add_parser('sync', help='Sync reminders to Google Calendar')
+    sync_parser = subparsers.add_parser('sync', help='Sync reminders to Google Calendar')
+    sync_parser.add_argument(
+        '--engine',
+        choices=sorted(ENGINES),
+        help='Sync engine: thread pool or asyncio (default: sync.engine, else thread)'
+    )
+    sync_parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream reminders through diff and apply in batches (thread engine; default: sync.streaming)'
+    )
+    sync_parser.add_argument(
+        '--deadline',
+        type=float,
+        metavar='SECONDS',
+        help='Time budget: defer what is left after SECONDS, urgent reminders first (default: sync.time_budget)'
+    )
 
     # List command
     subparsers.add_parser('list', help='List available reminder calendars')
 
     # Status command
-    subparsers.add_parser('status', help='Show sync status and statistics')
+    status_parser = subparsers.add_parser('status', help='Show sync status and statistics')
+    status_parser.add_argument(
+        '--perf',
+        type=int,
+        nargs='?',
+        const=20,
+        metavar='N',
+        help='Show per-phase timings with p50/p95 over the last N runs (default: 20)'
+    )
+
+    # Database maintenance command
+    subparsers.add_parser('db-maintain', help='Vacuum, analyze and integrity-check the mapping database')
+
+    # Reconcile command
+    reconcile_parser = subparsers.add_parser(
+        'reconcile', help='Check the mapping database against the synced calendars'
+    )
+    reconcile_parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Rewrite mappings to match the events found (duplicates are only reported)'
+    )
 
     args = parser.parse_args()
 
@@ -228,6 +383,10 @@ Examples:
         return cmd_list_calendars(args, config)
     elif args.command == 'status':
         return cmd_status(args, config)
+    elif args.command == 'db-maintain':
+        return cmd_db_maintain(args, config)
+    elif args.command == 'reconcile':
+        return cmd_reconcile(args, config)
     else:
         parser.print_help()
         return 0
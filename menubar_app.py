@@ -28,10 +28,9 @@ else:
 
 sys.path.insert(0, str(BUNDLE_DIR / 'src'))
 
-from auth import get_authenticated_service
+from gcal_writer import build_writer
 from reminders_reader import RemindersReader
-from gcal_writer import GoogleCalendarWriter
-from sync_engine import SyncEngine, MappingDatabase
+from sync_engine import SyncEngine, open_mapping_store
 import yaml
 
 # Setup logging
@@ -53,6 +52,10 @@ class RemindersToGCalApp(rumps.App):
         self.config_path = APP_DIR / 'config.yaml'
         self.prefs_path = Path.home() / '.reminders-to-gcal-prefs.json'
         self.syncing = False
+        # Running sync thread and its engine; quit_app() stops and joins them
+        self.sync_thread = None
+        self.sync_engine = None
+        self.quitting = False
         self.last_sync_time = None
         self.last_sync_stats = None
         self.auto_sync_timer = None
@@ -106,9 +109,9 @@ class RemindersToGCalApp(rumps.App):
             return
 
         # Run sync in background thread
-        thread = threading.Thread(target=self._run_sync)
-        thread.daemon = True
-        thread.start()
+        self.sync_thread = threading.Thread(target=self._run_sync)
+        self.sync_thread.daemon = True
+        self.sync_thread.start()
 
     def _run_sync(self):
         """Run sync operation in background."""
@@ -127,21 +130,17 @@ class RemindersToGCalApp(rumps.App):
                 raise ValueError(f"Invalid YAML in config file: {e}") from e
 
             # Initialize components
-            db_path = APP_DIR / config.get('database', {}).get('path', 'data/mapping.db')
-            db = MappingDatabase(str(db_path))
-
             reminders_reader = RemindersReader()
+            gcal_writer = build_writer(config, base_dir=APP_DIR)
 
-            credentials_file = APP_DIR / config.get('auth', {}).get('credentials_file', 'credentials.json')
-            token_file = APP_DIR / config.get('auth', {}).get('token_file', 'data/token.json')
-            calendar_id = config.get('google_calendar', {}).get('calendar_id', 'primary')
-
-            service = get_authenticated_service(str(credentials_file), str(token_file))
-            gcal_writer = GoogleCalendarWriter(service, calendar_id)
+            db = open_mapping_store(config.get('database', {}), base_dir=APP_DIR)
 
-            # Sync
-            engine = SyncEngine(reminders_reader, gcal_writer, db, config)
-            stats = engine.sync()
+            # Sync (closing the engine releases the mapping store)
+            with SyncEngine(reminders_reader, gcal_writer, db, config) as engine:
+                self.sync_engine = engine
+                if self.quitting:
+                    engine.stop()
+                stats = engine.sync()
 
             # Update status
             self.last_sync_time = datetime.now()
@@ -171,6 +170,7 @@ class RemindersToGCalApp(rumps.App):
             logger.error(f"Sync error: {e}", exc_info=True)
             self.handle_sync_error(str(e))
         finally:
+            self.sync_engine = None
             self.syncing = False
             self.title = "R→GCal"
             logger.info("Sync operation finished")
@@ -399,9 +399,17 @@ class RemindersToGCalApp(rumps.App):
             subprocess.run(['open', 'https://github.com/yourusername/reminders-to-gcal/issues'])
 
     def quit_app(self, _):
-        """Quit the application."""
+        """Quit the application, first stopping a running sync."""
         if self.auto_sync_timer:
             self.auto_sync_timer.stop()
+        # The sync thread is a daemon; wait for it so the mapping store
+        # flushes the mappings of events it already created
+        self.quitting = True
+        if self.sync_thread and self.sync_thread.is_alive():
+            logger.info("Stopping the running sync before quitting")
+            if self.sync_engine:
+                self.sync_engine.stop()
+            self.sync_thread.join()
         rumps.quit_application()
 
 
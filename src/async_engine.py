@@ -0,0 +1,254 @@
+"""
+asyncio variant of the sync engine.
+
+The Google API client is synchronous, so AsyncCalendarWriter runs writer
+calls on a dedicated thread pool and exposes them as coroutines.
+AsyncSyncEngine bounds in-flight requests with a semaphore and starts API
+work while EventKit is still returning reminders.
+"""
+
+import asyncio
+import functools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from sync_engine import OperationKind, PhaseTimer, SyncEngine, SyncOperation, SyncPlan, SyncStats
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the reminder stream
+_END = object()
+
+
+class AsyncCalendarWriter:
+    """Coroutine interface over a GoogleCalendarWriter."""
+
+    def __init__(self, writer, max_workers: int = 8):
+        """
+        Initialize async writer.
+
+        Args:
+            writer: GoogleCalendarWriter (or compatible) doing the requests;
+                give it a service_factory so each thread has its own service
+            max_workers: Threads available for concurrent requests
+        """
+        self.writer = writer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='async-writer')
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def create_event(self, **kwargs) -> Optional[Dict]:
+        """Coroutine form of GoogleCalendarWriter.create_event()."""
+        return await self._run(self.writer.create_event, **kwargs)
+
+    async def update_event(self, **kwargs) -> Optional[Dict]:
+        """Coroutine form of GoogleCalendarWriter.update_event()."""
+        return await self._run(self.writer.update_event, **kwargs)
+
+    async def patch_event(self, event_id: str, **kwargs) -> Optional[Dict]:
+        """Coroutine form of GoogleCalendarWriter.patch_event()."""
+        return await self._run(self.writer.patch_event, event_id, **kwargs)
+
+    async def move_event(self, event_id: str, destination: str, **kwargs) -> Optional[Dict]:
+        """Coroutine form of GoogleCalendarWriter.move_event()."""
+        return await self._run(self.writer.move_event, event_id, destination, **kwargs)
+
+    async def delete_event(self, event_id: str, **kwargs) -> bool:
+        """Coroutine form of GoogleCalendarWriter.delete_event()."""
+        return await self._run(self.writer.delete_event, event_id, **kwargs)
+
+    def close(self):
+        """Wait for running requests and release the thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+class AsyncSyncEngine(SyncEngine):
+    """
+    SyncEngine that overlaps the Reminders fetch with Calendar requests.
+
+    Reminders are planned one by one as the reader yields them and their
+    requests start immediately, with at most `sync.max_workers` in flight.
+    Results are still recorded in plan order on the event loop thread, so
+    the mapping store ends up exactly as after a SyncEngine run.
+
+    Requires a reader with iter_reminders().
+    """
+
+    def sync(self) -> SyncStats:
+        """
+        Perform full sync operation on a fresh event loop.
+
+        Returns:
+            SyncStats object with operation statistics
+        """
+        if self._dry_run():
+            # Planning makes no requests, so there is nothing to overlap
+            return super().sync()
+        return asyncio.run(self.sync_async())
+
+    async def _stream_reminders(self, timings: Dict[str, float]):
+        """Yield reminders from the reader, which runs on a worker thread."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def produce():
+            try:
+                for reminder in self.reminders_reader.iter_reminders(self._calendar_names(), timings=timings):
+                    loop.call_soon_threadsafe(queue.put_nowait, reminder)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, _END)
+
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await producer
+
+    async def _request(self, op: SyncOperation, writer: AsyncCalendarWriter, semaphore: asyncio.Semaphore):
+        method, args, kwargs = self._api_request(op)
+        async with semaphore:
+            return await getattr(writer, method)(*args, **kwargs)
+
+    def _record_task(self, op: SyncOperation, task: Optional[asyncio.Task]):
+        """Record a finished (or request-free) operation."""
+        with self._timer.phase('cleanup' if op.reminder is None else 'diff'):
+            try:
+                self._record_result(op, task.result() if task is not None else None)
+            except Exception as e:
+                logger.error(f"Error applying {op.kind.value} for '{self._label(op)}': {e}")
+                self._record_failure(op, str(e))
+
+    def _record_ready(self, pending: deque):
+        """Record operations at the head of the queue whose requests are done."""
+        while pending and (pending[0][1] is None or pending[0][1].done()):
+            self._record_task(*pending.popleft())
+
+    async def _record_all(self, pending: deque):
+        """Wait for and record every queued operation, in order."""
+        while pending:
+            op, task = pending[0]
+            if task is not None:
+                await asyncio.wait({task})
+            pending.popleft()
+            self._record_task(op, task)
+
+    async def sync_async(self) -> SyncStats:
+        """
+        Perform full sync operation.
+
+        The 'fetch' phase covers the whole reminder stream, including the
+        requests that overlap it; 'apply' is the wait for the remainder.
+
+        Returns:
+            SyncStats object with operation statistics
+        """
+        max_in_flight = self._max_workers()
+        logger.info(f"Starting async sync operation ({max_in_flight} requests in flight)")
+        self.stats = SyncStats()
+        self._timer = timer = PhaseTimer()
+        self._start_deadline()
+        self._start_incremental()
+        writer = AsyncCalendarWriter(self.gcal_writer, max_in_flight)
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        cutoff = self._completed_cutoff()
+        completed_action = self.config.get('sync', {}).get('completed_action', 'delete')
+        current_uuids = set()
+        copies, newer = {}, {}
+        plan = SyncPlan(keep_operations=False, reminder_uuids=current_uuids)
+        # (operation, request task or None), in plan order
+        pending = deque()
+
+        def submit(op: SyncOperation):
+            plan.add(op)
+            if self._defer(op):
+                return
+            task = asyncio.ensure_future(self._request(op, writer, semaphore)) if op.api_calls else None
+            pending.append((op, task))
+
+        try:
+            with timer.phase('db_flush'):
+                self._index = index = self.db.load_index()
+                self._load_pending()
+                self._start_checkpoint()
+            logger.debug(f"Loaded {len(index)} mappings")
+
+            # Mapping writes are batched and flushed even if the run fails
+            with self.db.buffered_writes():
+                try:
+                    fetch_timings = {}
+                    with timer.phase('fetch'):
+                        async for reminder in self._stream_reminders(fetch_timings):
+                            if not self._track_copy(reminder, copies, newer):
+                                continue
+                            current_uuids.add(reminder.uuid)
+                            if self._done_before(reminder):
+                                continue
+                            with timer.phase('diff'):
+                                op = self._hold_back(self._plan_reminder(
+                                    reminder, index.get(reminder.uuid), cutoff, completed_action
+                                ))
+                                copies[reminder.uuid] = (reminder.modification_date, op.kind is OperationKind.SKIP)
+                                submit(op)
+                            self._record_ready(pending)
+                    timer.move('fetch', 'convert', fetch_timings.get('convert', 0.0))
+
+                    self.stats.total_reminders = plan.total_reminders = len(current_uuids)
+                    logger.info(f"Fetched {plan.total_reminders} reminders")
+
+                    if newer:
+                        # Plan newer copies against what their first copies left
+                        await self._record_all(pending)
+                        for op in self._plan_newer_copies(newer, copies, index):
+                            submit(op)
+
+                    # Deletes of removed reminders go out in batches, as in
+                    # SyncEngine._apply_all(); held-back ones are plain skips
+                    removed = []
+                    for op in self._removed_operations(index, current_uuids):
+                        current_uuids.add(op.reminder_uuid)
+                        op = self._hold_back(op)
+                        if op.kind is OperationKind.DELETE:
+                            plan.add(op)
+                            removed.append(op)
+                        else:
+                            submit(op)
+                    logger.info(str(plan))
+
+                    with timer.phase('apply'):
+                        await self._record_all(pending)
+                    if removed:
+                        await asyncio.get_running_loop().run_in_executor(None, self._apply_removed, removed)
+                finally:
+                    # Record requests already sent, even when unwinding, so
+                    # a created event never ends up without a mapping
+                    if pending:
+                        await self._record_all(pending)
+
+                with timer.phase('db_flush'):
+                    self.db.flush()
+
+            return self._finish_run(plan)
+
+        except Exception as e:
+            logger.error(f"Sync operation failed: {e}")
+            raise
+
+        finally:
+            self._index = None
+            self._run_started = None
+            self._pending = {}
+            self._checkpoint = None
+            self._resumed = set()
+            self._deadline = None
+            writer.close()
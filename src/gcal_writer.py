@@ -3,26 +3,131 @@ Google Calendar writer module.
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, List, Tuple
 from googleapiclient.errors import HttpError
 
+from auth import GoogleCalendarAuth
+from rate_limiter import AdaptiveRateLimiter, build_rate_limiter, is_rate_limited
+
 logger = logging.getLogger(__name__)
 
+# Statuses meaning an event is already gone; deleting it again succeeded
+GONE_STATUSES = (404, 410)
+
+# Requests per Calendar API batch; Google recommends at most 50
+DELETE_BATCH_SIZE = 50
+
+# Events per events.list page; the most the Calendar API returns
+LIST_PAGE_SIZE = 2500
+
+# Projection for listing synced events: only what reconciliation reads
+LIST_FIELDS = 'nextPageToken,items(id,updated,extendedProperties/private/reminderUUID)'
+
+# create_event() fields patch_event() can change
+PATCH_FIELDS = frozenset((
+    'summary', 'description', 'start_datetime', 'end_datetime', 'all_day', 'color_id', 'location'
+))
+
+
+def is_gone(error: Exception) -> bool:
+    """Whether an API error says the event no longer exists."""
+    return isinstance(error, HttpError) and getattr(error.resp, 'status', None) in GONE_STATUSES
+
+
+class MovedOnly(dict):
+    """
+    Event dict returned when a move went through but the change sent with
+    it failed: the event is in its new calendar with its old content.
+    """
+
 
 class GoogleCalendarWriter:
     """Write events to Google Calendar."""
 
-    def __init__(self, service, calendar_id: str = 'primary'):
+    def __init__(
+        self,
+        service,
+        calendar_id: str = 'primary',
+        service_factory: Optional[Callable[[], Any]] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+    ):
         """
         Initialize Google Calendar writer.
 
         Args:
             service: Authenticated Google Calendar API service
             calendar_id: Target calendar ID (default: 'primary')
+            service_factory: Optional callable returning a new authenticated
+                service. When set, every other thread that uses the writer
+                gets its own service (and HTTP connection) from it.
+            rate_limiter: Optional limiter every request goes through; share
+                one instance between all threads using the writer
         """
-        self.service = service
+        self._service = service
+        self._service_factory = service_factory
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
         self.calendar_id = calendar_id
+        self.rate_limiter = rate_limiter
+
+    def _execute(self, request, cost: int = 1):
+        """Execute an API request, paced by the rate limiter if there is one."""
+        if self.rate_limiter is None:
+            return request.execute()
+        return self.rate_limiter.execute(request, cost)
+
+    @property
+    def service(self):
+        """
+        Calendar service for the calling thread.
+
+        httplib2, which the API client uses underneath, is not thread-safe,
+        so worker threads never share the service of the creating thread.
+        """
+        if self._service_factory is None or threading.get_ident() == self._owner_thread:
+            return self._service
+
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            logger.debug(f"Building Calendar service for thread {threading.current_thread().name}")
+            service = self._local.service = self._service_factory()
+        return service
+
+    @service.setter
+    def service(self, service):
+        self._service = service
+
+    @staticmethod
+    def _event_times(
+        start_datetime: Optional[datetime],
+        end_datetime: Optional[datetime],
+        all_day: bool
+    ) -> Tuple[Dict, Dict]:
+        """
+        Build an event's start and end.
+
+        A missing start is today at 9:00; a missing end is the start day
+        for all-day events and an hour after the start otherwise.
+        """
+        if start_datetime is None:
+            start_datetime = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        if end_datetime is None:
+            end_datetime = start_datetime if all_day else start_datetime + timedelta(hours=1)
+
+        if all_day:
+            # All-day event uses date format
+            return (
+                {'date': start_datetime.strftime('%Y-%m-%d')},
+                {'date': (end_datetime + timedelta(days=1)).strftime('%Y-%m-%d')},
+            )
+        # Timed event uses dateTime format with local timezone
+        return (
+            {'dateTime': start_datetime.isoformat(), 'timeZone': 'Asia/Seoul'},
+            {'dateTime': end_datetime.isoformat(), 'timeZone': 'Asia/Seoul'},
+        )
 
     def create_event(
         self,
@@ -33,7 +138,8 @@ class GoogleCalendarWriter:
         color_id: Optional[str] = None,
         reminder_uuid: Optional[str] = None,
         all_day: bool = False,
-        location: Optional[str] = None
+        location: Optional[str] = None,
+        calendar_id: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Create a new event in Google Calendar.
@@ -46,22 +152,12 @@ class GoogleCalendarWriter:
             color_id: Google Calendar color ID (1-11)
             reminder_uuid: Original reminder UUID (stored in extended properties)
             all_day: Whether this is an all-day event
+            calendar_id: Target calendar (None = the writer's calendar_id)
 
         Returns:
             Created event dict or None on failure
         """
         try:
-            # Default to today if no start time
-            if start_datetime is None:
-                start_datetime = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
-
-            # Default end time
-            if end_datetime is None:
-                if all_day:
-                    end_datetime = start_datetime
-                else:
-                    end_datetime = start_datetime + timedelta(hours=1)
-
             # Build event body
             event = {
                 'summary': summary,
@@ -73,20 +169,7 @@ class GoogleCalendarWriter:
                 event['location'] = location
 
             # Set start/end time
-            if all_day:
-                # All-day event uses date format
-                event['start'] = {'date': start_datetime.strftime('%Y-%m-%d')}
-                event['end'] = {'date': (end_datetime + timedelta(days=1)).strftime('%Y-%m-%d')}
-            else:
-                # Timed event uses dateTime format with local timezone
-                event['start'] = {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': 'Asia/Seoul',
-                }
-                event['end'] = {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': 'Asia/Seoul',
-                }
+            event['start'], event['end'] = self._event_times(start_datetime, end_datetime, all_day)
 
             # Add color if specified
             if color_id:
@@ -102,10 +185,10 @@ class GoogleCalendarWriter:
 
             # Create event
             logger.debug(f"Creating event: {summary}")
-            created_event = self.service.events().insert(
-                calendarId=self.calendar_id,
+            created_event = self._execute(self.service.events().insert(
+                calendarId=calendar_id or self.calendar_id,
                 body=event
-            ).execute()
+            ))
 
             logger.info(f"Created event: {summary} (ID: {created_event['id']})")
             return created_event
@@ -123,7 +206,9 @@ class GoogleCalendarWriter:
         end_datetime: Optional[datetime] = None,
         color_id: Optional[str] = None,
         all_day: bool = False,
-        location: Optional[str] = None
+        location: Optional[str] = None,
+        calendar_id: Optional[str] = None,
+        moved_from: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Update an existing event.
@@ -136,16 +221,28 @@ class GoogleCalendarWriter:
             end_datetime: New end time
             color_id: New color ID
             all_day: Whether this is an all-day event
+            calendar_id: Calendar holding the event (None = the writer's calendar_id)
+            moved_from: Calendar the event is in now, when it moves to
+                calendar_id first; the moved event replaces the initial get
 
         Returns:
-            Updated event dict or None on failure
+            Updated event dict, MovedOnly if only the move succeeded, or
+            None on failure
         """
+        calendar_id = calendar_id or self.calendar_id
+        moved_event = None
         try:
-            # Get existing event
-            event = self.service.events().get(
-                calendarId=self.calendar_id,
-                eventId=event_id
-            ).execute()
+            if moved_from is not None:
+                moved_event = self.move_event(event_id, calendar_id, moved_from)
+                if moved_event is None:
+                    return None
+                event = dict(moved_event)
+            else:
+                # Get existing event
+                event = self._execute(self.service.events().get(
+                    calendarId=calendar_id,
+                    eventId=event_id
+                ))
 
             # Update fields if provided
             if summary is not None:
@@ -180,43 +277,202 @@ class GoogleCalendarWriter:
 
             # Update event
             logger.debug(f"Updating event ID: {event_id}")
-            updated_event = self.service.events().update(
-                calendarId=self.calendar_id,
+            updated_event = self._execute(self.service.events().update(
+                calendarId=calendar_id,
                 eventId=event_id,
                 body=event
-            ).execute()
+            ))
 
             logger.info(f"Updated event: {updated_event.get('summary')} (ID: {event_id})")
             return updated_event
 
         except HttpError as e:
             logger.error(f"Error updating event '{event_id}': {e}")
+            return MovedOnly(moved_event) if moved_event is not None else None
+
+    def patch_event(
+        self,
+        event_id: str,
+        calendar_id: Optional[str] = None,
+        moved_from: Optional[str] = None,
+        **changes
+    ) -> Optional[Dict]:
+        """
+        Change some fields of an event with a PATCH, without reading it first.
+
+        Only the fields passed are sent; a field passed as None is cleared.
+        Start and end are sent together, with create_event()'s defaults,
+        and replace the event's other time form, so an event can switch
+        between all-day and timed.
+
+        Args:
+            event_id: Google Calendar event ID
+            calendar_id: Calendar holding the event (None = the writer's calendar_id)
+            moved_from: Calendar the event is in now, when it moves to
+                calendar_id first
+            **changes: create_event() fields to change (see PATCH_FIELDS)
+
+        Returns:
+            Patched event dict, MovedOnly if only the move succeeded, or
+            None on failure
+        """
+        unknown = changes.keys() - PATCH_FIELDS
+        if unknown:
+            raise TypeError(f"patch_event() got unknown fields: {', '.join(sorted(unknown))}")
+
+        body = {key: changes[key] for key in ('summary', 'description', 'location') if key in changes}
+        if 'color_id' in changes:
+            body['colorId'] = str(changes['color_id']) if changes['color_id'] else None
+        if 'start_datetime' in changes or 'end_datetime' in changes or 'all_day' in changes:
+            body['start'], body['end'] = self._event_times(
+                changes.get('start_datetime'), changes.get('end_datetime'), changes.get('all_day', False)
+            )
+            for times in (body['start'], body['end']):
+                for key in ('date', 'dateTime', 'timeZone'):
+                    times.setdefault(key, None)
+
+        calendar_id = calendar_id or self.calendar_id
+        moved_event = None
+        if moved_from is not None:
+            moved_event = self.move_event(event_id, calendar_id, moved_from)
+            if moved_event is None or not body:
+                return moved_event
+        try:
+            logger.debug(f"Patching event ID {event_id}: {', '.join(sorted(body))}")
+            patched_event = self._execute(self.service.events().patch(
+                calendarId=calendar_id,
+                eventId=event_id,
+                body=body
+            ))
+
+            logger.info(f"Patched event: {patched_event.get('summary')} (ID: {event_id})")
+            return patched_event
+
+        except HttpError as e:
+            logger.error(f"Error patching event '{event_id}': {e}")
+            return MovedOnly(moved_event) if moved_event is not None else None
+
+    def move_event(self, event_id: str, destination: str, calendar_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Move an event to another calendar, keeping its ID.
+
+        An event missing from its calendar (404/410) is looked up in the
+        destination: a move that went through without being recorded is
+        not retried forever.
+
+        Args:
+            event_id: Google Calendar event ID
+            destination: Calendar ID to move the event to
+            calendar_id: Calendar holding the event (None = the writer's calendar_id)
+
+        Returns:
+            Moved event dict or None on failure
+        """
+        source = calendar_id or self.calendar_id
+        try:
+            logger.debug(f"Moving event ID {event_id}: {source} -> {destination}")
+            moved_event = self._execute(self.service.events().move(
+                calendarId=source,
+                eventId=event_id,
+                destination=destination
+            ))
+
+            logger.info(f"Moved event ID {event_id} to calendar {destination}")
+            return moved_event
+
+        except HttpError as e:
+            if is_gone(e):
+                try:
+                    moved_event = self._execute(self.service.events().get(
+                        calendarId=destination,
+                        eventId=event_id
+                    ))
+                    logger.info(f"Event ID {event_id} is already in calendar {destination}")
+                    return moved_event
+                except HttpError:
+                    pass
+            logger.error(f"Error moving event '{event_id}' to {destination}: {e}")
             return None
 
-    def delete_event(self, event_id: str) -> bool:
+    def delete_event(self, event_id: str, calendar_id: Optional[str] = None) -> bool:
         """
         Delete an event.
 
         Args:
             event_id: Google Calendar event ID
+            calendar_id: Calendar holding the event (None = the writer's calendar_id)
 
         Returns:
-            True if successful, False otherwise
+            True if successful or the event was already gone (404/410),
+            False otherwise
         """
         try:
             logger.debug(f"Deleting event ID: {event_id}")
-            self.service.events().delete(
-                calendarId=self.calendar_id,
+            self._execute(self.service.events().delete(
+                calendarId=calendar_id or self.calendar_id,
                 eventId=event_id
-            ).execute()
+            ))
 
             logger.info(f"Deleted event ID: {event_id}")
             return True
 
         except HttpError as e:
+            if is_gone(e):
+                logger.info(f"Event {event_id} was already deleted")
+                return True
             logger.error(f"Error deleting event '{event_id}': {e}")
             return False
 
+    def batch_delete_events(self, event_ids: List[str], calendar_id: Optional[str] = None) -> Dict[str, bool]:
+        """
+        Delete events with Calendar API batch requests.
+
+        Up to DELETE_BATCH_SIZE deletes share one HTTP request. Events that
+        are already gone count as deleted. Deletes the batch did not settle
+        (the batch itself failed, or an item was rate limited) fall back to
+        delete_event(), which retries under the rate limiter.
+
+        Args:
+            event_ids: Google Calendar event IDs
+            calendar_id: Calendar holding the events (None = the writer's calendar_id)
+
+        Returns:
+            Dict of event ID -> True if deleted (or already gone)
+        """
+        calendar_id = calendar_id or self.calendar_id
+        results: Dict[str, bool] = {}
+
+        def callback(request_id, response, exception):
+            if exception is None or is_gone(exception):
+                results[request_id] = True
+            elif isinstance(exception, HttpError) and is_rate_limited(exception):
+                # Left unsettled; retried on its own below
+                return
+            else:
+                logger.error(f"Error deleting event '{request_id}': {exception}")
+                results[request_id] = False
+
+        service = self.service
+        for i in range(0, len(event_ids), DELETE_BATCH_SIZE):
+            chunk = event_ids[i:i + DELETE_BATCH_SIZE]
+            try:
+                batch = service.new_batch_http_request(callback=callback)
+                for event_id in chunk:
+                    batch.add(
+                        service.events().delete(calendarId=calendar_id, eventId=event_id),
+                        request_id=event_id
+                    )
+                self._execute(batch, cost=len(chunk))
+            except (HttpError, AttributeError) as e:
+                # AttributeError: a service without batch support
+                logger.debug(f"Batch delete of {len(chunk)} events failed, deleting one by one: {e}")
+
+        for event_id in event_ids:
+            if event_id not in results:
+                results[event_id] = self.delete_event(event_id, calendar_id)
+        logger.info(f"Deleted {sum(results.values())} of {len(event_ids)} events")
+        return results
+
     def find_event_by_reminder_uuid(self, reminder_uuid: str) -> Optional[Dict]:
         """
         Find an event by its reminder UUID (stored in extended properties).
@@ -230,11 +486,11 @@ class GoogleCalendarWriter:
         try:
             # Search for events with this reminder UUID
             # Note: privateExtendedProperty search is limited, so we fetch all and filter
-            events_result = self.service.events().list(
+            events_result = self._execute(self.service.events().list(
                 calendarId=self.calendar_id,
                 privateExtendedProperty=f'reminderUUID={reminder_uuid}',
                 maxResults=1
-            ).execute()
+            ))
 
             events = events_result.get('items', [])
             if events:
@@ -247,6 +503,44 @@ class GoogleCalendarWriter:
             logger.error(f"Error searching for event with UUID {reminder_uuid}: {e}")
             return None
 
+    def iter_event_pages(
+        self,
+        calendar_id: Optional[str] = None,
+        page_size: int = LIST_PAGE_SIZE
+    ) -> Iterator[List[Dict]]:
+        """
+        Page through every event of a calendar, one events.list request per page.
+
+        Only LIST_FIELDS are requested, so a page of `page_size` events
+        stays small. The Calendar API can only filter on a property's
+        value, not on its presence, so events without a reminderUUID are
+        listed too.
+
+        Args:
+            calendar_id: Calendar to list (None = the writer's calendar_id)
+            page_size: maxResults per request (at most LIST_PAGE_SIZE)
+
+        Yields:
+            Each page's events, as {id, updated, extendedProperties} dicts
+
+        Raises:
+            HttpError: A page could not be fetched; a partial listing
+                must not be mistaken for a complete one
+        """
+        calendar_id = calendar_id or self.calendar_id
+        page_token = None
+        while True:
+            response = self._execute(self.service.events().list(
+                calendarId=calendar_id,
+                maxResults=min(page_size, LIST_PAGE_SIZE),
+                pageToken=page_token,
+                fields=LIST_FIELDS
+            ))
+            yield response.get('items', [])
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+
     def get_priority_color(self, priority: int, color_map: Dict[str, str]) -> str:
         """
         Map reminder priority to Google Calendar color.
@@ -285,6 +579,37 @@ class GoogleCalendarWriter:
         return results
 
 
+def build_writer(config: Dict, base_dir: Optional[Path] = None) -> GoogleCalendarWriter:
+    """
+    Authenticate and create the Calendar writer described by config.
+
+    Args:
+        config: Full configuration dict
+        base_dir: Directory that relative auth file paths are resolved
+            against (defaults to the working directory)
+
+    Returns:
+        GoogleCalendarWriter
+    """
+    def resolve(path: str) -> str:
+        return str(path if base_dir is None or Path(path).is_absolute() else Path(base_dir) / path)
+
+    credentials_file = resolve(config.get('auth', {}).get('credentials_file', 'credentials.json'))
+    token_file = resolve(config.get('auth', {}).get('token_file', 'data/token.json'))
+    calendar_id = config.get('google_calendar', {}).get('calendar_id', 'primary')
+
+    auth = GoogleCalendarAuth(credentials_file, token_file)
+    service = auth.get_calendar_service()
+    # Worker threads (sync.max_workers) build their own service; all of
+    # them share one rate limiter (google_calendar.rate_limit)
+    return GoogleCalendarWriter(
+        service,
+        calendar_id,
+        service_factory=auth.get_calendar_service,
+        rate_limiter=build_rate_limiter(config)
+    )
+
+
 def main():
     """Test function."""
     logging.basicConfig(level=logging.INFO)
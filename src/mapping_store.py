@@ -0,0 +1,1696 @@
+"""
+Storage backends for reminder-to-event mappings and sync history.
+
+Three interchangeable backends share the MappingStore interface:
+
+- MappingDatabase: SQLite (the default)
+- MemoryMappingStore: process-local dicts, for tests and benchmarks
+- JournalMappingStore: append-only JSON lines file with periodic
+  compaction, for mapping files kept on iCloud Drive where SQLite
+  locking is unreliable
+
+Use open_mapping_store() to build the backend named by `database.backend`
+in config.yaml.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+if TYPE_CHECKING:
+    from sync_engine import SyncStats
+
+logger = logging.getLogger(__name__)
+
+
+# Ordered schema migrations: (version, description, statements). Each runs
+# once, in its own transaction, and is recorded in the schema_version table.
+# Never edit a released migration; append a new one instead.
+SCHEMA_MIGRATIONS = [
+    (1, "initial schema", [
+        # IF NOT EXISTS adopts databases created before versioning existed
+        '''
+        CREATE TABLE IF NOT EXISTS mappings (
+            reminder_uuid TEXT PRIMARY KEY,
+            event_id TEXT NOT NULL,
+            last_synced TIMESTAMP NOT NULL,
+            last_modified TIMESTAMP,
+            checksum TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS sync_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sync_time TIMESTAMP NOT NULL,
+            total_reminders INTEGER,
+            created INTEGER,
+            updated INTEGER,
+            deleted INTEGER,
+            errors INTEGER
+        )
+        ''',
+        # `status` reads the newest runs and pruning deletes the oldest
+        '''
+        CREATE INDEX IF NOT EXISTS idx_sync_history_sync_time
+        ON sync_history (sync_time)
+        ''',
+    ] + [
+        # Hourly and daily totals that outlive pruned sync_history rows
+        f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            bucket TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL DEFAULT 0,
+            failed_runs INTEGER NOT NULL DEFAULT 0,
+            total_reminders INTEGER NOT NULL DEFAULT 0,
+            created INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            errors INTEGER NOT NULL DEFAULT 0
+        )
+        '''
+        for table in ('sync_rollup_hourly', 'sync_rollup_daily')
+    ]),
+    (2, "mapping indexes for reverse and staleness lookups", [
+        # Reverse lookup from a calendar event back to its reminder
+        'CREATE INDEX IF NOT EXISTS idx_mappings_event_id ON mappings (event_id)',
+        # Staleness scans ordered by last sync time
+        'CREATE INDEX IF NOT EXISTS idx_mappings_last_synced ON mappings (last_synced)',
+    ]),
+    (3, "checksum algorithm version", [
+        # Existing rows hold MD5 hex digests (CHECKSUM_VERSION_MD5)
+        'ALTER TABLE mappings ADD COLUMN checksum_version INTEGER NOT NULL DEFAULT 1',
+    ]),
+    (4, "per-phase sync timings", [
+        # Milliseconds per SYNC_PHASES entry plus the whole run; NULL for
+        # runs recorded before this migration
+        f'ALTER TABLE sync_history ADD COLUMN {column} INTEGER'
+        for column in (
+            'fetch_ms', 'convert_ms', 'diff_ms', 'apply_ms', 'db_flush_ms', 'cleanup_ms', 'total_ms'
+        )
+    ]),
+    (5, "key-value metadata", [
+        '''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        ''',
+    ]),
+    (6, "retry queue for failed calendar operations", [
+        '''
+        CREATE TABLE IF NOT EXISTS pending_ops (
+            reminder_uuid TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            event_id TEXT,
+            attempts INTEGER NOT NULL,
+            next_attempt TIMESTAMP NOT NULL,
+            last_error TEXT
+        )
+        ''',
+    ]),
+    (7, "checkpoint of the sync in progress", [
+        # At most one row: the run that has not finished yet
+        '''
+        CREATE TABLE IF NOT EXISTS sync_checkpoint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            run_id TEXT NOT NULL,
+            started TIMESTAMP NOT NULL,
+            checkpointed_at TIMESTAMP NOT NULL,
+            created INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0,
+            deleted INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        # Reminders whose calendar change that run already committed
+        '''
+        CREATE TABLE IF NOT EXISTS checkpoint_processed (
+            reminder_uuid TEXT PRIMARY KEY
+        )
+        ''',
+    ]),
+    (8, "target calendar per mapping", [
+        # NULL: the default google_calendar.calendar_id
+        'ALTER TABLE mappings ADD COLUMN calendar_id TEXT',
+    ]),
+    (9, "reminder list per mapping and per history row", [
+        # NULL for rows written before this migration, until the next sync
+        'ALTER TABLE mappings ADD COLUMN list_title TEXT',
+        # The list a sharded run synced; NULL for whole-library runs
+        'ALTER TABLE sync_history ADD COLUMN shard TEXT',
+    ]),
+    (10, "per-field fingerprint of the synced event", [
+        # NULL for rows written before this migration: the next update
+        # sends every field
+        'ALTER TABLE mappings ADD COLUMN fingerprint BLOB',
+    ]),
+    (11, "list shard of the sync in progress", [
+        # NULL for a whole-library run
+        'ALTER TABLE sync_checkpoint ADD COLUMN shard TEXT',
+    ]),
+]
+
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+# Change-detection checksum algorithms, stored per mapping row
+CHECKSUM_VERSION_MD5 = 1      # 32-char MD5 hex string
+CHECKSUM_VERSION_BLAKE2B = 2  # 8-byte BLAKE2b digest stored as a BLOB
+CHECKSUM_VERSION = CHECKSUM_VERSION_BLAKE2B
+CHECKSUM_DIGEST_SIZE = 8
+
+
+# Phases timed by SyncEngine.sync(), in run order
+SYNC_PHASES = ('fetch', 'convert', 'diff', 'apply', 'db_flush', 'cleanup')
+# Keys of SyncStats.timings stored with each history row
+TIMING_KEYS = SYNC_PHASES + ('total',)
+
+# Meta keys maintained by MappingStore.maintain()
+META_SYNCS_SINCE_MAINTENANCE = 'syncs_since_maintenance'
+META_LAST_MAINTENANCE = 'last_maintenance'
+# Meta keys maintained by SyncEngine for incremental syncs
+META_SYNCS_SINCE_FULL_VERIFY = 'syncs_since_full_verify'
+META_FULL_VERIFY_REQUESTED = 'full_verify_requested'
+# Followed by the list (calendar) title; value is an ISO timestamp
+META_WATERMARK_PREFIX = 'watermark:'
+# Followed by the list title; value is the ISO time its shard last synced
+META_SHARD_SYNCED_PREFIX = 'shard_synced:'
+
+
+class MappingRecord(NamedTuple):
+    """One row of the mappings table."""
+    reminder_uuid: str
+    event_id: str
+    last_synced: Optional[datetime] = None
+    last_modified: Optional[datetime] = None
+    checksum: Optional[Union[bytes, str]] = None
+    checksum_version: int = CHECKSUM_VERSION
+    # Calendar holding the event; None for the default calendar
+    calendar_id: Optional[str] = None
+    # Reminder list the reminder was in when last synced; None if unknown
+    list_title: Optional[str] = None
+    # One short digest per synced event field (see SyncEngine._fingerprint())
+    fingerprint: Optional[bytes] = None
+
+
+class PendingOperation(NamedTuple):
+    """One row of the pending_ops retry queue: a failed calendar operation."""
+    reminder_uuid: str
+    kind: str
+    event_id: Optional[str]
+    attempts: int
+    next_attempt: datetime
+    last_error: Optional[str] = None
+
+
+class SyncCheckpoint(NamedTuple):
+    """Progress of an unfinished sync run, committed with its mapping writes."""
+    run_id: str
+    started: datetime
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    # List title of a sharded run; None for a whole-library run
+    shard: Optional[str] = None
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Convert a stored TIMESTAMP value back into a datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+@dataclass
+class MaintenanceReport:
+    """Result of MappingStore.maintain()."""
+    backend: str
+    size_before: int = 0
+    size_after: int = 0
+    # Page counts are only known for SQLite
+    pages_before: Optional[int] = None
+    pages_after: Optional[int] = None
+    free_pages_before: Optional[int] = None
+    free_pages_after: Optional[int] = None
+    integrity: List[str] = field(default_factory=lambda: ['ok'])
+    steps: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.integrity == ['ok']
+
+    def __str__(self):
+        text = f"Maintenance ({self.backend}): {self.size_before} -> {self.size_after} bytes"
+        if self.pages_before is not None:
+            text += (
+                f", {self.pages_before} -> {self.pages_after} pages"
+                f" ({self.free_pages_before} -> {self.free_pages_after} free)"
+            )
+        return text + f", integrity {'ok' if self.ok else 'FAILED'}"
+
+
+def _rollup_buckets(sync_time: datetime) -> Dict[str, str]:
+    """Return the hourly and daily rollup bucket keys for a sync time."""
+    return {
+        'hourly': sync_time.strftime('%Y-%m-%d %H:00'),
+        'daily': sync_time.strftime('%Y-%m-%d'),
+    }
+
+
+class MappingStore(ABC):
+    """
+    Base class for mapping storage backends.
+
+    Owns the write-behind buffer shared by every backend: save_mapping() and
+    delete_mapping() queue changes that are handed to _write_batch() in one
+    batch. Backends implement the batch write and the read/history methods
+    (the abstract methods), so one that misses any cannot be instantiated.
+    """
+
+    # Name used for `database.backend` in config.yaml
+    backend = None
+
+    DEFAULT_OPTIONS = {
+        'write_batch_size': 200,    # Buffered mapping writes per batch
+    }
+
+    def __init__(self, options: Optional[Dict] = None):
+        """
+        Initialize the write buffer.
+
+        Args:
+            options: Optional `database:` config section
+        """
+        self.options = {**self.DEFAULT_OPTIONS, **(options or {})}
+        self._lock = threading.RLock()
+
+        # Write-behind buffer: reminder UUID -> MappingRecord to upsert, or
+        # None to delete. Only the latest write per UUID is kept.
+        self.write_batch_size = max(1, int(self.options['write_batch_size']))
+        self._pending: Dict[str, Optional[MappingRecord]] = {}
+        self._buffer_depth = 0
+        # Latest checkpoint and newly processed UUIDs, written with the next batch
+        self._checkpoint: Optional[SyncCheckpoint] = None
+        self._checkpoint_processed: List[str] = []
+
+    def close(self):
+        """Flush buffered writes and release resources. Safe to call more than once."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def buffered_writes(self):
+        """
+        Buffer save_mapping()/delete_mapping() calls inside the block.
+
+        Buffered writes are flushed in one batch every `write_batch_size`
+        operations and when the block exits, including when it exits with an
+        exception, so mappings for events that were already created are never
+        dropped. If that final flush fails too, the failure is logged and the
+        block's own exception propagates.
+        """
+        with self._lock:
+            self._buffer_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._end_buffering(unwinding=True)
+            raise
+        self._end_buffering(unwinding=False)
+
+    def _end_buffering(self, unwinding: bool):
+        """Leave a buffered_writes() block, flushing when it is the outermost one."""
+        with self._lock:
+            self._buffer_depth -= 1
+            if self._buffer_depth:
+                return
+            try:
+                self.flush()
+            except Exception:
+                if not unwinding:
+                    raise
+                # Keep the error that is unwinding the block as the one raised
+                logger.exception("Could not flush buffered mapping writes")
+
+    def _queue_write(self, reminder_uuid: str, record: Optional[MappingRecord]):
+        """Queue an upsert (record) or delete (None), flushing when due."""
+        with self._lock:
+            self._pending[reminder_uuid] = record
+            if not self._buffer_depth or len(self._pending) >= self.write_batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write all buffered mapping changes, and the latest checkpoint, in a single batch."""
+        with self._lock:
+            if not self._pending and self._checkpoint is None:
+                return
+
+            deletes = [uuid for uuid, record in self._pending.items() if record is None]
+            upserts = [record for record in self._pending.values() if record is not None]
+
+            # On failure the buffer is kept, so a later flush (or close) can
+            # retry the same writes.
+            self._write_batch(upserts, deletes, self._checkpoint, self._checkpoint_processed)
+            self._pending.clear()
+            self._checkpoint = None
+            self._checkpoint_processed = []
+        logger.debug(f"Flushed {len(upserts)} mapping upserts and {len(deletes)} deletes")
+
+    @abstractmethod
+    def _write_batch(
+        self,
+        upserts: List[MappingRecord],
+        deletes: List[str],
+        checkpoint: Optional[SyncCheckpoint] = None,
+        processed: List[str] = ()
+    ):
+        """
+        Atomically apply a batch of upserts and deletes.
+
+        When `checkpoint` is set it replaces the stored checkpoint and
+        `processed` is added to its UUIDs, in the same transaction.
+        """
+
+    def save_checkpoint(self, checkpoint: SyncCheckpoint, processed: Iterable[str] = ()):
+        """
+        Record sync progress.
+
+        Inside buffered_writes() the checkpoint is held back and committed
+        together with the next batch of mapping writes, so a stored
+        checkpoint never claims work whose mappings were lost.
+
+        Args:
+            checkpoint: Progress of the current run
+            processed: UUIDs completed since the previous checkpoint
+        """
+        with self._lock:
+            self._checkpoint = checkpoint
+            self._checkpoint_processed.extend(processed)
+            if not self._buffer_depth:
+                self.flush()
+
+    @abstractmethod
+    def load_checkpoint(self) -> Optional[Tuple[SyncCheckpoint, Set[str]]]:
+        """
+        Load the checkpoint of an unfinished run.
+
+        Returns:
+            (checkpoint, processed reminder UUIDs), or None if the last run
+            finished
+        """
+
+    @abstractmethod
+    def clear_checkpoint(self):
+        """Forget the current checkpoint once its run has finished."""
+
+    def save_mapping(
+        self,
+        reminder_uuid: str,
+        event_id: str,
+        last_modified: Optional[datetime] = None,
+        checksum: Optional[Union[bytes, str]] = None,
+        checksum_version: int = CHECKSUM_VERSION,
+        calendar_id: Optional[str] = None,
+        list_title: Optional[str] = None,
+        fingerprint: Optional[bytes] = None
+    ):
+        """Save or update a reminder-to-event mapping."""
+        self._queue_write(
+            reminder_uuid,
+            MappingRecord(
+                reminder_uuid, event_id, datetime.now(), last_modified, checksum, checksum_version, calendar_id,
+                list_title, fingerprint
+            )
+        )
+        logger.debug(f"Saved mapping: {reminder_uuid} -> {event_id}")
+
+    def delete_mapping(self, reminder_uuid: str):
+        """Delete a mapping."""
+        self._queue_write(reminder_uuid, None)
+        logger.debug(f"Deleted mapping for {reminder_uuid}")
+
+    @abstractmethod
+    def get_mapping(self, reminder_uuid: str) -> Optional[MappingRecord]:
+        """Get the full mapping record for a reminder UUID."""
+
+    def get_mappings(self, reminder_uuids: Iterable[str]) -> Dict[str, MappingRecord]:
+        """Get mapping records for many reminder UUIDs; unmapped UUIDs are absent."""
+        records = {}
+        for uuid in dict.fromkeys(reminder_uuids):
+            record = self.get_mapping(uuid)
+            if record is not None:
+                records[uuid] = record
+        return records
+
+    @abstractmethod
+    def find_by_event_id(self, event_id: str) -> Optional[MappingRecord]:
+        """Reverse lookup: get the mapping for a Google Calendar event ID."""
+
+    @abstractmethod
+    def get_stale_mappings(self, synced_before: datetime, limit: int = 100) -> List[MappingRecord]:
+        """Get mappings not synced since `synced_before`, oldest first."""
+
+    @abstractmethod
+    def load_index(self) -> Dict[str, MappingRecord]:
+        """
+        Load every mapping in a single pass.
+
+        Returns:
+            Dict of reminder UUID -> MappingRecord
+        """
+
+    def get_event_id(self, reminder_uuid: str) -> Optional[str]:
+        """Get event ID for a reminder UUID."""
+        record = self.get_mapping(reminder_uuid)
+        return record.event_id if record else None
+
+    def get_last_modified(self, reminder_uuid: str) -> Optional[datetime]:
+        """Get last modification time for a reminder."""
+        record = self.get_mapping(reminder_uuid)
+        return record.last_modified if record else None
+
+    def get_checksum(self, reminder_uuid: str) -> Optional[Union[bytes, str]]:
+        """Get stored checksum for a reminder."""
+        record = self.get_mapping(reminder_uuid)
+        return record.checksum if record else None
+
+    def get_all_reminder_uuids(self) -> Set[str]:
+        """Get all reminder UUIDs currently stored."""
+        return set(self.load_index())
+
+    def count_mappings(self) -> int:
+        """Get the number of stored mappings."""
+        return len(self.load_index())
+
+    @abstractmethod
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a stored metadata value."""
+
+    @abstractmethod
+    def set_meta(self, key: str, value: str):
+        """Store a metadata value."""
+
+    @abstractmethod
+    def load_pending_ops(self) -> Dict[str, PendingOperation]:
+        """
+        Load the retry queue.
+
+        Returns:
+            Dict of reminder UUID -> PendingOperation
+        """
+
+    @abstractmethod
+    def save_pending_op(self, op: PendingOperation):
+        """Add or replace the queued retry for a reminder. Written immediately."""
+
+    @abstractmethod
+    def delete_pending_op(self, reminder_uuid: str):
+        """Remove a reminder's queued retry, if any. Written immediately."""
+
+    def maintain(self) -> MaintenanceReport:
+        """
+        Compact and check the store, and reset the maintenance counter.
+
+        Returns:
+            MaintenanceReport with sizes before and after
+        """
+        with self._lock:
+            self.flush()
+            report = self._maintain()
+            self.set_meta(META_SYNCS_SINCE_MAINTENANCE, '0')
+            self.set_meta(META_LAST_MAINTENANCE, datetime.now().isoformat())
+        logger.info(str(report))
+        return report
+
+    def _maintain(self) -> MaintenanceReport:
+        return MaintenanceReport(self.backend)
+
+    @abstractmethod
+    def save_sync_stats(self, stats: 'SyncStats', shard: Optional[str] = None):
+        """
+        Save sync statistics to history and fold them into the rollups.
+
+        Args:
+            stats: Totals of the run
+            shard: List title when the run synced a single list shard
+        """
+
+    @abstractmethod
+    def get_recent_history(self, limit: int = 5) -> List[tuple]:
+        """
+        Get the most recent sync history rows, newest first.
+
+        Returns:
+            List of (sync_time, total_reminders, created, updated, deleted,
+            errors, shard)
+        """
+
+    @abstractmethod
+    def get_recent_timings(self, limit: int = 20) -> List[tuple]:
+        """
+        Get phase timings of the most recent timed runs, newest first.
+
+        Returns:
+            List of (sync_time, *milliseconds) in TIMING_KEYS order
+        """
+
+    @abstractmethod
+    def get_rollups(self, period: str = 'daily', limit: int = 7) -> List[tuple]:
+        """
+        Get the most recent rollup buckets, newest first.
+
+        Args:
+            period: 'daily' or 'hourly'
+            limit: Number of buckets to return
+
+        Returns:
+            List of (bucket, runs, failed_runs, total_reminders, created,
+            updated, deleted, errors)
+        """
+
+    @abstractmethod
+    def prune_history(self, retention_days: int, hourly_rollup_days: int = 90) -> int:
+        """
+        Delete sync history older than the retention window.
+
+        Daily rollups are kept forever; hourly rollups are kept for
+        `hourly_rollup_days`. A retention of 0 or less keeps everything.
+
+        Returns:
+            Number of history rows deleted
+        """
+
+
+class MappingDatabase(MappingStore):
+    """SQLite database for tracking reminder-to-event mappings."""
+
+    backend = 'sqlite'
+
+    # Defaults for the `database:` section of config.yaml
+    DEFAULT_OPTIONS = {
+        **MappingStore.DEFAULT_OPTIONS,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,        # Negative = KiB, i.e. ~8 MB page cache
+        'mmap_size': 67108864,      # 64 MB
+        'busy_timeout': 5000,       # Milliseconds
+        'auto_vacuum': 'INCREMENTAL',  # Lets maintain() return free pages to the OS
+    }
+
+    # Bound parameters per `IN (...)` query; stays below SQLite's default
+    # SQLITE_MAX_VARIABLE_NUMBER of 999 on older builds
+    LOOKUP_CHUNK_SIZE = 500
+
+    _RECORD_COLUMNS = (
+        'reminder_uuid, event_id, last_synced, last_modified, checksum, checksum_version, calendar_id, '
+        'list_title, fingerprint'
+    )
+
+    _ROLLUP_TABLES = {'hourly': 'sync_rollup_hourly', 'daily': 'sync_rollup_daily'}
+
+    _TIMING_COLUMNS = ', '.join(f'{key}_ms' for key in TIMING_KEYS)
+
+    def __init__(self, db_path: str, options: Optional[Dict] = None):
+        """
+        Initialize mapping database.
+
+        Args:
+            db_path: Path to SQLite database file
+            options: Optional `database:` config section (journal_mode,
+                synchronous, cache_size, mmap_size, busy_timeout,
+                write_batch_size)
+        """
+        super().__init__(options)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One long-lived connection shared by every method. The menubar app
+        # runs syncs on a background thread, so access is serialized by the
+        # store lock.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._configure_connection()
+        self._init_db()
+
+    def _configure_connection(self):
+        """Apply journal mode and cache PRAGMAs to the connection."""
+        opts = self.options
+        cursor = self._conn.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(opts['busy_timeout'])}")
+        # Only takes effect on a new file; maintain() converts existing ones
+        cursor.execute(f"PRAGMA auto_vacuum = {opts['auto_vacuum']}")
+        cursor.execute(f"PRAGMA journal_mode = {opts['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {opts['synchronous']}")
+        cursor.execute(f"PRAGMA cache_size = {int(opts['cache_size'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(opts['mmap_size'])}")
+
+    def _init_db(self):
+        """Bring the schema up to date by running pending migrations."""
+        with self._lock:
+            current = self._schema_version()
+            if current >= SCHEMA_VERSION:
+                return
+
+            for version, description, statements in SCHEMA_MIGRATIONS:
+                if version <= current:
+                    continue
+                self._apply_migration(version, description, statements)
+        logger.debug(f"Database initialized at {self.db_path} (schema v{SCHEMA_VERSION})")
+
+    def _schema_version(self) -> int:
+        """Return the applied schema version (0 for a new or pre-migration file)."""
+        try:
+            row = self._conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+        except sqlite3.OperationalError:
+            # No schema_version table yet
+            return 0
+        return row[0] or 0
+
+    def _apply_migration(self, version: int, description: str, statements: List[str]):
+        """Run one migration and record it, atomically."""
+        # IMMEDIATE takes the write lock up front so two processes opening the
+        # same file cannot both apply the migration
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP NOT NULL
+                )
+            ''')
+            if self._schema_version() >= version:
+                self._conn.rollback()
+                return
+
+            for statement in statements:
+                self._conn.execute(statement)
+            self._conn.execute(
+                'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                (version, description, datetime.now())
+            )
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+        logger.info(f"Applied database migration {version}: {description}")
+
+    def close(self):
+        """Flush buffered writes and close the connection. Safe to call more than once."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self.flush()
+                finally:
+                    self._conn.close()
+                    self._conn = None
+                logger.debug(f"Database closed: {self.db_path}")
+
+    def _write_batch(
+        self,
+        upserts: List[MappingRecord],
+        deletes: List[str],
+        checkpoint: Optional[SyncCheckpoint] = None,
+        processed: List[str] = ()
+    ):
+        """Apply buffered upserts and deletes, and the checkpoint, in one transaction."""
+        # On failure the transaction rolls back and flush() keeps the buffer
+        with self._conn:
+            if checkpoint is not None:
+                self._conn.execute('''
+                    INSERT INTO sync_checkpoint (
+                        id, run_id, started, checkpointed_at, created, updated, deleted, shard
+                    )
+                    VALUES (1, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        run_id = excluded.run_id,
+                        started = excluded.started,
+                        checkpointed_at = excluded.checkpointed_at,
+                        created = excluded.created,
+                        updated = excluded.updated,
+                        deleted = excluded.deleted,
+                        shard = excluded.shard
+                ''', (
+                    checkpoint.run_id, checkpoint.started.isoformat(), datetime.now().isoformat(),
+                    checkpoint.created, checkpoint.updated, checkpoint.deleted, checkpoint.shard
+                ))
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO checkpoint_processed (reminder_uuid) VALUES (?)',
+                    [(uuid,) for uuid in processed]
+                )
+            if deletes:
+                self._conn.executemany(
+                    'DELETE FROM mappings WHERE reminder_uuid = ?',
+                    [(uuid,) for uuid in deletes]
+                )
+            if upserts:
+                self._conn.executemany('''
+                    INSERT INTO mappings (
+                        reminder_uuid, event_id, last_synced, last_modified, checksum, checksum_version, calendar_id,
+                        list_title, fingerprint
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(reminder_uuid) DO UPDATE SET
+                        event_id = excluded.event_id,
+                        last_synced = excluded.last_synced,
+                        last_modified = excluded.last_modified,
+                        checksum = excluded.checksum,
+                        checksum_version = excluded.checksum_version,
+                        calendar_id = excluded.calendar_id,
+                        list_title = excluded.list_title,
+                        fingerprint = excluded.fingerprint
+                ''', upserts)
+
+    def _read_cursor(self) -> sqlite3.Cursor:
+        """Return a cursor for reading mappings, flushing buffered writes first."""
+        self.flush()
+        return self._conn.cursor()
+
+    def get_event_id(self, reminder_uuid: str) -> Optional[str]:
+        """Get event ID for a reminder UUID."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute('SELECT event_id FROM mappings WHERE reminder_uuid = ?', (reminder_uuid,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+
+    @staticmethod
+    def _to_record(row: tuple) -> MappingRecord:
+        (uuid, event_id, last_synced, last_modified, checksum, checksum_version, calendar_id, list_title,
+         fingerprint) = row
+        return MappingRecord(
+            uuid,
+            event_id,
+            _parse_timestamp(last_synced),
+            _parse_timestamp(last_modified),
+            checksum,
+            checksum_version,
+            calendar_id,
+            list_title,
+            fingerprint
+        )
+
+    def get_mapping(self, reminder_uuid: str) -> Optional[MappingRecord]:
+        """Get the full mapping record for a reminder UUID in one query."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute(
+                f'SELECT {self._RECORD_COLUMNS} FROM mappings WHERE reminder_uuid = ?',
+                (reminder_uuid,)
+            )
+            row = cursor.fetchone()
+            return self._to_record(row) if row else None
+
+    def get_mappings(self, reminder_uuids: Iterable[str]) -> Dict[str, MappingRecord]:
+        """
+        Get mapping records for many reminder UUIDs.
+
+        UUIDs are looked up with chunked `IN (...)` queries. UUIDs without a
+        mapping are absent from the result.
+        """
+        uuids = list(dict.fromkeys(reminder_uuids))
+        records = {}
+        with self._lock:
+            cursor = self._read_cursor()
+            for i in range(0, len(uuids), self.LOOKUP_CHUNK_SIZE):
+                chunk = uuids[i:i + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT {self._RECORD_COLUMNS} FROM mappings WHERE reminder_uuid IN ({placeholders})',
+                    chunk
+                )
+                for row in cursor:
+                    records[row[0]] = self._to_record(row)
+        return records
+
+    def find_by_event_id(self, event_id: str) -> Optional[MappingRecord]:
+        """Reverse lookup: get the mapping for a Google Calendar event ID."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute(
+                f'SELECT {self._RECORD_COLUMNS} FROM mappings WHERE event_id = ?',
+                (event_id,)
+            )
+            row = cursor.fetchone()
+            return self._to_record(row) if row else None
+
+    def get_stale_mappings(self, synced_before: datetime, limit: int = 100) -> List[MappingRecord]:
+        """Get mappings not synced since `synced_before`, oldest first."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute(
+                f'SELECT {self._RECORD_COLUMNS} FROM mappings '
+                'WHERE last_synced < ? ORDER BY last_synced LIMIT ?',
+                (synced_before, limit)
+            )
+            return [self._to_record(row) for row in cursor]
+
+    def load_index(self) -> Dict[str, MappingRecord]:
+        """
+        Load every mapping in a single pass.
+
+        Returns:
+            Dict of reminder UUID -> MappingRecord
+        """
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute(f'SELECT {self._RECORD_COLUMNS} FROM mappings')
+            return {row[0]: self._to_record(row) for row in cursor}
+
+    def get_all_reminder_uuids(self) -> Set[str]:
+        """Get all reminder UUIDs currently in the database."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute('SELECT reminder_uuid FROM mappings')
+            results = cursor.fetchall()
+            return {row[0] for row in results}
+
+    def count_mappings(self) -> int:
+        """Get the number of stored mappings."""
+        with self._lock:
+            cursor = self._read_cursor()
+            cursor.execute('SELECT COUNT(*) FROM mappings')
+            return cursor.fetchone()[0]
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a stored metadata value."""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        """Store a metadata value."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT INTO meta (key, value) VALUES (?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                    (key, value)
+                )
+
+    def load_pending_ops(self) -> Dict[str, PendingOperation]:
+        """Load the retry queue from pending_ops."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT reminder_uuid, kind, event_id, attempts, next_attempt, last_error FROM pending_ops'
+            ).fetchall()
+        return {
+            row[0]: PendingOperation(row[0], row[1], row[2], row[3], _parse_timestamp(row[4]), row[5])
+            for row in rows
+        }
+
+    def save_pending_op(self, op: PendingOperation):
+        """Add or replace the queued retry for a reminder. Written immediately."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT INTO pending_ops '
+                    '(reminder_uuid, kind, event_id, attempts, next_attempt, last_error) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(reminder_uuid) DO UPDATE SET '
+                    'kind = excluded.kind, event_id = excluded.event_id, attempts = excluded.attempts, '
+                    'next_attempt = excluded.next_attempt, last_error = excluded.last_error',
+                    (op.reminder_uuid, op.kind, op.event_id, op.attempts,
+                     op.next_attempt.isoformat(), op.last_error)
+                )
+
+    def delete_pending_op(self, reminder_uuid: str):
+        """Remove a reminder's queued retry, if any. Written immediately."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM pending_ops WHERE reminder_uuid = ?', (reminder_uuid,))
+
+    def load_checkpoint(self) -> Optional[Tuple[SyncCheckpoint, Set[str]]]:
+        """Load the checkpoint row and its processed UUIDs, or None."""
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                'SELECT run_id, started, created, updated, deleted, shard FROM sync_checkpoint WHERE id = 1'
+            ).fetchone()
+            if row is None:
+                return None
+            processed = {uuid for (uuid,) in self._conn.execute('SELECT reminder_uuid FROM checkpoint_processed')}
+        run_id, started, created, updated, deleted, shard = row
+        return SyncCheckpoint(run_id, _parse_timestamp(started), created, updated, deleted, shard), processed
+
+    def clear_checkpoint(self):
+        """Forget the current checkpoint once its run has finished."""
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute('DELETE FROM sync_checkpoint')
+                self._conn.execute('DELETE FROM checkpoint_processed')
+
+    def _file_size(self) -> int:
+        """Size of the database file plus its WAL."""
+        wal_path = self.db_path.with_name(self.db_path.name + '-wal')
+        return sum(path.stat().st_size for path in (self.db_path, wal_path) if path.exists())
+
+    def _page_counts(self) -> tuple:
+        page_count = self._conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = self._conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return page_count, freelist_count
+
+    def _maintain(self) -> MaintenanceReport:
+        """Vacuum, analyze and integrity-check the database."""
+        report = MaintenanceReport(self.backend, size_before=self._file_size())
+        report.pages_before, report.free_pages_before = self._page_counts()
+
+        # incremental_vacuum is a no-op unless auto_vacuum is INCREMENTAL
+        # (2), and switching an existing file over needs one full VACUUM
+        if self._conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            self._conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self._conn.execute('VACUUM')
+            report.steps.append('vacuum')
+        else:
+            # The pragma frees one page per step and execute() only steps
+            # once; executescript() runs it to completion
+            self._conn.executescript('PRAGMA incremental_vacuum;')
+            report.steps.append('incremental_vacuum')
+
+        self._conn.execute('ANALYZE')
+        self._conn.execute('PRAGMA optimize')
+        report.steps.extend(['analyze', 'optimize'])
+
+        report.integrity = [row[0] for row in self._conn.execute('PRAGMA quick_check')]
+        report.steps.append('quick_check')
+
+        # Fold the WAL back so the size reflects the vacuumed file
+        self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        report.steps.append('checkpoint')
+
+        report.size_after = self._file_size()
+        report.pages_after, report.free_pages_after = self._page_counts()
+        if not report.ok:
+            logger.error(f"Database integrity check failed for {self.db_path}: {report.integrity}")
+        return report
+
+    def get_recent_history(self, limit: int = 5) -> List[tuple]:
+        """
+        Get the most recent sync history rows, newest first.
+
+        Returns:
+            List of (sync_time, total_reminders, created, updated, deleted,
+            errors, shard)
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                'SELECT sync_time, total_reminders, created, updated, deleted, errors, shard '
+                'FROM sync_history ORDER BY sync_time DESC LIMIT ?',
+                (limit,)
+            )
+            return cursor.fetchall()
+
+    def get_recent_timings(self, limit: int = 20) -> List[tuple]:
+        """
+        Get phase timings of the most recent timed runs, newest first.
+
+        Returns:
+            List of (sync_time, *milliseconds) in TIMING_KEYS order
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                f'SELECT sync_time, {self._TIMING_COLUMNS} FROM sync_history '
+                'WHERE total_ms IS NOT NULL ORDER BY sync_time DESC LIMIT ?',
+                (limit,)
+            )
+            return cursor.fetchall()
+
+    def get_rollups(self, period: str = 'daily', limit: int = 7) -> List[tuple]:
+        """
+        Get the most recent rollup buckets, newest first.
+
+        Args:
+            period: 'daily' or 'hourly'
+            limit: Number of buckets to return
+
+        Returns:
+            List of (bucket, runs, failed_runs, total_reminders, created,
+            updated, deleted, errors)
+        """
+        table = self._ROLLUP_TABLES[period]
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                'SELECT bucket, runs, failed_runs, total_reminders, created, updated, deleted, errors '
+                f'FROM {table} ORDER BY bucket DESC LIMIT ?',
+                (limit,)
+            )
+            return cursor.fetchall()
+
+    def save_sync_stats(self, stats: 'SyncStats', shard: Optional[str] = None):
+        """Save sync statistics to history and fold them into the rollups."""
+        sync_time = datetime.now()
+        counts = (
+            stats.total_reminders,
+            stats.created,
+            stats.updated,
+            stats.deleted,
+            stats.errors
+        )
+        failed = 1 if stats.errors else 0
+        timings = tuple(stats.timings.get(key) for key in TIMING_KEYS)
+
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute(f'''
+                    INSERT INTO sync_history (
+                        sync_time, total_reminders, created, updated, deleted, errors,
+                        {self._TIMING_COLUMNS}, shard
+                    )
+                    VALUES ({', '.join('?' * (7 + len(TIMING_KEYS)))})
+                ''', (sync_time, *counts, *timings, shard))
+
+                for period, bucket in _rollup_buckets(sync_time).items():
+                    self._conn.execute(f'''
+                        INSERT INTO {self._ROLLUP_TABLES[period]} (
+                            bucket, runs, failed_runs, total_reminders, created, updated, deleted, errors
+                        )
+                        VALUES (?, 1, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(bucket) DO UPDATE SET
+                            runs = runs + 1,
+                            failed_runs = failed_runs + excluded.failed_runs,
+                            total_reminders = total_reminders + excluded.total_reminders,
+                            created = created + excluded.created,
+                            updated = updated + excluded.updated,
+                            deleted = deleted + excluded.deleted,
+                            errors = errors + excluded.errors
+                    ''', (bucket, failed, *counts))
+
+    def prune_history(self, retention_days: int, hourly_rollup_days: int = 90) -> int:
+        """Delete old sync_history rows and hourly rollups in one transaction."""
+        if retention_days <= 0:
+            return 0
+
+        now = datetime.now()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    'DELETE FROM sync_history WHERE sync_time < ?',
+                    (now - timedelta(days=retention_days),)
+                )
+                deleted = cursor.rowcount
+                if hourly_rollup_days > 0:
+                    self._conn.execute(
+                        'DELETE FROM sync_rollup_hourly WHERE bucket < ?',
+                        ((now - timedelta(days=hourly_rollup_days)).strftime('%Y-%m-%d %H:00'),)
+                    )
+
+        if deleted:
+            logger.debug(f"Pruned {deleted} sync history rows older than {retention_days} days")
+        return deleted
+
+
+class MemoryMappingStore(MappingStore):
+    """In-memory mapping store for tests and benchmarks. Nothing is persisted."""
+
+    backend = 'memory'
+
+    def __init__(self, options: Optional[Dict] = None):
+        """
+        Initialize an empty store.
+
+        Args:
+            options: Optional `database:` config section (write_batch_size)
+        """
+        super().__init__(options)
+        self._records: Dict[str, MappingRecord] = {}
+        # (sync_time, total_reminders, created, updated, deleted, errors,
+        # timings, shard), where timings is a tuple in TIMING_KEYS order or
+        # None and shard is the list title of a sharded run or None
+        self._history: List[tuple] = []
+        # period -> bucket -> [runs, failed_runs, total_reminders, created,
+        # updated, deleted, errors]
+        self._rollups: Dict[str, Dict[str, List[int]]] = {'hourly': {}, 'daily': {}}
+        self._meta: Dict[str, str] = {}
+        self._pending_ops: Dict[str, PendingOperation] = {}
+        self._stored_checkpoint: Optional[SyncCheckpoint] = None
+        self._processed: Set[str] = set()
+
+    def _write_batch(
+        self,
+        upserts: List[MappingRecord],
+        deletes: List[str],
+        checkpoint: Optional[SyncCheckpoint] = None,
+        processed: List[str] = ()
+    ):
+        for uuid in deletes:
+            self._records.pop(uuid, None)
+        for record in upserts:
+            self._records[record.reminder_uuid] = record
+        if checkpoint is not None:
+            self._stored_checkpoint = checkpoint
+            self._processed.update(processed)
+
+    def get_mapping(self, reminder_uuid: str) -> Optional[MappingRecord]:
+        """Get the full mapping record for a reminder UUID."""
+        with self._lock:
+            self.flush()
+            return self._records.get(reminder_uuid)
+
+    def find_by_event_id(self, event_id: str) -> Optional[MappingRecord]:
+        """Reverse lookup: get the mapping for a Google Calendar event ID."""
+        with self._lock:
+            self.flush()
+            return next((r for r in self._records.values() if r.event_id == event_id), None)
+
+    def get_stale_mappings(self, synced_before: datetime, limit: int = 100) -> List[MappingRecord]:
+        """Get mappings not synced since `synced_before`, oldest first."""
+        with self._lock:
+            self.flush()
+            stale = [r for r in self._records.values() if r.last_synced < synced_before]
+        return sorted(stale, key=lambda r: r.last_synced)[:limit]
+
+    def load_index(self) -> Dict[str, MappingRecord]:
+        """
+        Load every mapping in a single pass.
+
+        Returns:
+            Dict of reminder UUID -> MappingRecord
+        """
+        with self._lock:
+            self.flush()
+            return dict(self._records)
+
+    def count_mappings(self) -> int:
+        """Get the number of stored mappings."""
+        with self._lock:
+            self.flush()
+            return len(self._records)
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a stored metadata value."""
+        with self._lock:
+            return self._meta.get(key, default)
+
+    def set_meta(self, key: str, value: str):
+        """Store a metadata value."""
+        with self._lock:
+            self._meta[key] = value
+
+    def load_pending_ops(self) -> Dict[str, PendingOperation]:
+        """Return a copy of the retry queue."""
+        with self._lock:
+            return dict(self._pending_ops)
+
+    def save_pending_op(self, op: PendingOperation):
+        """Add or replace the queued retry for a reminder."""
+        with self._lock:
+            self._pending_ops[op.reminder_uuid] = op
+
+    def delete_pending_op(self, reminder_uuid: str):
+        """Remove a reminder's queued retry, if any."""
+        with self._lock:
+            self._pending_ops.pop(reminder_uuid, None)
+
+    def load_checkpoint(self) -> Optional[Tuple[SyncCheckpoint, Set[str]]]:
+        """Return the stored checkpoint and a copy of its processed UUIDs, or None."""
+        with self._lock:
+            self.flush()
+            if self._stored_checkpoint is None:
+                return None
+            return self._stored_checkpoint, set(self._processed)
+
+    def clear_checkpoint(self):
+        """Forget the current checkpoint once its run has finished."""
+        with self._lock:
+            self.flush()
+            self._stored_checkpoint = None
+            self._processed = set()
+
+    def _record_stats(
+        self,
+        sync_time: datetime,
+        counts: tuple,
+        timings: Optional[tuple] = None,
+        rollup: bool = True,
+        shard: Optional[str] = None
+    ):
+        """Append a history row and, unless replaying a snapshot, add it to the rollups."""
+        self._history.append((sync_time, *counts, timings, shard))
+        if not rollup:
+            return
+        failed = 1 if counts[-1] else 0
+        for period, bucket in _rollup_buckets(sync_time).items():
+            totals = self._rollups[period].setdefault(bucket, [0] * 7)
+            for i, value in enumerate((1, failed, *counts)):
+                totals[i] += value
+
+    def save_sync_stats(self, stats: 'SyncStats', shard: Optional[str] = None):
+        """Save sync statistics to history and fold them into the rollups."""
+        counts = (stats.total_reminders, stats.created, stats.updated, stats.deleted, stats.errors)
+        with self._lock:
+            self.flush()
+            self._record_stats(datetime.now(), counts, self._timings_of(stats), shard=shard)
+
+    @staticmethod
+    def _timings_of(stats: 'SyncStats') -> Optional[tuple]:
+        if not stats.timings:
+            return None
+        return tuple(stats.timings.get(key) for key in TIMING_KEYS)
+
+    def get_recent_history(self, limit: int = 5) -> List[tuple]:
+        """
+        Get the most recent sync history rows, newest first.
+
+        Returns:
+            List of (sync_time, total_reminders, created, updated, deleted,
+            errors, shard)
+        """
+        with self._lock:
+            rows = sorted(self._history, key=lambda row: row[0], reverse=True)[:limit]
+        # Same text form SQLite stores TIMESTAMP values in
+        return [(str(row[0]), *row[1:6], row[7]) for row in rows]
+
+    def get_recent_timings(self, limit: int = 20) -> List[tuple]:
+        """
+        Get phase timings of the most recent timed runs, newest first.
+
+        Returns:
+            List of (sync_time, *milliseconds) in TIMING_KEYS order
+        """
+        with self._lock:
+            rows = sorted(
+                (row for row in self._history if row[6] is not None),
+                key=lambda row: row[0],
+                reverse=True
+            )[:limit]
+        return [(str(row[0]), *row[6]) for row in rows]
+
+    def get_rollups(self, period: str = 'daily', limit: int = 7) -> List[tuple]:
+        """
+        Get the most recent rollup buckets, newest first.
+
+        Args:
+            period: 'daily' or 'hourly'
+            limit: Number of buckets to return
+
+        Returns:
+            List of (bucket, runs, failed_runs, total_reminders, created,
+            updated, deleted, errors)
+        """
+        with self._lock:
+            buckets = self._rollups[period]
+            return [(bucket, *buckets[bucket]) for bucket in sorted(buckets, reverse=True)[:limit]]
+
+    def _prune(self, history_before: datetime, hourly_before: Optional[str]) -> int:
+        """Drop history rows before `history_before` and hourly buckets before `hourly_before`."""
+        kept = [row for row in self._history if row[0] >= history_before]
+        deleted = len(self._history) - len(kept)
+        self._history = kept
+        if hourly_before is not None:
+            hourly = self._rollups['hourly']
+            for bucket in [b for b in hourly if b < hourly_before]:
+                del hourly[bucket]
+        return deleted
+
+    @staticmethod
+    def _prune_cutoffs(retention_days: int, hourly_rollup_days: int) -> tuple:
+        now = datetime.now()
+        hourly_before = None
+        if hourly_rollup_days > 0:
+            hourly_before = _rollup_buckets(now - timedelta(days=hourly_rollup_days))['hourly']
+        return now - timedelta(days=retention_days), hourly_before
+
+    def prune_history(self, retention_days: int, hourly_rollup_days: int = 90) -> int:
+        """Drop old history rows and hourly rollups."""
+        if retention_days <= 0:
+            return 0
+        with self._lock:
+            return self._prune(*self._prune_cutoffs(retention_days, hourly_rollup_days))
+
+
+def _encode_timestamp(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else None
+
+
+class JournalMappingStore(MemoryMappingStore):
+    """
+    Mapping store backed by an append-only JSON lines journal.
+
+    Every flush appends one line per change and fsyncs, so the file is only
+    ever appended to or atomically replaced. That suits a mapping file on
+    iCloud Drive: there are no -wal/-shm side files or byte-range locks for
+    the file provider to mishandle. The journal is replayed into memory on
+    open and compacted into a snapshot once it grows to `compact_ratio` times
+    the number of live entries.
+    """
+
+    backend = 'journal'
+
+    DEFAULT_OPTIONS = {
+        **MappingStore.DEFAULT_OPTIONS,
+        'fsync': True,                  # fsync after every flush
+        'compact_min_entries': 1000,    # Never compact smaller journals
+        'compact_ratio': 2.0,           # Compact when lines > ratio * live entries
+    }
+
+    def __init__(self, journal_path: str, options: Optional[Dict] = None):
+        """
+        Open (or create) a journal and replay it.
+
+        Args:
+            journal_path: Path to the journal file
+            options: Optional `database:` config section (write_batch_size,
+                fsync, compact_min_entries, compact_ratio)
+        """
+        super().__init__(options)
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._entries = 0
+
+        damaged = self._replay()
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        if damaged:
+            # Rewrite without the unreadable lines so later appends start on
+            # a clean line
+            self._compact()
+        logger.debug(f"Journal opened at {self.journal_path} ({len(self._records)} mappings)")
+
+    def _replay(self) -> int:
+        """Load the journal into memory. Returns the number of unreadable lines."""
+        if not self.journal_path.exists():
+            return 0
+
+        damaged = 0
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    self._apply_entry(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    # Typically a torn final line from an interrupted write
+                    damaged += 1
+                    logger.warning(f"Skipping unreadable journal entry in {self.journal_path}: {e}")
+                    continue
+                self._entries += 1
+        return damaged
+
+    def _apply_entry(self, entry: Dict):
+        op = entry['op']
+        if op == 'put':
+            record = self._decode_record(entry)
+            self._records[record.reminder_uuid] = record
+        elif op == 'del':
+            self._records.pop(entry['uuid'], None)
+        elif op in ('stats', 'history'):
+            # 'history' rows come from a snapshot whose rollups are stored separately
+            timings = entry.get('timings')
+            self._record_stats(
+                datetime.fromisoformat(entry['time']),
+                tuple(entry['counts']),
+                tuple(timings) if timings is not None else None,
+                rollup=op == 'stats',
+                shard=entry.get('shard')
+            )
+        elif op == 'rollup':
+            self._rollups[entry['period']][entry['bucket']] = list(entry['totals'])
+        elif op == 'meta':
+            self._meta[entry['key']] = entry['value']
+        elif op == 'pending':
+            pending = self._decode_pending(entry)
+            self._pending_ops[pending.reminder_uuid] = pending
+        elif op == 'unpending':
+            self._pending_ops.pop(entry['uuid'], None)
+        elif op == 'checkpoint':
+            self._stored_checkpoint = SyncCheckpoint(
+                entry['run_id'], datetime.fromisoformat(entry['started']), *entry['counts'], entry.get('shard')
+            )
+            self._processed.update(entry['processed'])
+        elif op == 'checkpoint_clear':
+            self._stored_checkpoint = None
+            self._processed = set()
+        elif op == 'prune':
+            self._prune(datetime.fromisoformat(entry['history_before']), entry['hourly_before'])
+        else:
+            raise ValueError(f"unknown op {op!r}")
+
+    @staticmethod
+    def _encode_record(record: MappingRecord) -> Dict:
+        entry = {
+            'op': 'put',
+            'uuid': record.reminder_uuid,
+            'event_id': record.event_id,
+            'last_synced': _encode_timestamp(record.last_synced),
+            'last_modified': _encode_timestamp(record.last_modified),
+            'checksum_version': record.checksum_version,
+        }
+        if record.calendar_id is not None:
+            entry['calendar_id'] = record.calendar_id
+        if record.list_title is not None:
+            entry['list_title'] = record.list_title
+        if record.fingerprint is not None:
+            entry['fingerprint_hex'] = record.fingerprint.hex()
+        if isinstance(record.checksum, bytes):
+            entry['checksum_hex'] = record.checksum.hex()
+        else:
+            entry['checksum'] = record.checksum
+        return entry
+
+    @staticmethod
+    def _decode_record(entry: Dict) -> MappingRecord:
+        checksum = entry.get('checksum')
+        if 'checksum_hex' in entry:
+            checksum = bytes.fromhex(entry['checksum_hex'])
+        return MappingRecord(
+            entry['uuid'],
+            entry['event_id'],
+            _parse_timestamp(entry['last_synced']),
+            _parse_timestamp(entry['last_modified']),
+            checksum,
+            entry['checksum_version'],
+            entry.get('calendar_id'),
+            entry.get('list_title'),
+            bytes.fromhex(entry['fingerprint_hex']) if 'fingerprint_hex' in entry else None
+        )
+
+    @staticmethod
+    def _encode_pending(pending: PendingOperation) -> Dict:
+        return {
+            'op': 'pending',
+            'uuid': pending.reminder_uuid,
+            'kind': pending.kind,
+            'event_id': pending.event_id,
+            'attempts': pending.attempts,
+            'next_attempt': pending.next_attempt.isoformat(),
+            'last_error': pending.last_error,
+        }
+
+    @staticmethod
+    def _decode_pending(entry: Dict) -> PendingOperation:
+        return PendingOperation(
+            entry['uuid'],
+            entry['kind'],
+            entry['event_id'],
+            entry['attempts'],
+            datetime.fromisoformat(entry['next_attempt']),
+            entry['last_error']
+        )
+
+    def _append(self, entries: List[Dict]):
+        """Append entries as one write, make them durable, and compact when due."""
+        self._file.write(''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries))
+        self._file.flush()
+        if self.options['fsync']:
+            os.fsync(self._file.fileno())
+        self._entries += len(entries)
+
+        live = (
+            len(self._records) + len(self._history) + len(self._meta) + len(self._pending_ops)
+            + sum(len(b) for b in self._rollups.values())
+        )
+        threshold = max(int(self.options['compact_min_entries']), self.options['compact_ratio'] * live)
+        if self._entries > threshold:
+            self._compact()
+
+    @staticmethod
+    def _checkpoint_entry(checkpoint: SyncCheckpoint, processed: Iterable[str]) -> Dict:
+        return {
+            'op': 'checkpoint',
+            'run_id': checkpoint.run_id,
+            'started': checkpoint.started.isoformat(),
+            'counts': [checkpoint.created, checkpoint.updated, checkpoint.deleted],
+            'processed': list(processed),
+            'shard': checkpoint.shard,
+        }
+
+    def _write_batch(
+        self,
+        upserts: List[MappingRecord],
+        deletes: List[str],
+        checkpoint: Optional[SyncCheckpoint] = None,
+        processed: List[str] = ()
+    ):
+        entries = [{'op': 'del', 'uuid': uuid} for uuid in deletes]
+        entries.extend(self._encode_record(record) for record in upserts)
+        if checkpoint is not None:
+            # Last in the same write: a torn append loses the checkpoint
+            # rather than claiming mappings that did not make it
+            entries.append(self._checkpoint_entry(checkpoint, processed))
+        # Apply in memory first so the compaction check sees the new state;
+        # the journal is the source of truth on the next open.
+        super()._write_batch(upserts, deletes, checkpoint, processed)
+        self._append(entries)
+
+    def clear_checkpoint(self):
+        """Forget the current checkpoint once its run has finished."""
+        with self._lock:
+            had_checkpoint = self.load_checkpoint() is not None
+            super().clear_checkpoint()
+            if had_checkpoint:
+                self._append([{'op': 'checkpoint_clear'}])
+
+    def save_sync_stats(self, stats: 'SyncStats', shard: Optional[str] = None):
+        """Save sync statistics to history and fold them into the rollups."""
+        sync_time = datetime.now()
+        counts = (stats.total_reminders, stats.created, stats.updated, stats.deleted, stats.errors)
+        timings = self._timings_of(stats)
+        with self._lock:
+            self.flush()
+            self._record_stats(sync_time, counts, timings, shard=shard)
+            self._append([self._stats_entry('stats', sync_time, counts, timings, shard)])
+
+    @staticmethod
+    def _stats_entry(
+        op: str, sync_time: datetime, counts: tuple, timings: Optional[tuple], shard: Optional[str] = None
+    ) -> Dict:
+        entry = {'op': op, 'time': sync_time.isoformat(), 'counts': list(counts)}
+        if timings is not None:
+            entry['timings'] = list(timings)
+        if shard is not None:
+            entry['shard'] = shard
+        return entry
+
+    def set_meta(self, key: str, value: str):
+        """Store a metadata value."""
+        with self._lock:
+            super().set_meta(key, value)
+            self._append([{'op': 'meta', 'key': key, 'value': value}])
+
+    def save_pending_op(self, op: PendingOperation):
+        """Add or replace the queued retry for a reminder. Written immediately."""
+        with self._lock:
+            super().save_pending_op(op)
+            self._append([self._encode_pending(op)])
+
+    def delete_pending_op(self, reminder_uuid: str):
+        """Remove a reminder's queued retry, if any. Written immediately."""
+        with self._lock:
+            if reminder_uuid in self._pending_ops:
+                super().delete_pending_op(reminder_uuid)
+                self._append([{'op': 'unpending', 'uuid': reminder_uuid}])
+
+    def _maintain(self) -> MaintenanceReport:
+        """Compact the journal; a successful replay is its integrity check."""
+        report = MaintenanceReport(self.backend, size_before=self.journal_path.stat().st_size)
+        self._compact()
+        report.steps.append('compact')
+        report.size_after = self.journal_path.stat().st_size
+        return report
+
+    def prune_history(self, retention_days: int, hourly_rollup_days: int = 90) -> int:
+        """Prune in memory and journal the cutoffs, so a replay prunes the same rows."""
+        if retention_days <= 0:
+            return 0
+        with self._lock:
+            history_before, hourly_before = self._prune_cutoffs(retention_days, hourly_rollup_days)
+            deleted = self._prune(history_before, hourly_before)
+            if deleted:
+                self._append([{
+                    'op': 'prune',
+                    'history_before': history_before.isoformat(),
+                    'hourly_before': hourly_before,
+                }])
+        return deleted
+
+    def compact(self):
+        """Flush buffered writes and rewrite the journal as a snapshot."""
+        with self._lock:
+            self.flush()
+            self._compact()
+
+    def _compact(self):
+        with self._lock:
+            entries = [self._encode_record(record) for record in self._records.values()]
+            entries.extend(
+                self._stats_entry('history', row[0], row[1:6], row[6], row[7])
+                for row in self._history
+            )
+            entries.extend(
+                {'op': 'rollup', 'period': period, 'bucket': bucket, 'totals': totals}
+                for period, buckets in self._rollups.items()
+                for bucket, totals in buckets.items()
+            )
+            entries.extend({'op': 'meta', 'key': key, 'value': value} for key, value in self._meta.items())
+            entries.extend(self._encode_pending(pending) for pending in self._pending_ops.values())
+            if self._stored_checkpoint is not None:
+                entries.append(self._checkpoint_entry(self._stored_checkpoint, self._processed))
+
+            # Write a sibling file and atomically swap it in, so a crash
+            # leaves either the old journal or the complete snapshot
+            tmp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.journal_path)
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+            previous, self._entries = self._entries, len(entries)
+        logger.debug(f"Compacted journal {self.journal_path}: {previous} -> {len(entries)} entries")
+
+    def close(self):
+        """Flush buffered writes and close the journal. Safe to call more than once."""
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self.flush()
+                finally:
+                    self._file.close()
+                    self._file = None
+                logger.debug(f"Journal closed: {self.journal_path}")
+
+
+def open_mapping_store(db_config: Optional[Dict] = None, base_dir: Optional[Path] = None) -> MappingStore:
+    """
+    Create the mapping store selected by `database.backend`.
+
+    Args:
+        db_config: The `database:` section of config.yaml
+        base_dir: Directory that relative paths are resolved against
+            (defaults to the working directory)
+
+    Returns:
+        MappingDatabase ('sqlite', the default), JournalMappingStore
+        ('journal') or MemoryMappingStore ('memory')
+    """
+    db_config = db_config or {}
+    backend = db_config.get('backend', 'sqlite')
+
+    def resolve(path: str) -> Path:
+        path = Path(path)
+        return path if base_dir is None or path.is_absolute() else Path(base_dir) / path
+
+    if backend == 'sqlite':
+        return MappingDatabase(str(resolve(db_config.get('path', 'data/mapping.db'))), db_config)
+    if backend == 'journal':
+        return JournalMappingStore(str(resolve(db_config.get('journal_path', 'data/mapping.journal'))), db_config)
+    if backend == 'memory':
+        return MemoryMappingStore(db_config)
+    raise ValueError(f"Unknown database backend: {backend!r} (expected sqlite, journal or memory)")
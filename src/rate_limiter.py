@@ -0,0 +1,289 @@
+"""
+Request pacing for the Google Calendar API.
+
+TokenBucket spaces requests to a steady rate with a bounded burst.
+AdaptiveRateLimiter wraps it with an additive-increase/multiplicative-decrease
+(AIMD) controller: rate-limit responses (429, or 403 rateLimitExceeded) halve
+the allowed concurrency and request rate and honour Retry-After, while runs
+of successful requests grow them back towards the configured ceiling.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# 403 reasons the Calendar API uses for quota, as opposed to permissions
+RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded', b'quotaExceeded')
+
+
+def is_rate_limited(error: HttpError) -> bool:
+    """Whether an API error is a rate-limit response worth retrying."""
+    status = getattr(error.resp, 'status', None)
+    if status == 429:
+        return True
+    if status == 403:
+        content = error.content or b''
+        if isinstance(content, str):
+            content = content.encode('utf-8', 'replace')
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+    return False
+
+
+def retry_after_seconds(error: HttpError) -> Optional[float]:
+    """Parse the Retry-After header (seconds or HTTP date) of an API error."""
+    try:
+        value = error.resp.get('retry-after')
+    except AttributeError:
+        return None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity; requests that may run back to back
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, keeping the tokens already earned."""
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = float(rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until they are available.
+
+        Tokens are reserved up front (the balance may go negative), so
+        waiters are served in arrival order without polling.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket plus an AIMD concurrency limit, shared by all request threads.
+
+    Use execute(request) in place of request.execute(). Rate-limited
+    requests are retried up to `max_retries` times after Retry-After (or an
+    exponential backoff with jitter when the header is missing).
+    """
+
+    DEFAULT_OPTIONS = {
+        'requests_per_second': 5.0,
+        'burst': 10,
+        'max_concurrency': 8,
+        'min_requests_per_second': 0.5,
+        'max_retries': 5,
+        'backoff_base': 1.0,
+        'backoff_max': 60.0,
+    }
+
+    def __init__(
+        self,
+        options: Optional[Dict] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            options: Overrides for DEFAULT_OPTIONS (google_calendar.rate_limit)
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.options = {**self.DEFAULT_OPTIONS, **(options or {})}
+        self.max_rate = float(self.options['requests_per_second'])
+        self.min_rate = min(self.max_rate, float(self.options['min_requests_per_second']))
+        self.max_concurrency = max(1, int(self.options['max_concurrency']))
+        self.bucket = TokenBucket(self.max_rate, self.options['burst'], clock, sleep)
+        self._clock = clock
+        self._sleep = sleep
+
+        self._cond = threading.Condition()
+        self.concurrency = self.max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        # Throttles arriving together are one signal: decrease once per window
+        self._hold_until = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def _acquire_slot(self):
+        with self._cond:
+            while self._in_flight >= self.concurrency:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def _release_slot(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _wait_for_pause(self):
+        while True:
+            with self._cond:
+                wait = self._paused_until - self._clock()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+    def on_success(self):
+        """Additive increase: one step per `concurrency` successful requests."""
+        with self._cond:
+            self._successes += 1
+            if self._successes < self.concurrency:
+                return
+            self._successes = 0
+            if self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._cond.notify_all()
+            rate = min(self.max_rate, self.rate + self.max_rate / 10)
+        if rate != self.rate:
+            self.bucket.set_rate(rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease, and pause every request for Retry-After."""
+        with self._cond:
+            self.throttled += 1
+            now = self._clock()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if now < self._hold_until:
+                return
+            self._hold_until = now + max(retry_after or 0.0, 1.0)
+            self._successes = 0
+            self.concurrency = max(1, self.concurrency // 2)
+            rate = max(self.min_rate, self.rate / 2)
+        self.bucket.set_rate(rate)
+        logger.warning(
+            f"Calendar API rate limit hit; concurrency {self.concurrency}, {rate:.2f} requests/s"
+            + (f", retrying after {retry_after:.1f}s" if retry_after else "")
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.options['backoff_max'], self.options['backoff_base'] * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def execute(self, request, cost: int = 1):
+        """
+        Execute an API request under the limiter.
+
+        Args:
+            request: googleapiclient HttpRequest (anything with execute())
+            cost: Requests it counts as against the rate (a batch counts
+                each request it carries)
+
+        Returns:
+            The request's response
+
+        Raises:
+            HttpError: Non-rate-limit errors, or a rate limit that persists
+                after max_retries retries
+        """
+        attempt = 0
+        while True:
+            self._wait_for_pause()
+            self._acquire_slot()
+            try:
+                self.bucket.acquire(cost)
+                response = request.execute()
+            except HttpError as e:
+                if not is_rate_limited(e):
+                    raise
+                retry_after = retry_after_seconds(e)
+                self.on_throttle(retry_after)
+                if attempt >= self.options['max_retries']:
+                    raise
+            else:
+                self.on_success()
+                return response
+            finally:
+                self._release_slot()
+
+            if not retry_after:
+                # No wait from the server (absent or zero): back off ourselves
+                self._sleep(self._backoff(attempt))
+            attempt += 1
+            self.retries += 1
+
+
+def build_rate_limiter(config: Dict) -> Optional[AdaptiveRateLimiter]:
+    """
+    Create the limiter described by `google_calendar.rate_limit`.
+
+    Concurrency defaults to `sync.max_workers`.
+
+    Args:
+        config: Full configuration dict
+
+    Returns:
+        AdaptiveRateLimiter, or None when `rate_limit.enabled` is false
+    """
+    options = dict(config.get('google_calendar', {}).get('rate_limit') or {})
+    if not options.pop('enabled', True):
+        return None
+    options.setdefault('max_concurrency', config.get('sync', {}).get('max_workers', 1))
+    return AdaptiveRateLimiter(options)
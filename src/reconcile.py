@@ -0,0 +1,163 @@
+"""
+Rebuild or verify the mapping store from the events on Google Calendar.
+
+Every event the sync creates carries its reminder's UUID as the private
+extended property `reminderUUID`. reconcile() pages through each synced
+calendar with events.list (LIST_PAGE_SIZE events and a `fields` projection
+per request, so a pass costs about N/2500 calls for N events) and compares
+what it finds with the mapping table:
+
+- orphaned: an event whose reminder has no mapping, e.g. after the
+  database was lost or restored from an old backup
+- missing: a mapping whose event no longer exists
+- duplicates: several events carrying the same reminder UUID
+- repointed: a mapping whose event is elsewhere than recorded
+
+With rebuild=True the mapping table is brought in line: orphans and
+repointed mappings are saved against the event found, missing mappings
+are dropped so the next sync recreates their events. Rebuilt mappings
+carry no checksum, so the next sync rewrites each of those events once.
+Duplicate events are only reported; choosing which to delete is left to
+the user.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from gcal_writer import GoogleCalendarWriter, LIST_PAGE_SIZE
+from mapping_store import MappingStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    """Result of reconcile()."""
+    calendars: int = 0
+    # events.list requests made, one per page
+    pages: int = 0
+    events_scanned: int = 0
+    # Events carrying a reminderUUID
+    tagged: int = 0
+    matched: int = 0
+    orphaned: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    # Reminder UUID -> IDs of the events not kept
+    duplicates: Dict[str, List[str]] = field(default_factory=dict)
+    repointed: List[str] = field(default_factory=list)
+    rebuilt: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not (self.orphaned or self.missing or self.duplicates or self.repointed)
+
+    def __str__(self):
+        return (
+            f"Reconcile: {self.events_scanned} events in {self.calendars} calendar(s), "
+            f"{self.pages} requests; {self.matched} matched, {len(self.orphaned)} orphaned, "
+            f"{len(self.missing)} missing, {len(self.duplicates)} duplicated, "
+            f"{len(self.repointed)} repointed" + (" (mappings rebuilt)" if self.rebuilt else "")
+        )
+
+
+def synced_calendars(config: Dict) -> List[Optional[str]]:
+    """
+    Calendars the sync writes to: the default one and every routed one.
+
+    Args:
+        config: Full configuration dict
+
+    Returns:
+        Calendar IDs, None standing for the default calendar (as in
+        MappingRecord.calendar_id)
+    """
+    google = config.get('google_calendar', {})
+    default = google.get('calendar_id', 'primary')
+    routed = (google.get('routes') or {}).values()
+    return [None] + list(dict.fromkeys(calendar_id for calendar_id in routed if calendar_id != default))
+
+
+def reconcile(
+    writer: GoogleCalendarWriter,
+    db: MappingStore,
+    calendar_ids: Optional[List[Optional[str]]] = None,
+    rebuild: bool = False,
+    page_size: int = LIST_PAGE_SIZE
+) -> ReconcileReport:
+    """
+    Compare the mapping store with the events on the synced calendars.
+
+    Pages are consumed as they arrive; only (event ID, calendar, updated)
+    is kept per tagged event.
+
+    Args:
+        writer: Calendar writer; its calendar_id is the default calendar
+        db: Mapping store to verify or rebuild
+        calendar_ids: Calendars to scan, None for the default (see
+            synced_calendars()); defaults to the default calendar only
+        rebuild: Rewrite the mapping table to match the calendars
+        page_size: Events per events.list request
+
+    Returns:
+        ReconcileReport
+
+    Raises:
+        HttpError: A calendar could not be listed; nothing is rebuilt
+            from a partial listing
+    """
+    report = ReconcileReport()
+    index = db.load_index()
+    # Reminder UUID -> [(event ID, calendar ID, updated)]
+    found: Dict[str, List[Tuple[str, Optional[str], str]]] = {}
+
+    for calendar_id in calendar_ids or [None]:
+        report.calendars += 1
+        for page in writer.iter_event_pages(calendar_id, page_size):
+            report.pages += 1
+            report.events_scanned += len(page)
+            for event in page:
+                uuid = event.get('extendedProperties', {}).get('private', {}).get('reminderUUID')
+                if uuid:
+                    report.tagged += 1
+                    found.setdefault(uuid, []).append((event['id'], calendar_id, event.get('updated', '')))
+        logger.info(f"Listed {calendar_id or writer.calendar_id}: {report.events_scanned} events so far")
+
+    # The mapped event wins over duplicates, else the most recently updated
+    with db.buffered_writes():
+        for uuid, events in found.items():
+            mapping = index.get(uuid)
+            mapped = mapping and (mapping.event_id, mapping.calendar_id)
+            keep = next(
+                (event for event in events if event[:2] == mapped),
+                max(events, key=lambda event: event[2])
+            )
+            if len(events) > 1:
+                report.duplicates[uuid] = [event[0] for event in events if event is not keep]
+            event_id, calendar_id, _ = keep
+
+            if mapping is None:
+                report.orphaned.append(uuid)
+            elif keep[:2] != mapped:
+                report.repointed.append(uuid)
+            else:
+                report.matched += 1
+                continue
+            if rebuild:
+                # No checksum: the next sync rewrites the event from the reminder
+                db.save_mapping(
+                    uuid, event_id, calendar_id=calendar_id, list_title=mapping.list_title if mapping else None
+                )
+
+        # Mappings into calendars that were not scanned cannot be checked
+        scanned = set(calendar_ids or [None])
+        for uuid in sorted(index.keys() - found.keys()):
+            if index[uuid].calendar_id not in scanned:
+                continue
+            report.missing.append(uuid)
+            if rebuild:
+                db.delete_mapping(uuid)
+
+    report.rebuilt = rebuild
+    logger.info(str(report))
+    return report
@@ -3,8 +3,10 @@ Apple Reminders reader using EventKit framework.
 """
 
 import logging
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 import EventKit
 from Foundation import NSDate, NSPredicate
 
@@ -108,6 +110,9 @@ class Reminder:
 class RemindersReader:
     """Read reminders from Apple Reminders app using EventKit."""
 
+    # Seconds to wait for an EventKit fetch to call back
+    FETCH_TIMEOUT = 30.0
+
     def __init__(self):
         """Initialize EventKit event store."""
         self.event_store = EventKit.EKEventStore.alloc().init()
@@ -136,7 +141,6 @@ class RemindersReader:
             )
 
             # Note: In a real app, this would be async. For CLI, we assume user grants permission.
-            import time
             time.sleep(1)  # Give time for dialog to appear
 
         elif auth_status == EventKit.EKAuthorizationStatusAuthorized:
@@ -159,81 +163,148 @@ class RemindersReader:
         calendars = self.event_store.calendarsForEntityType_(EventKit.EKEntityTypeReminder)
         return [str(cal.title()) for cal in calendars]
 
-    def fetch_reminders(self, calendar_names: Optional[List[str]] = None) -> List[Reminder]:
+    def _calendars(self, calendar_names: Optional[List[str]]) -> list:
+        """Resolve calendar names to EKCalendar objects (None = all calendars)."""
+        all_calendars = self.event_store.calendarsForEntityType_(EventKit.EKEntityTypeReminder)
+        if not calendar_names:
+            return list(all_calendars)
+        return [cal for cal in all_calendars if str(cal.title()) in calendar_names]
+
+    def _fetch_matching(self, predicate, label: str):
         """
-        Fetch reminders from specified calendars.
+        Run an EventKit fetch and block until its completion handler fires.
 
-        Args:
-            calendar_names: List of calendar names to fetch from (None = all calendars)
+        Returns the NSArray EventKit hands over rather than a Python copy of
+        it, so the proxies are created one at a time as the caller iterates.
 
-        Returns:
-            List of Reminder objects
+        Raises:
+            TimeoutError: EventKit did not call back within FETCH_TIMEOUT; an
+                empty result would read as every reminder having been deleted
         """
-        # Get calendars to query
-        all_calendars = self.event_store.calendarsForEntityType_(EventKit.EKEntityTypeReminder)
+        found = []
+        done = threading.Event()
 
-        if calendar_names:
-            calendars = [
-                cal for cal in all_calendars
-                if str(cal.title()) in calendar_names
-            ]
-            if not calendars:
-                logger.warning(f"No calendars found matching: {calendar_names}")
-                return []
-        else:
-            calendars = list(all_calendars)
+        def completion_handler(ek_reminders):
+            if ek_reminders:
+                found.append(ek_reminders)
+            done.set()
 
-        logger.info(f"Fetching reminders from {len(calendars)} calendar(s)")
-
-        # Fetch incomplete reminders
-        incomplete_predicate = self.event_store.predicateForIncompleteRemindersWithDueDateStarting_ending_calendars_(
-            None,  # Start date (None = no limit)
-            None,  # End date (None = no limit)
-            calendars
+        self.event_store.fetchRemindersMatchingPredicate_completion_(
+            predicate,
+            completion_handler
         )
 
-        # Fetch completed reminders
-        completed_predicate = self.event_store.predicateForCompletedRemindersWithCompletionDateStarting_ending_calendars_(
-            None,  # Start date (None = no limit)
-            None,  # End date (None = no limit)
-            calendars
-        )
+        if not done.wait(self.FETCH_TIMEOUT):
+            raise TimeoutError(f"Timed out after {self.FETCH_TIMEOUT}s waiting for {label} reminders")
 
-        # Collect reminders
-        all_reminders = []
+        reminders_found = found[0] if found else []
+        logger.info(f"Found {len(reminders_found)} {label} reminders")
+        return reminders_found
 
-        # Note: fetchRemindersMatchingPredicate is async in real usage
-        # For simplicity, we use a synchronous approach here
-        def fetch_with_predicate(predicate, label):
-            reminders_found = []
+    def iter_reminders(
+        self,
+        calendar_names: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Iterator[Reminder]:
+        """
+        Yield reminders from specified calendars as soon as each fetch completes.
 
-            def completion_handler(ek_reminders):
-                if ek_reminders:
-                    reminders_found.extend(ek_reminders)
+        Incomplete reminders are yielded before completed ones are fetched,
+        so a consumer can start work while EventKit is still busy.
 
-            self.event_store.fetchRemindersMatchingPredicate_completion_(
-                predicate,
-                completion_handler
-            )
+        Args:
+            calendar_names: List of calendar names to fetch from (None = all calendars)
+            timings: Optional dict that receives the seconds spent converting
+                EventKit objects to Reminder objects under 'convert'
 
-            # Wait for completion (in real app, use proper async handling)
-            import time
-            time.sleep(0.5)
+        Yields:
+            Reminder objects
 
-            logger.info(f"Found {len(reminders_found)} {label} reminders")
-            return reminders_found
+        Raises:
+            TimeoutError: An EventKit fetch did not complete in time
+        """
+        calendars = self._calendars(calendar_names)
+        if not calendars:
+            logger.warning(f"No calendars found matching: {calendar_names}")
+            return
 
-        incomplete = fetch_with_predicate(incomplete_predicate, "incomplete")
-        completed = fetch_with_predicate(completed_predicate, "completed")
+        logger.info(f"Fetching reminders from {len(calendars)} calendar(s)")
 
-        # Convert to Reminder objects
-        for ek_reminder in incomplete + completed:
+        predicates = (
+            # Incomplete reminders
+            ('incomplete', lambda: self.event_store.predicateForIncompleteRemindersWithDueDateStarting_ending_calendars_(
+                None,  # Start date (None = no limit)
+                None,  # End date (None = no limit)
+                calendars
+            )),
+            # Completed reminders
+            ('completed', lambda: self.event_store.predicateForCompletedRemindersWithCompletionDateStarting_ending_calendars_(
+                None,  # Start date (None = no limit)
+                None,  # End date (None = no limit)
+                calendars
+            )),
+        )
+
+        convert_seconds = 0.0
+        try:
+            for label, make_predicate in predicates:
+                for ek_reminder in self._fetch_matching(make_predicate(), label):
+                    # Only the conversion is timed, not the consumer's work
+                    # between yields
+                    start = time.perf_counter()
+                    try:
+                        reminder = Reminder(ek_reminder)
+                    except Exception as e:
+                        logger.error(f"Error processing reminder: {e}")
+                        continue
+                    finally:
+                        convert_seconds += time.perf_counter() - start
+                    yield reminder
+        finally:
+            if timings is not None:
+                timings['convert'] = convert_seconds
+
+    def find_reminders(self, uuids: Iterable[str]) -> Dict[str, Reminder]:
+        """
+        Look reminders up by identifier, in whichever list they are now.
+
+        Args:
+            uuids: Reminder UUIDs (calendar item identifiers)
+
+        Returns:
+            Dict of UUID -> Reminder for the reminders that still exist
+        """
+        found = {}
+        for uuid in uuids:
+            ek_reminder = self.event_store.calendarItemWithIdentifier_(uuid)
+            if ek_reminder is None:
+                continue
             try:
-                reminder = Reminder(ek_reminder)
-                all_reminders.append(reminder)
+                found[uuid] = Reminder(ek_reminder)
             except Exception as e:
-                logger.error(f"Error processing reminder: {e}")
+                logger.error(f"Error processing reminder {uuid}: {e}")
+        return found
+
+    def fetch_reminders(
+        self,
+        calendar_names: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[Reminder]:
+        """
+        Fetch reminders from specified calendars.
+
+        Args:
+            calendar_names: List of calendar names to fetch from (None = all calendars)
+            timings: Optional dict that receives the seconds spent converting
+                EventKit objects to Reminder objects under 'convert'
 
+        Returns:
+            List of Reminder objects
+
+        Raises:
+            TimeoutError: An EventKit fetch did not complete in time
+        """
+        all_reminders = list(self.iter_reminders(calendar_names, timings))
         logger.info(f"Total reminders fetched: {len(all_reminders)}")
         return all_reminders
 
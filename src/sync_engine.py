@@ -5,10 +5,45 @@ Sync engine for coordinating reminders to Google Calendar sync.
 import logging
 import sqlite3
 import hashlib
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import uuid4
+from dataclasses import dataclass, field
+
+from gcal_writer import MovedOnly
+
+# Storage lives in mapping_store; names are re-exported for existing imports
+from mapping_store import (  # noqa: F401
+    CHECKSUM_DIGEST_SIZE,
+    CHECKSUM_VERSION,
+    CHECKSUM_VERSION_BLAKE2B,
+    CHECKSUM_VERSION_MD5,
+    META_FULL_VERIFY_REQUESTED,
+    META_SHARD_SYNCED_PREFIX,
+    META_SYNCS_SINCE_FULL_VERIFY,
+    META_SYNCS_SINCE_MAINTENANCE,
+    META_WATERMARK_PREFIX,
+    SCHEMA_VERSION,
+    SYNC_PHASES,
+    TIMING_KEYS,
+    JournalMappingStore,
+    MaintenanceReport,
+    MappingDatabase,
+    MappingRecord,
+    MappingStore,
+    MemoryMappingStore,
+    PendingOperation,
+    SyncCheckpoint,
+    open_mapping_store,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +57,10 @@ class SyncStats:
     deleted: int = 0
     skipped: int = 0
     errors: int = 0
+    # API operations left for the next run when sync.time_budget ran out
+    deferred: int = 0
+    # Milliseconds per SYNC_PHASES entry, plus 'total'
+    timings: Dict[str, int] = field(default_factory=dict)
 
     def __str__(self):
         return (
@@ -29,139 +68,240 @@ class SyncStats:
             f"{self.created} created, {self.updated} updated, "
             f"{self.deleted} deleted, {self.skipped} skipped, "
             f"{self.errors} errors"
+            + (f", {self.deferred} deferred" if self.deferred else "")
         )
 
+    def add(self, other: 'SyncStats'):
+        """Add another run's counts and timings to these."""
+        for name in ('total_reminders', 'created', 'updated', 'deleted', 'skipped', 'errors', 'deferred'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for phase, ms in other.timings.items():
+            self.timings[phase] = self.timings.get(phase, 0) + ms
 
-class MappingDatabase:
-    """SQLite database for tracking reminder-to-event mappings."""
 
-    def __init__(self, db_path: str):
-        """
-        Initialize mapping database.
+# SyncOperation.reason for operations held back by the retry queue's backoff
+BACKOFF_REASON = 'backoff'
 
-        Args:
-            db_path: Path to SQLite database file
-        """
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
-
-    def _init_db(self):
-        """Initialize database schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mappings (
-                    reminder_uuid TEXT PRIMARY KEY,
-                    event_id TEXT NOT NULL,
-                    last_synced TIMESTAMP NOT NULL,
-                    last_modified TIMESTAMP,
-                    checksum TEXT
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sync_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sync_time TIMESTAMP NOT NULL,
-                    total_reminders INTEGER,
-                    created INTEGER,
-                    updated INTEGER,
-                    deleted INTEGER,
-                    errors INTEGER
-                )
-            ''')
+# Event fields an update patches independently: name -> (reminder
+# attributes it is derived from, create_event() arguments it is sent as).
+# Mapping fingerprints hold one digest per field, in this order.
+EVENT_FIELDS = {
+    'summary': (('title',), ('summary',)),
+    'description': (('notes',), ('description',)),
+    'time': (('due_date',), ('start_datetime', 'end_datetime', 'all_day')),
+    'color': (('priority',), ('color_id',)),
+    'location': (('location',), ('location',)),
+}
+FIELD_DIGEST_SIZE = 4
 
-            conn.commit()
-        logger.debug(f"Database initialized at {self.db_path}")
 
-    def get_event_id(self, reminder_uuid: str) -> Optional[str]:
-        """Get event ID for a reminder UUID."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT event_id FROM mappings WHERE reminder_uuid = ?', (reminder_uuid,))
-            result = cursor.fetchone()
-            return result[0] if result else None
+class OperationKind(Enum):
+    """What a planned operation does to the calendar."""
+    CREATE = 'create'
+    UPDATE = 'update'
+    # Event moved to the calendar its list now routes to, content unchanged
+    MOVE = 'move'
+    DELETE = 'delete'
+    SKIP = 'skip'
 
-    def save_mapping(
-        self,
-        reminder_uuid: str,
-        event_id: str,
-        last_modified: Optional[datetime] = None,
-        checksum: Optional[str] = None
-    ):
-        """Save or update a reminder-to-event mapping."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO mappings (reminder_uuid, event_id, last_synced, last_modified, checksum)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                reminder_uuid,
-                event_id,
-                datetime.now(),
-                last_modified,
-                checksum
-            ))
 
-            conn.commit()
-        logger.debug(f"Saved mapping: {reminder_uuid} -> {event_id}")
-
-    def delete_mapping(self, reminder_uuid: str):
-        """Delete a mapping."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM mappings WHERE reminder_uuid = ?', (reminder_uuid,))
-            conn.commit()
-        logger.debug(f"Deleted mapping for {reminder_uuid}")
-
-    def get_all_reminder_uuids(self) -> Set[str]:
-        """Get all reminder UUIDs currently in the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT reminder_uuid FROM mappings')
-            results = cursor.fetchall()
-            return {row[0] for row in results}
-
-    def get_last_modified(self, reminder_uuid: str) -> Optional[datetime]:
-        """Get last modification time for a reminder."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT last_modified FROM mappings WHERE reminder_uuid = ?', (reminder_uuid,))
-            result = cursor.fetchone()
-
-            if result and result[0]:
-                return datetime.fromisoformat(result[0])
-            return None
+# Net effect of a queued operation followed by a newer one on the same
+# reminder (None: they cancel out); pairs not listed resolve to the newer
+_COALESCED = {
+    (OperationKind.CREATE, OperationKind.UPDATE): OperationKind.CREATE,
+    (OperationKind.CREATE, OperationKind.DELETE): None,
+    (OperationKind.UPDATE, OperationKind.UPDATE): OperationKind.UPDATE,
+    (OperationKind.UPDATE, OperationKind.DELETE): OperationKind.DELETE,
+}
 
-    def get_checksum(self, reminder_uuid: str) -> Optional[str]:
-        """Get stored checksum for a reminder."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT checksum FROM mappings WHERE reminder_uuid = ?', (reminder_uuid,))
-            result = cursor.fetchone()
-            return result[0] if result else None
-
-    def save_sync_stats(self, stats: SyncStats):
-        """Save sync statistics to history."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO sync_history (sync_time, total_reminders, created, updated, deleted, errors)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                stats.total_reminders,
-                stats.created,
-                stats.updated,
-                stats.deleted,
-                stats.errors
-            ))
 
-            conn.commit()
+def coalesce(queued: OperationKind, newer: OperationKind) -> Optional[OperationKind]:
+    """
+    Fold two operations on one reminder into the single net operation.
+
+    Args:
+        queued: Operation waiting in the retry queue
+        newer: Operation planned since
+
+    Returns:
+        The net operation kind, or None when nothing is left to do
+    """
+    return _COALESCED.get((queued, newer), newer)
+
+
+@dataclass
+class SyncOperation:
+    """One planned change, computed by SyncEngine.plan()."""
+    kind: OperationKind
+    reminder_uuid: str
+    # None for deletes of reminders that no longer exist
+    reminder: Any = None
+    event_id: Optional[str] = None
+    # Checksum to store once applied; set on a SKIP only when a legacy
+    # checksum is upgraded locally
+    checksum: Optional[bytes] = None
+    reason: str = ''
+    # Calendar the event is in (or goes to); None for the default calendar
+    calendar_id: Optional[str] = None
+    # Calendar the event moves out of, for a MOVE or a moving UPDATE
+    moved_from: Optional[str] = None
+    # Field fingerprint to store once applied, and the EVENT_FIELDS an
+    # UPDATE patches
+    fingerprint: Optional[bytes] = None
+    changed: Tuple[str, ...] = ()
+
+    @property
+    def api_calls(self) -> int:
+        """Google Calendar API requests this operation needs."""
+        return 0 if self.kind is OperationKind.SKIP else 1
+
+
+def _is_newer_copy(modified, than) -> bool:
+    """
+    True if a reminder copy modified at `modified` supersedes one modified
+    at `than`: the newer modification wins, the copy fetched later on a tie
+    or when the dates cannot be compared.
+    """
+    try:
+        return not than > modified
+    except TypeError:
+        return True
+
+
+def _track_newest(newest: Dict[str, datetime], op: SyncOperation):
+    """Fold an operation's reminder into the newest modification date per list."""
+    reminder = op.reminder
+    if reminder is None or not isinstance(reminder.modification_date, datetime):
+        return
+    current = newest.get(reminder.calendar_title)
+    try:
+        if current is None or reminder.modification_date > current:
+            newest[reminder.calendar_title] = reminder.modification_date
+    except TypeError:
+        # Naive and aware timestamps in one list
+        pass
+
+
+@dataclass
+class SyncPlan:
+    """
+    Ordered operations for one sync run.
+
+    A streamed plan (keep_operations=False) is summarised by add() instead
+    of keeping its operations, so its size does not grow with the library.
+    """
+    operations: List[SyncOperation] = field(default_factory=list)
+    total_reminders: int = 0
+    keep_operations: bool = True
+    # UUIDs of the reminders a streamed plan has seen, set by the streamer
+    reminder_uuids: Optional[Set[str]] = None
+    _counts: Dict[OperationKind, int] = field(
+        default_factory=lambda: dict.fromkeys(OperationKind, 0), repr=False
+    )
+    _api_calls: int = field(default=0, repr=False)
+    _newest: Dict[str, datetime] = field(default_factory=dict, repr=False)
+
+    def add(self, op: SyncOperation):
+        """Append an operation, or only count it for a streamed plan."""
+        if self.keep_operations:
+            self.operations.append(op)
+            return
+        self._counts[op.kind] += 1
+        self._api_calls += op.api_calls
+        _track_newest(self._newest, op)
+
+    def counts(self) -> Dict[OperationKind, int]:
+        """Number of operations per kind."""
+        if not self.keep_operations:
+            return dict(self._counts)
+        counts = dict.fromkeys(OperationKind, 0)
+        for op in self.operations:
+            counts[op.kind] += 1
+        return counts
+
+    @property
+    def estimated_api_calls(self) -> int:
+        if not self.keep_operations:
+            return self._api_calls
+        return sum(op.api_calls for op in self.operations)
+
+    def planned_uuids(self) -> Set[str]:
+        """Reminder UUIDs the plan covers."""
+        if self.reminder_uuids is not None:
+            return self.reminder_uuids
+        return {op.reminder_uuid for op in self.operations}
+
+    def newest_modified(self) -> Dict[str, datetime]:
+        """Newest reminder modification date per list."""
+        if not self.keep_operations:
+            return dict(self._newest)
+        newest: Dict[str, datetime] = {}
+        for op in self.operations:
+            _track_newest(newest, op)
+        return newest
+
+    def to_stats(self) -> SyncStats:
+        """SyncStats the plan would produce if every operation succeeded."""
+        counts = self.counts()
+        return SyncStats(
+            total_reminders=self.total_reminders,
+            created=counts[OperationKind.CREATE],
+            updated=counts[OperationKind.UPDATE] + counts[OperationKind.MOVE],
+            deleted=counts[OperationKind.DELETE],
+            skipped=counts[OperationKind.SKIP]
+        )
+
+    def __str__(self):
+        counts = self.counts()
+        return (
+            f"Sync plan: {counts[OperationKind.CREATE]} create, "
+            f"{counts[OperationKind.UPDATE]} update, "
+            f"{counts[OperationKind.MOVE]} move, "
+            f"{counts[OperationKind.DELETE]} delete, "
+            f"{counts[OperationKind.SKIP]} skip, "
+            f"~{self.estimated_api_calls} API calls"
+        )
+
+
+class PhaseTimer:
+    """
+    Accumulate time per sync phase with a monotonic clock.
+
+    Phases may nest; time spent in an inner phase is charged to the inner
+    phase only, so the phase totals add up to the timed wall-clock time.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        # One [start, seconds spent in nested phases] frame per open phase
+        self._stack: List[list] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Charge the time spent inside the block to `name`."""
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed - frame[1]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def move(self, source: str, target: str, seconds: float):
+        """Re-charge `seconds` already counted under `source` to `target`."""
+        seconds = min(seconds, self.seconds.get(source, 0.0))
+        self.seconds[source] = self.seconds.get(source, 0.0) - seconds
+        self.seconds[target] = self.seconds.get(target, 0.0) + seconds
+
+    def as_ms(self) -> Dict[str, int]:
+        """Return every phase in SYNC_PHASES plus 'total', in milliseconds."""
+        timings = {name: round(self.seconds.get(name, 0.0) * 1000) for name in SYNC_PHASES}
+        timings['total'] = round((time.perf_counter() - self._started) * 1000)
+        return timings
 
 
 class SyncEngine:
@@ -171,7 +311,7 @@ class SyncEngine:
         self,
         reminders_reader,
         gcal_writer,
-        db: MappingDatabase,
+        db: MappingStore,
         config: Dict
     ):
         """
@@ -180,7 +320,7 @@ class SyncEngine:
         Args:
             reminders_reader: RemindersReader instance
             gcal_writer: GoogleCalendarWriter instance
-            db: MappingDatabase instance
+            db: Mapping store (see open_mapping_store())
             config: Configuration dict
         """
         self.reminders_reader = reminders_reader
@@ -188,177 +328,1342 @@ class SyncEngine:
         self.db = db
         self.config = config
         self.stats = SyncStats()
+        # Mapping index for the current run; see _get_mapping()
+        self._index: Optional[Dict[str, MappingRecord]] = None
+        self._timer = PhaseTimer()
+        # When True, every reminder is checksummed; see _not_modified()
+        self._full_verify = False
+        self._run_started: Optional[datetime] = None
+        self._verify_count = 0
+        # Retry queue (reminder UUID -> PendingOperation) for the current run
+        self._pending: Dict[str, PendingOperation] = {}
+        # Progress of the current run, and UUIDs an interrupted run finished
+        self._checkpoint: Optional[SyncCheckpoint] = None
+        self._resumed: Set[str] = set()
+        # time.monotonic() deadline from sync.time_budget; None = unbounded
+        self._deadline: Optional[float] = None
+        # List being synced by _sync_shards(), its error budget (0 = none),
+        # and the UUIDs planned by the lists synced so far
+        self._shard: Optional[str] = None
+        self._error_budget = 0
+        self._shard_planned: Set[str] = set()
+        # Set once any list's watermark moved back during this run
+        self._verify_requested = False
+        # Set by stop(); checked between operations
+        self._stop_requested = threading.Event()
+
+    def stop(self):
+        """
+        Ask a running sync, from another thread, to finish early.
+
+        Operations not yet started are deferred to the next sync, as when
+        the time budget runs out; those in flight are recorded and the
+        mapping store is flushed before sync() returns. The engine stays
+        stopped: a later sync() on it defers every API operation.
+        """
+        self._stop_requested.set()
+
+    def close(self):
+        """Release resources held by the engine (closes the mapping database)."""
+        self.db.close()
+
+    def __enter__(self):
+        return self
 
-    def _generate_checksum(self, reminder) -> str:
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _generate_checksum(self, reminder) -> bytes:
         """Generate a deterministic checksum for a reminder to detect changes."""
-        # Use MD5 for deterministic hashing (Python's hash() is randomized per process)
+        # Python's hash() is randomized per process, so use a real digest.
+        # BLAKE2b with a small digest is faster than MD5 and stored as a BLOB.
+        due_date = reminder.due_date
+        data = (
+            f"{reminder.title}\x1f{reminder.notes}\x1f"
+            f"{due_date.isoformat() if due_date is not None else ''}\x1f"
+            f"{reminder.priority}\x1f{reminder.completed}\x1f{reminder.location}"
+        )
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=CHECKSUM_DIGEST_SIZE).digest()
+
+    def _generate_legacy_checksum(self, reminder) -> str:
+        """Generate the CHECKSUM_VERSION_MD5 checksum, for upgrading old rows."""
         data = f"{reminder.title}|{reminder.notes}|{reminder.due_date}|{reminder.priority}|{reminder.completed}|{reminder.location}"
         return hashlib.md5(data.encode('utf-8')).hexdigest()
 
+    def _is_unchanged(self, reminder, mapping: MappingRecord, current_checksum: bytes) -> bool:
+        """Compare a reminder against its stored checksum, whatever its version."""
+        if mapping.checksum_version == CHECKSUM_VERSION:
+            return mapping.checksum == current_checksum
+        if mapping.checksum_version == CHECKSUM_VERSION_MD5:
+            return mapping.checksum == self._generate_legacy_checksum(reminder)
+        return False
+
+    def _event_fields(self, reminder) -> Dict[str, Any]:
+        """create_event() arguments describing a reminder's event."""
+        color_id = self.gcal_writer.get_priority_color(
+            reminder.priority,
+            self.config.get('google_calendar', {}).get('priority_colors', {})
+        )
+        due_date = reminder.due_date
+        return dict(
+            summary=reminder.title,
+            description=reminder.notes,
+            start_datetime=due_date,
+            end_datetime=due_date,
+            # Determine if all-day event
+            all_day=due_date is not None and due_date.hour == 0,
+            color_id=color_id,
+            location=reminder.location,
+        )
+
+    @staticmethod
+    def _fingerprint(reminder) -> bytes:
+        """One FIELD_DIGEST_SIZE-byte BLAKE2b digest per EVENT_FIELDS entry."""
+        return b''.join(
+            hashlib.blake2b(
+                repr(tuple(getattr(reminder, name) for name in attributes)).encode('utf-8'),
+                digest_size=FIELD_DIGEST_SIZE
+            ).digest()
+            for attributes, _ in EVENT_FIELDS.values()
+        )
+
+    @staticmethod
+    def _changed_fields(stored: Optional[bytes], current: bytes) -> Tuple[str, ...]:
+        """EVENT_FIELDS whose digests differ; all of them without a comparable stored fingerprint."""
+        if stored is None or len(stored) != len(current):
+            return tuple(EVENT_FIELDS)
+        size = FIELD_DIGEST_SIZE
+        return tuple(
+            name for i, name in enumerate(EVENT_FIELDS)
+            if stored[i * size:(i + 1) * size] != current[i * size:(i + 1) * size]
+        )
+
+    def _prune_history(self):
+        """Apply the sync_history retention window from config."""
+        db_config = self.config.get('database', {})
+        retention_days = db_config.get(
+            'history_retention_days',
+            self.config.get('logging', {}).get('retention_days', 30)
+        )
+        hourly_days = db_config.get('hourly_rollup_retention_days', 90)
+        try:
+            self.db.prune_history(int(retention_days), int(hourly_days))
+        except (sqlite3.Error, OSError) as e:
+            # History is informational; never fail a sync over it
+            logger.warning(f"Failed to prune sync history: {e}")
+
+    def _maybe_maintain(self) -> Optional[MaintenanceReport]:
+        """Run store maintenance every `database.maintenance_interval` syncs."""
+        interval = int(self.config.get('database', {}).get('maintenance_interval', 0))
+        if interval <= 0:
+            return None
+
+        try:
+            count = int(self.db.get_meta(META_SYNCS_SINCE_MAINTENANCE, '0')) + 1
+            if count < interval:
+                self.db.set_meta(META_SYNCS_SINCE_MAINTENANCE, str(count))
+                return None
+            return self.db.maintain()
+        except (sqlite3.Error, OSError) as e:
+            # Maintenance is housekeeping; never fail a sync over it
+            logger.warning(f"Database maintenance failed: {e}")
+            return None
+
+    def _start_deadline(self):
+        """Start the run's clock for `sync.time_budget` (seconds; 0 = no limit)."""
+        budget = float(self.config.get('sync', {}).get('time_budget') or 0)
+        self._deadline = time.monotonic() + budget if budget > 0 else None
+
+    def _deadline_passed(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _defer(self, op: SyncOperation) -> bool:
+        """
+        True (and counted) for an API operation left over once stop() was
+        called or the time budget, or the error budget of the list being
+        synced, is spent.
+        """
+        if not op.api_calls:
+            return False
+        if self._stop_requested.is_set():
+            reason = "Sync stopped"
+        elif self._error_budget and self.stats.errors >= self._error_budget:
+            reason = f"List '{self._shard}' reached its error budget of {self._error_budget}"
+        elif self._deadline_passed():
+            reason = "Time budget spent"
+        else:
+            return False
+        if not self.stats.deferred:
+            logger.warning(f"{reason}; deferring the remaining operations to the next sync")
+        self.stats.deferred += 1
+        return True
+
+    @staticmethod
+    def _urgency(op: SyncOperation, today: float) -> Tuple[int, float]:
+        """
+        Sort key for a time-budgeted plan.
+
+        Reminders due from `today` (a timestamp) on come first, soonest
+        first; then the rest by modification date, newest first; then
+        deletes of removed reminders.
+        """
+        reminder = op.reminder
+        if reminder is None:
+            return 2, 0.0
+        due = reminder.due_date
+        if isinstance(due, datetime) and not reminder.completed and due.timestamp() >= today:
+            return 0, due.timestamp()
+        modified = reminder.modification_date
+        if isinstance(modified, datetime):
+            return 1, -modified.timestamp()
+        return 2, 0.0
+
+    def _order_by_urgency(self, operations: List[SyncOperation]):
+        """Sort operations in place by _urgency() when the run has a time budget."""
+        if self._deadline is None:
+            return
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        operations.sort(key=lambda op: self._urgency(op, today))
+
+    def _start_incremental(self):
+        """
+        Decide whether this run may skip reminders by modification date.
+
+        Runs are incremental unless `sync.incremental` is false. Every
+        `sync.full_verify_every` syncs (default 50; 0 = never), and after a
+        list watermark moved backwards, every reminder is checksummed again
+        to catch edits hidden by clock skew.
+        """
+        self._run_started = datetime.now()
+        self._verify_count = 0
+        self._verify_requested = False
+        sync_config = self.config.get('sync', {})
+        if not sync_config.get('incremental', True):
+            self._full_verify = True
+            return
+
+        every = int(sync_config.get('full_verify_every', 50))
+        try:
+            requested = self.db.get_meta(META_FULL_VERIFY_REQUESTED) == '1'
+            count = int(self.db.get_meta(META_SYNCS_SINCE_FULL_VERIFY, '0')) + 1
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Could not read incremental sync state: {e}")
+            requested, count = True, 0
+        self._full_verify = requested or (every > 0 and count >= every)
+        self._verify_count = 0 if self._full_verify else count
+        if self._full_verify:
+            logger.info("Full verify: checksumming every reminder")
+
+    def _not_modified(self, reminder, mapping: MappingRecord) -> bool:
+        """True if the reminder is no newer than the version last synced."""
+        synced = mapping.last_modified
+        modified = reminder.modification_date
+        if not isinstance(synced, datetime) or not isinstance(modified, datetime):
+            return False
+        try:
+            # A stored date in the future came from a fast clock; it would
+            # hide later edits, so such rows are always checksummed
+            return modified <= synced <= (self._run_started or datetime.now())
+        except TypeError:
+            # Naive and aware timestamps; let the checksum decide
+            return False
+
+    def _update_watermarks(self, plan: SyncPlan):
+        """
+        Store each list's newest modification date and the full-verify counter.
+
+        A list whose newest modification date went backwards (a device
+        clock was set back, Reminders data was restored, or its latest
+        reminder was deleted) gets the next run fully verified.
+        """
+        newest = plan.newest_modified()
+
+        try:
+            regressed = []
+            for title, modified in newest.items():
+                key = META_WATERMARK_PREFIX + title
+                stored = self.db.get_meta(key)
+                if stored is not None and modified < datetime.fromisoformat(stored):
+                    regressed.append(title)
+                self.db.set_meta(key, modified.isoformat())
+
+            self.db.set_meta(META_SYNCS_SINCE_FULL_VERIFY, str(self._verify_count))
+            if regressed and not self._full_verify:
+                logger.info(f"Watermark moved back for {', '.join(sorted(regressed))}; next sync verifies all")
+                self._verify_requested = True
+            # A list shard synced later in the run must not clear the request
+            self.db.set_meta(META_FULL_VERIFY_REQUESTED, '1' if self._verify_requested else '0')
+        except (sqlite3.Error, OSError, ValueError, TypeError) as e:
+            # Worst case the next run is incremental without a fresh watermark
+            logger.warning(f"Failed to update sync watermarks: {e}")
+
+    def _completed_cutoff(self) -> Optional[datetime]:
+        """Completion date before which completed reminders are skipped (None = never)."""
+        skip_days = self.config.get('reminders', {}).get('skip_completed_older_than_days', 30)
+        if skip_days > 0:
+            return datetime.now() - timedelta(days=skip_days)
+        return None
+
+    @staticmethod
+    def _is_old_completed(reminder, cutoff: Optional[datetime]) -> bool:
+        return (
+            cutoff is not None
+            and reminder.completed
+            and reminder.completion_date is not None
+            and reminder.completion_date < cutoff
+        )
+
     def _should_skip_reminder(self, reminder) -> bool:
         """Determine if a reminder should be skipped."""
         # Skip old completed reminders
-        skip_days = self.config.get('reminders', {}).get('skip_completed_older_than_days', 30)
+        if self._is_old_completed(reminder, self._completed_cutoff()):
+            logger.debug(f"Skipping old completed reminder: {reminder.title}")
+            return True
+        return False
 
-        if skip_days > 0 and reminder.completed and reminder.completion_date:
-            cutoff = datetime.now() - timedelta(days=skip_days)
-            if reminder.completion_date < cutoff:
-                logger.debug(f"Skipping old completed reminder: {reminder.title}")
-                return True
+    def _get_mapping(self, reminder_uuid: str) -> Optional[MappingRecord]:
+        """
+        Look up the mapping record for a reminder.
 
-        return False
+        During sync() this is served from the in-memory index loaded at the
+        start of the run; outside a run it is a single-row query.
+        """
+        if self._index is not None:
+            return self._index.get(reminder_uuid)
+        with self._timer.phase('db_flush'):
+            return self.db.get_mapping(reminder_uuid)
 
-    def _sync_reminder(self, reminder):
-        """Sync a single reminder."""
-        if self._should_skip_reminder(reminder):
-            self.stats.skipped += 1
-            return
+    def _save_mapping(
+        self,
+        reminder,
+        event_id: str,
+        checksum: bytes,
+        calendar_id: Optional[str] = None,
+        fingerprint: Optional[bytes] = None
+    ):
+        """Persist a mapping and keep the run's index in step."""
+        with self._timer.phase('db_flush'):
+            self.db.save_mapping(
+                reminder.uuid, event_id, reminder.modification_date, checksum, calendar_id=calendar_id,
+                list_title=reminder.calendar_title, fingerprint=fingerprint
+            )
+        if self._index is not None:
+            self._index[reminder.uuid] = MappingRecord(
+                reminder.uuid, event_id, datetime.now(), reminder.modification_date, checksum,
+                calendar_id=calendar_id, list_title=reminder.calendar_title, fingerprint=fingerprint
+            )
 
-        # Check if mapping exists
-        event_id = self.db.get_event_id(reminder.uuid)
-        current_checksum = self._generate_checksum(reminder)
+    def _delete_mapping(self, reminder_uuid: str):
+        """Remove a mapping and keep the run's index in step."""
+        with self._timer.phase('db_flush'):
+            self.db.delete_mapping(reminder_uuid)
+        if self._index is not None:
+            self._index.pop(reminder_uuid, None)
 
-        # Prepare event data
-        color_id = self.gcal_writer.get_priority_color(
-            reminder.priority,
-            self.config.get('google_calendar', {}).get('priority_colors', {})
-        )
+    def _default_calendar(self) -> str:
+        return self.config.get('google_calendar', {}).get('calendar_id', 'primary')
 
-        # Determine if all-day event
-        all_day = reminder.due_date is not None and reminder.due_date.hour == 0
+    def _route(self, reminder) -> Optional[str]:
+        """
+        Calendar a reminder's events belong in, from `google_calendar.routes`.
 
-        if reminder.completed:
-            # Handle completed reminder
-            completed_action = self.config.get('sync', {}).get('completed_action', 'delete')
+        Returns:
+            Calendar ID, or None for the default calendar
+        """
+        routes = self.config.get('google_calendar', {}).get('routes') or {}
+        calendar_id = routes.get(reminder.calendar_title)
+        return None if calendar_id in (None, self._default_calendar()) else calendar_id
 
+    def _plan_reminder(
+        self,
+        reminder,
+        mapping: Optional[MappingRecord],
+        cutoff: Optional[datetime],
+        completed_action: str
+    ) -> SyncOperation:
+        """Decide what to do with one reminder. Pure: no I/O."""
+        uuid = reminder.uuid
+        if self._is_old_completed(reminder, cutoff):
+            return SyncOperation(OperationKind.SKIP, uuid, reminder, reason='old completed')
+
+        event_id = mapping.event_id if mapping else None
+        mapped_calendar = mapping.calendar_id if mapping else None
+        # Still valid whenever the checksum is
+        fingerprint = mapping.fingerprint if mapping else None
+
+        if reminder.completed:
             if event_id and completed_action == 'delete':
-                # Delete the event
-                if self.gcal_writer.delete_event(event_id):
-                    self.db.delete_mapping(reminder.uuid)
-                    self.stats.deleted += 1
-                else:
-                    self.stats.errors += 1
-            else:
-                self.stats.skipped += 1
-
-        elif event_id:
-            # Check if update needed using checksum
-            stored_checksum = self.db.get_checksum(reminder.uuid)
-
-            if stored_checksum == current_checksum:
-                # No changes detected, skip update
-                logger.debug(f"No changes for reminder: {reminder.title}")
-                self.stats.skipped += 1
-                return
-
-            # Update existing event
-            logger.debug(f"Updating reminder: {reminder.title}")
-            result = self.gcal_writer.update_event(
-                event_id=event_id,
-                summary=reminder.title,
-                description=reminder.notes,
-                start_datetime=reminder.due_date,
-                end_datetime=reminder.due_date,
-                color_id=color_id,
-                all_day=all_day,
-                location=reminder.location
+                return SyncOperation(
+                    OperationKind.DELETE, uuid, reminder, event_id, reason='completed', calendar_id=mapped_calendar
+                )
+            if event_id and mapping.list_title != reminder.calendar_title:
+                # A kept event: record its list, so only that list's shard
+                # considers the mapping when looking for removed reminders
+                return SyncOperation(
+                    OperationKind.SKIP, uuid, reminder, event_id, self._generate_checksum(reminder),
+                    reason='completed', calendar_id=mapped_calendar, fingerprint=fingerprint
+                )
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, reason='completed', calendar_id=mapped_calendar
             )
 
-            if result:
-                self.db.save_mapping(
-                    reminder.uuid,
-                    event_id,
-                    reminder.modification_date,
-                    current_checksum
-                )
-                self.stats.updated += 1
-            else:
-                self.stats.errors += 1
+        calendar_id = self._route(reminder)
+        moved_from = None
+        if event_id and calendar_id != mapped_calendar:
+            # The reminder's list now routes to another calendar
+            moved_from = mapped_calendar or self._default_calendar()
 
-        else:
-            # Create new event
-            logger.debug(f"Creating new event for reminder: {reminder.title}")
-            result = self.gcal_writer.create_event(
-                summary=reminder.title,
-                description=reminder.notes,
-                start_datetime=reminder.due_date,
-                end_datetime=reminder.due_date,
-                color_id=color_id,
-                reminder_uuid=reminder.uuid,
-                all_day=all_day,
-                location=reminder.location
+        if (
+            event_id
+            and moved_from is None
+            and mapping.list_title == reminder.calendar_title
+            and not self._full_verify
+            and mapping.checksum_version == CHECKSUM_VERSION
+            and self._not_modified(reminder, mapping)
+        ):
+            # Incremental sync: unchanged since the last write, skip the hash
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, reason='not modified', calendar_id=calendar_id
+            )
+
+        current_checksum = self._generate_checksum(reminder)
+
+        if not event_id:
+            return SyncOperation(
+                OperationKind.CREATE, uuid, reminder, checksum=current_checksum, calendar_id=calendar_id,
+                fingerprint=self._fingerprint(reminder)
             )
 
-            if result:
-                self.db.save_mapping(
-                    reminder.uuid,
-                    result['id'],
-                    reminder.modification_date,
-                    current_checksum
+        checksum_changed = not self._is_unchanged(reminder, mapping, current_checksum)
+        if checksum_changed:
+            current = self._fingerprint(reminder)
+            changed = self._changed_fields(fingerprint, current)
+            fingerprint = current
+            if changed:
+                return SyncOperation(
+                    OperationKind.UPDATE, uuid, reminder, event_id, current_checksum,
+                    calendar_id=calendar_id, moved_from=moved_from, fingerprint=fingerprint, changed=changed
                 )
-                self.stats.created += 1
-            else:
-                self.stats.errors += 1
-
-    def _cleanup_deleted_reminders(self, current_reminder_uuids: Set[str]):
-        """Delete events for reminders that no longer exist."""
-        db_uuids = self.db.get_all_reminder_uuids()
-        deleted_uuids = db_uuids - current_reminder_uuids
-
-        for uuid in deleted_uuids:
-            event_id = self.db.get_event_id(uuid)
-            if event_id:
-                logger.debug(f"Deleting event for removed reminder: {uuid}")
-                if self.gcal_writer.delete_event(event_id):
-                    self.db.delete_mapping(uuid)
-                    self.stats.deleted += 1
-                else:
-                    self.stats.errors += 1
 
-    def sync(self) -> SyncStats:
+        if moved_from is not None:
+            return SyncOperation(
+                OperationKind.MOVE, uuid, reminder, event_id, current_checksum, reason='moved',
+                calendar_id=calendar_id, moved_from=moved_from, fingerprint=fingerprint
+            )
+
+        if checksum_changed:
+            # A change the event does not show, such as a completion
+            # undone: store it locally, no API call needed
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, current_checksum, reason='no event change',
+                calendar_id=calendar_id, fingerprint=fingerprint
+            )
+        if mapping.checksum_version != CHECKSUM_VERSION:
+            # Upgrade the stored checksum locally; no API call needed
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, current_checksum, reason='checksum upgrade',
+                calendar_id=calendar_id, fingerprint=fingerprint
+            )
+        if mapping.list_title != reminder.calendar_title:
+            # Moved to another list, or last synced before lists were
+            # recorded: store the list so that list's shard owns the mapping
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, current_checksum, reason='list changed',
+                calendar_id=calendar_id, fingerprint=fingerprint
+            )
+        if isinstance(reminder.modification_date, datetime) and mapping.last_modified != reminder.modification_date:
+            # Touched without a synced field changing: store the new
+            # modification date so later runs can skip it without hashing
+            return SyncOperation(
+                OperationKind.SKIP, uuid, reminder, event_id, current_checksum, reason='touched',
+                calendar_id=calendar_id, fingerprint=fingerprint
+            )
+        return SyncOperation(OperationKind.SKIP, uuid, reminder, event_id, reason='unchanged', calendar_id=calendar_id)
+
+    def plan(self, reminders: List, index: Optional[Dict[str, MappingRecord]] = None) -> SyncPlan:
         """
-        Perform full sync operation.
+        Compute the operations needed to bring the calendar in line with `reminders`.
+
+        Only the reminders and the mapping index are consulted (and, when
+        syncing one list shard, the reader for reminders missing from it);
+        nothing is written and no API calls are made.
+
+        Args:
+            reminders: Fetched reminders
+            index: Mapping index (reminder UUID -> MappingRecord); defaults
+                to the run's index, or a fresh load_index()
 
         Returns:
-            SyncStats object with operation statistics
+            SyncPlan with one operation per reminder, followed by deletes
+            for mapped reminders that no longer exist
         """
-        logger.info("Starting sync operation")
-        self.stats = SyncStats()
+        if index is None:
+            index = self._index if self._index is not None else self.db.load_index()
+
+        reminders = self._latest_per_uuid(reminders)
+        cutoff = self._completed_cutoff()
+        completed_action = self.config.get('sync', {}).get('completed_action', 'delete')
+
+        plan = SyncPlan(total_reminders=len(reminders))
+        for reminder in reminders:
+            if self._done_before(reminder):
+                continue
+            plan.add(self._hold_back(
+                self._plan_reminder(reminder, index.get(reminder.uuid), cutoff, completed_action)
+            ))
 
+        current_uuids = {r.uuid for r in reminders}
+        if self._shard is None:
+            removed = self._removed_operations(index, current_uuids)
+        else:
+            removed = self._removed_from_shard(index, current_uuids)
+        for op in removed:
+            plan.add(self._hold_back(op))
+
+        operations = plan.operations
+        self._order_by_urgency(operations)
+
+        if self._pending:
+            # Drain the retry queue first: due retries run before new work
+            retries = [op for op in operations if op.api_calls and op.reminder_uuid in self._pending]
+            if retries:
+                rest = [op for op in operations if not (op.api_calls and op.reminder_uuid in self._pending)]
+                plan.operations = retries + rest
+                logger.info(f"Retrying {len(retries)} failed operations first")
+        return plan
+
+    @staticmethod
+    def _latest_per_uuid(reminders: List) -> List:
+        """
+        Keep one reminder per UUID, so each gets a single net operation.
+
+        A reminder completed while it was being fetched is returned by both
+        the incomplete and the completed fetch; the newer modification wins
+        (the later one on a tie).
+        """
+        latest = {}
+        for reminder in reminders:
+            current = latest.get(reminder.uuid)
+            if current is not None and not _is_newer_copy(reminder.modification_date, current.modification_date):
+                continue
+            latest[reminder.uuid] = reminder
+        if len(latest) == len(reminders):
+            return reminders
+        logger.debug(f"Coalesced {len(reminders) - len(latest)} duplicate reminders")
+        return list(latest.values())
+
+    def _track_copy(self, reminder, copies: Dict[str, Tuple[Any, bool]], newer: Dict[str, Any]) -> bool:
+        """
+        Note a streamed reminder; False if its UUID was fetched before.
+
+        A streamed run applies the first copy's operation before a later
+        copy can arrive, so a later copy newer than the first (see
+        _latest_per_uuid()) is kept in `newer` for _plan_newer_copies().
+        """
+        first = copies.get(reminder.uuid)
+        if first is None:
+            copies[reminder.uuid] = (reminder.modification_date, False)
+            return True
+        current = newer.get(reminder.uuid)
+        if _is_newer_copy(reminder.modification_date, first[0] if current is None else current.modification_date):
+            newer[reminder.uuid] = reminder
+        return False
+
+    def _plan_newer_copies(
+        self,
+        newer: Dict[str, Any],
+        copies: Dict[str, Tuple[Any, bool]],
+        mappings: Dict[str, MappingRecord]
+    ) -> List[SyncOperation]:
+        """
+        Plan the newer copies collected by _track_copy().
+
+        Call once the first copies' operations are recorded: each newer
+        copy is planned against the mapping its first copy left behind,
+        and its operation replaces the first one's skip in the stats.
+        """
+        sync_config = self.config.get('sync', {})
+        cutoff = self._completed_cutoff()
+        completed_action = sync_config.get('completed_action', 'delete')
+        operations = []
+        for reminder in newer.values():
+            if self._done_before(reminder):
+                continue
+            if copies[reminder.uuid][1]:
+                self.stats.skipped -= 1
+            op = self._hold_back(self._plan_reminder(
+                reminder, mappings.get(reminder.uuid), cutoff, completed_action
+            ))
+            operations.append(op)
+        if operations:
+            logger.debug(f"Planned {len(operations)} reminders again from newer copies")
+        return operations
+
+    def _done_before(self, reminder) -> bool:
+        """
+        True for a reminder the interrupted run being resumed already synced.
+
+        Such reminders are neither hashed nor planned again; they still
+        count as present, so their events are not deleted.
+        """
+        return reminder.uuid in self._resumed
+
+    def _hold_back(self, op: SyncOperation) -> SyncOperation:
+        """Turn an operation whose last attempt failed into a skip until its retry is due."""
+        pending = self._pending.get(op.reminder_uuid)
+        if pending is None or not op.api_calls:
+            return op
+        queued = OperationKind(pending.kind)
+        if coalesce(queued, op.kind) is not queued:
+            # The reminder changed since; the failed operation is superseded
+            # and its backoff does not apply to the new one
+            logger.debug(f"Queued {pending.kind} for {op.reminder_uuid} superseded by {op.kind.value}")
+            return op
+        if pending.next_attempt <= (self._run_started or datetime.now()):
+            return op
+        return SyncOperation(
+            OperationKind.SKIP, op.reminder_uuid, op.reminder, op.event_id, reason=BACKOFF_REASON
+        )
+
+    @staticmethod
+    def _removed_operations(index: Dict[str, MappingRecord], current_uuids: set) -> List[SyncOperation]:
+        """Deletes for events whose reminders no longer exist."""
+        operations = []
+        for uuid in index.keys() - current_uuids:
+            record = index[uuid]
+            if record.event_id:
+                operations.append(SyncOperation(
+                    OperationKind.DELETE, uuid, None, record.event_id, reason='removed', calendar_id=record.calendar_id
+                ))
+        return operations
+
+    def _removed_from_shard(self, index: Dict[str, MappingRecord], current_uuids: set) -> List[SyncOperation]:
+        """
+        Deletes for reminders gone from the list being synced as a shard.
+
+        Only mappings recorded in this list (or in no list: see
+        _backfill_list_titles()) are candidates, and a candidate the reader
+        still finds in a synced list moved there: that list's shard updates
+        it instead.
+        """
+        scope = {
+            uuid: record for uuid, record in index.items()
+            if record.list_title in (self._shard, None) and uuid not in current_uuids
+        }
+        if not scope:
+            return []
+        synced_lists = self._calendar_names()
+        found = self.reminders_reader.find_reminders(scope)
+        for uuid, reminder in found.items():
+            if synced_lists is None or reminder.calendar_title in synced_lists:
+                del scope[uuid]
+        return self._removed_operations(scope, current_uuids)
+
+    def _api_request(self, op: SyncOperation) -> Optional[Tuple[str, tuple, Dict]]:
+        """
+        Build the Google Calendar request for an operation.
+
+        Returns:
+            (writer method name, args, kwargs), or None for skips
+        """
+        kind = op.kind
+        reminder = op.reminder
+
+        if kind is OperationKind.SKIP:
+            return None
+
+        # Only routed calendars are named, so unrouted requests look as before
+        target = {'calendar_id': op.calendar_id} if op.calendar_id is not None else {}
+
+        if kind is OperationKind.DELETE:
+            logger.debug(f"Deleting event {op.event_id} ({op.reason}): {op.reminder_uuid}")
+            return 'delete_event', (op.event_id,), target
+
+        if kind is OperationKind.MOVE:
+            destination = op.calendar_id or self._default_calendar()
+            logger.debug(f"Moving event {op.event_id} to {destination}: {reminder.title}")
+            return 'move_event', (op.event_id, destination), {'calendar_id': op.moved_from}
+
+        fields = self._event_fields(reminder)
+
+        if kind is OperationKind.UPDATE:
+            logger.debug(f"Updating {', '.join(op.changed)} of reminder: {reminder.title}")
+            if op.moved_from is not None:
+                target['moved_from'] = op.moved_from
+            # Only the changed fields; no read of the event first
+            changes = {arg: fields[arg] for name in op.changed for arg in EVENT_FIELDS[name][1]}
+            return 'patch_event', (op.event_id,), dict(changes, **target)
+
+        logger.debug(f"Creating new event for reminder: {reminder.title}")
+        return 'create_event', (), dict(fields, reminder_uuid=reminder.uuid, **target)
+
+    def _call_api(self, op: SyncOperation):
+        """
+        Make the Google Calendar request for an operation.
+
+        Touches neither the mapping store nor the stats, so it is safe to run
+        on a worker thread.
+
+        Returns:
+            delete_event() result for deletes, the event dict (or None) for
+            creates and updates, None for skips
+        """
+        request = self._api_request(op)
+        if request is None:
+            return None
+        method, args, kwargs = request
+        return getattr(self.gcal_writer, method)(*args, **kwargs)
+
+    def _record_result(self, op: SyncOperation, result):
+        """Write back the outcome of an operation: mapping change and stats."""
+        kind = op.kind
+
+        if kind is OperationKind.SKIP:
+            if op.checksum is not None:
+                self._save_mapping(op.reminder, op.event_id, op.checksum, op.calendar_id, op.fingerprint)
+            if op.reason != BACKOFF_REASON:
+                # Nothing left to retry
+                self._clear_pending(op.reminder_uuid)
+            self.stats.skipped += 1
+            return
+
+        if isinstance(result, MovedOnly):
+            # The event moved but the update failed: record where it is now,
+            # so the retry is a plain update rather than a move from a
+            # calendar the event has left
+            self._record_move(op)
+            self._record_failure(op, "update failed after move")
+            return
+
+        if not result:
+            # Failed request: leave the mapping as it was so the operation is
+            # planned again, and queue it for a retry after a backoff
+            self._record_failure(op, "request failed")
+            return
+
+        self._clear_pending(op.reminder_uuid)
+        if kind is OperationKind.DELETE:
+            self._delete_mapping(op.reminder_uuid)
+            self.stats.deleted += 1
+
+        elif kind in (OperationKind.UPDATE, OperationKind.MOVE):
+            self._save_mapping(op.reminder, op.event_id, op.checksum, op.calendar_id, op.fingerprint)
+            self.stats.updated += 1
+
+        else:
+            self._save_mapping(op.reminder, result['id'], op.checksum, op.calendar_id, op.fingerprint)
+            self.stats.created += 1
+        self._checkpoint_progress(op.reminder_uuid)
+
+    def _save_record(self, record: MappingRecord):
+        """Persist a changed mapping record as is and keep the run's index in step."""
+        with self._timer.phase('db_flush'):
+            self.db.save_mapping(
+                record.reminder_uuid, record.event_id, record.last_modified, record.checksum,
+                record.checksum_version, record.calendar_id, record.list_title, record.fingerprint
+            )
+        if self._index is not None:
+            self._index[record.reminder_uuid] = record
+
+    def _record_move(self, op: SyncOperation):
+        """Point a mapping at the calendar its event moved to, keeping the rest as last synced."""
+        mapping = self._get_mapping(op.reminder_uuid)
+        if mapping is not None:
+            self._save_record(mapping._replace(calendar_id=op.calendar_id))
+
+    def _start_checkpoint(self):
+        """
+        Start a new run, or resume the run an interrupted sync left behind.
+
+        A checkpoint is only resumed by a run over the same list shard (or
+        over the whole library, for one without a shard); any other run
+        starts over and replaces it.
+        """
+        resumed = self.db.load_checkpoint()
+        if resumed is not None and resumed[0].shard != self._shard:
+            logger.info(
+                f"Not resuming sync {resumed[0].run_id} of "
+                f"{repr(resumed[0].shard) if resumed[0].shard else 'all lists'}: this run syncs "
+                f"{repr(self._shard) if self._shard else 'all lists'}"
+            )
+            resumed = None
+        if resumed is None:
+            self._checkpoint = SyncCheckpoint(uuid4().hex[:12], datetime.now(), shard=self._shard)
+            self._resumed = set()
+            return
+
+        self._checkpoint, self._resumed = resumed
+        # The resumed run's totals carry on from what was committed
+        self.stats.created = self._checkpoint.created
+        self.stats.updated = self._checkpoint.updated
+        self.stats.deleted = self._checkpoint.deleted
+        logger.info(
+            f"Resuming sync {self._checkpoint.run_id} started {self._checkpoint.started:%Y-%m-%d %H:%M}: "
+            f"{len(self._resumed)} reminders already synced"
+        )
+
+    def _checkpoint_progress(self, reminder_uuid: str):
+        """Queue a checkpoint with the mapping write for a completed operation."""
+        if self._checkpoint is None:
+            return
+        self._checkpoint = self._checkpoint._replace(
+            created=self.stats.created, updated=self.stats.updated, deleted=self.stats.deleted
+        )
+        with self._timer.phase('db_flush'):
+            self.db.save_checkpoint(self._checkpoint, (reminder_uuid,))
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        """Exponential backoff with jitter for the `attempts`-th failure."""
+        sync_config = self.config.get('sync', {})
+        base = float(sync_config.get('retry_backoff_base', 60))
+        ceiling = float(sync_config.get('retry_backoff_max', 6 * 3600))
+        delay = min(ceiling, base * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    def _record_failure(self, op: SyncOperation, error: str):
+        """Count a failed operation and queue it in pending_ops."""
+        self.stats.errors += 1
+        if not op.api_calls:
+            return
+        # One net operation per reminder: a failure of the queued operation
+        # (or one that folds into it) backs off further, anything else
+        # replaces it and starts over
+        kind, attempts = op.kind, 1
+        previous = self._pending.get(op.reminder_uuid)
+        if previous is not None:
+            queued = OperationKind(previous.kind)
+            if coalesce(queued, op.kind) is queued:
+                kind, attempts = queued, previous.attempts + 1
+        pending = PendingOperation(
+            op.reminder_uuid,
+            kind.value,
+            op.event_id,
+            attempts,
+            datetime.now() + self._retry_delay(attempts),
+            error[:500]
+        )
         try:
-            # Fetch reminders
-            sync_lists = self.config.get('reminders', {}).get('sync_lists', [])
-            calendar_names = sync_lists if sync_lists else None
+            self.db.save_pending_op(pending)
+        except (sqlite3.Error, OSError) as e:
+            # Without the queue entry the operation is still planned again
+            logger.warning(f"Failed to queue retry for {op.reminder_uuid}: {e}")
+            return
+        self._pending[op.reminder_uuid] = pending
+        logger.debug(f"Queued {op.kind.value} for {op.reminder_uuid}: attempt {attempts}, due {pending.next_attempt}")
+
+    def _clear_pending(self, reminder_uuid: str):
+        """Drop a reminder's retry queue entry once it no longer needs a retry."""
+        if self._pending.pop(reminder_uuid, None) is not None:
+            self.db.delete_pending_op(reminder_uuid)
+
+    def _load_pending(self):
+        """Load the retry queue for this run."""
+        self._pending = self.db.load_pending_ops()
+        if self._pending:
+            now = self._run_started or datetime.now()
+            due = sum(1 for pending in self._pending.values() if pending.next_attempt <= now)
+            logger.info(f"{len(self._pending)} failed operations queued, {due} due for retry")
+
+    def _apply_operation(self, op: SyncOperation):
+        """Execute one planned operation and record it in the stats."""
+        result = None
+        if op.api_calls:
+            with self._timer.phase('apply'):
+                result = self._call_api(op)
+        self._record_result(op, result)
 
-            reminders = self.reminders_reader.fetch_reminders(calendar_names)
-            self.stats.total_reminders = len(reminders)
+    def _max_workers(self) -> int:
+        return max(1, int(self.config.get('sync', {}).get('max_workers', 1)))
 
-            logger.info(f"Fetched {len(reminders)} reminders")
+    @staticmethod
+    def _label(op: SyncOperation) -> str:
+        return op.reminder.title if op.reminder is not None else op.reminder_uuid
 
-            # Track current UUIDs
-            current_uuids = {r.uuid for r in reminders}
+    def apply(self, plan: SyncPlan):
+        """
+        Execute a plan in order, updating self.stats.
+
+        With `sync.max_workers` > 1 the API requests run on a thread pool;
+        see _apply_concurrently(). A failing operation is logged and counted
+        as an error; the rest of the plan still runs. Once `sync.time_budget`
+        is spent, the remaining API operations are only counted as deferred;
+        their mappings are untouched, so the next run plans them again.
+        """
+        workers = self._max_workers()
+        concurrent = workers > 1 and plan.estimated_api_calls > 1
+        if concurrent:
+            logger.info(f"Applying {plan.estimated_api_calls} API operations with {workers} workers")
+        self._apply_all(plan.operations, concurrent)
+
+    def _apply_all(self, operations: Iterable[SyncOperation], concurrent: bool):
+        """Apply operations, holding deletes of removed reminders back for _apply_removed()."""
+        removed = []
+
+        def others():
+            for op in operations:
+                if op.kind is OperationKind.DELETE and op.reminder is None:
+                    removed.append(op)
+                else:
+                    yield op
 
-            # Sync each reminder
-            for reminder in reminders:
+        if concurrent:
+            self._apply_concurrently(others(), self._max_workers())
+        else:
+            self._apply_sequentially(others())
+        self._apply_removed(removed)
+
+    def _apply_removed(self, operations: List[SyncOperation]):
+        """
+        Delete the events of removed reminders in batches.
+
+        Every `sync.batch_size` deletes go to the writer's
+        batch_delete_events() together. The store is flushed around each
+        batch's mapping deletes, so they commit in one transaction as long
+        as `sync.batch_size` does not exceed `database.write_batch_size`
+        (50 and 200 by default); a larger batch is split by the store's
+        own size-triggered flushes.
+        """
+        batch_size = max(1, int(self.config.get('sync', {}).get('batch_size', 50)))
+        # A batch request targets one calendar
+        by_calendar: Dict[Optional[str], List[SyncOperation]] = {}
+        for op in operations:
+            by_calendar.setdefault(op.calendar_id, []).append(op)
+        batches = [
+            (calendar_id, ops[i:i + batch_size])
+            for calendar_id, ops in by_calendar.items()
+            for i in range(0, len(ops), batch_size)
+        ]
+        for calendar_id, batch in batches:
+            batch = [op for op in batch if not self._defer(op)]
+            if not batch:
+                continue
+            target = {'calendar_id': calendar_id} if calendar_id is not None else {}
+            with self._timer.phase('cleanup'):
                 try:
-                    self._sync_reminder(reminder)
+                    with self._timer.phase('apply'):
+                        results = self.gcal_writer.batch_delete_events([op.event_id for op in batch], **target)
                 except Exception as e:
-                    logger.error(f"Error syncing reminder '{reminder.title}': {e}")
-                    self.stats.errors += 1
+                    logger.error(f"Error deleting {len(batch)} events of removed reminders: {e}")
+                    for op in batch:
+                        self._record_failure(op, str(e))
+                    continue
+                with self._timer.phase('db_flush'):
+                    self.db.flush()
+                for op in batch:
+                    try:
+                        self._record_result(op, results.get(op.event_id))
+                    except Exception as e:
+                        logger.error(f"Error applying {op.kind.value} for '{self._label(op)}': {e}")
+                        self._record_failure(op, str(e))
+                with self._timer.phase('db_flush'):
+                    self.db.flush()
+
+    def _apply_sequentially(self, operations: Iterable[SyncOperation]):
+        """Run operations one at a time on this thread."""
+        for op in operations:
+            if self._defer(op):
+                continue
+            # Removed-reminder deletes are timed as cleanup; everything
+            # else is diff bookkeeping around the API and DB phases
+            with self._timer.phase('cleanup' if op.reminder is None else 'diff'):
+                try:
+                    self._apply_operation(op)
+                except Exception as e:
+                    logger.error(f"Error applying {op.kind.value} for '{self._label(op)}': {e}")
+                    self._record_failure(op, str(e))
+
+    def _apply_concurrently(self, operations: Iterable[SyncOperation], workers: int):
+        """
+        Run API requests on a thread pool and write results back in plan order.
+
+        Only the requests run on worker threads. Results are collected on
+        this thread in submission order, so mapping writes and stats keep a
+        single writer and reach the store in the same order as a sequential
+        run. At most `workers * 4` operations are in flight at once, and the
+        next operation is only taken from `operations` when there is room,
+        so a generator upstream is consumed no faster than requests finish.
+        """
+        window = workers * 4
+        in_flight = deque()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sync-apply') as pool:
+            try:
+                for op in operations:
+                    if self._defer(op):
+                        continue
+                    future = pool.submit(self._call_api, op) if op.api_calls else None
+                    in_flight.append((op, future))
+                    if len(in_flight) >= window:
+                        self._record_future(*in_flight.popleft())
+            finally:
+                # Record everything already sent, even when unwinding, so an
+                # event created by a worker never ends up without a mapping
+                while in_flight:
+                    self._record_future(*in_flight.popleft())
+
+    def _record_future(self, op: SyncOperation, future: Optional[Future]):
+        """Wait for an operation's request, then record its result."""
+        with self._timer.phase('cleanup' if op.reminder is None else 'diff'):
+            try:
+                result = None
+                if future is not None:
+                    with self._timer.phase('apply'):
+                        result = future.result()
+                self._record_result(op, result)
+            except Exception as e:
+                logger.error(f"Error applying {op.kind.value} for '{self._label(op)}': {e}")
+                self._record_failure(op, str(e))
+
+    def _sync_reminder(self, reminder):
+        """Sync a single reminder (plan and apply one operation)."""
+        op = self._plan_reminder(
+            reminder,
+            self._get_mapping(reminder.uuid),
+            self._completed_cutoff(),
+            self.config.get('sync', {}).get('completed_action', 'delete')
+        )
+        self._apply_operation(op)
+
+    def _calendar_names(self) -> Optional[List[str]]:
+        sync_lists = self.config.get('reminders', {}).get('sync_lists', [])
+        return sync_lists if sync_lists else None
 
-            # Cleanup deleted reminders
-            self._cleanup_deleted_reminders(current_uuids)
+    def _dry_run(self) -> bool:
+        return self.config.get('sync', {}).get('dry_run', False)
 
-            # Save stats
-            self.db.save_sync_stats(self.stats)
+    def _clear_stale_pending(self, planned: Set[str]):
+        """Drop queued retries for reminders that are gone and were never mapped."""
+        for uuid in self._pending.keys() - planned:
+            self._clear_pending(uuid)
 
-            logger.info(f"Sync complete: {self.stats}")
+    def _finish_run(self, plan: SyncPlan) -> SyncStats:
+        """Record timings, save stats and run history/maintenance housekeeping."""
+        self._update_watermarks(plan)
+        if self._shard is None:
+            self._clear_stale_pending(plan.planned_uuids())
+        else:
+            # Other lists' reminders are not planned here; see _sync_shards()
+            self._shard_planned |= plan.planned_uuids()
+        # The run is complete; the history row below covers it in full
+        self.db.clear_checkpoint()
+        self._checkpoint = None
+        self.stats.timings = self._timer.as_ms()
+        logger.info("Phase timings (ms): " + ", ".join(
+            f"{name}={ms}" for name, ms in self.stats.timings.items()
+        ))
+        self.db.save_sync_stats(self.stats, shard=self._shard)
+        if self._shard is not None:
+            logger.info(f"Sync of list '{self._shard}' complete: {self.stats}")
             return self.stats
+        self._prune_history()
+        self._maybe_maintain()
+
+        logger.info(f"Sync complete: {self.stats}")
+        return self.stats
+
+    def _stream_operations(
+        self,
+        plan: SyncPlan,
+        reminders: Iterable,
+        copies: Dict[str, Tuple[Any, bool]],
+        newer: Dict[str, Any]
+    ) -> Iterator[SyncOperation]:
+        """
+        Plan reminders batch by batch as the reader yields them.
+
+        Each batch of `sync.stream_batch_size` reminders is looked up with
+        one get_mappings() call instead of a full index load, and its
+        operations are handed to the apply loop before the next batch is
+        read. Only the UUIDs seen so far (with their modification dates)
+        are kept, to find removed reminders once the reader is exhausted.
+        Reminders fetched twice are tracked in `copies` and `newer`; see
+        _track_copy().
+        """
+        sync_config = self.config.get('sync', {})
+        batch_size = max(1, int(sync_config.get('stream_batch_size', 500)))
+        cutoff = self._completed_cutoff()
+        completed_action = sync_config.get('completed_action', 'delete')
+        timer = self._timer
+        seen = plan.reminder_uuids
+        reminders = iter(reminders)
+
+        while True:
+            with timer.phase('fetch'):
+                batch = list(islice(reminders, batch_size))
+            if not batch:
+                break
+            with timer.phase('db_flush'):
+                mappings = self.db.get_mappings(
+                    reminder.uuid for reminder in batch if not self._done_before(reminder)
+                )
+            operations = []
+            with timer.phase('diff'):
+                for reminder in batch:
+                    if not self._track_copy(reminder, copies, newer):
+                        continue
+                    seen.add(reminder.uuid)
+                    plan.total_reminders += 1
+                    if self._done_before(reminder):
+                        continue
+                    op = self._hold_back(self._plan_reminder(
+                        reminder, mappings.get(reminder.uuid), cutoff, completed_action
+                    ))
+                    copies[reminder.uuid] = (reminder.modification_date, op.kind is OperationKind.SKIP)
+                    plan.add(op)
+                    operations.append(op)
+                # The plan is never complete, so urgency orders each batch
+                self._order_by_urgency(operations)
+            yield from operations
+
+        logger.info(f"Fetched {plan.total_reminders} reminders")
+        with timer.phase('db_flush'):
+            mappings = self.db.get_mappings(self.db.get_all_reminder_uuids() - seen)
+        for op in self._removed_operations(mappings, seen):
+            op = self._hold_back(op)
+            seen.add(op.reminder_uuid)
+            plan.add(op)
+            yield op
+
+    def _sync_streaming(self) -> SyncStats:
+        """
+        Sync with reminders flowing through fetch, diff and apply in batches.
+
+        Used by sync() when `sync.streaming` is set. The apply loop pulls
+        operations from _stream_operations(), which pulls reminders from
+        the reader's iter_reminders(), so API requests start after the
+        first batch and memory is bounded by the batch and the apply
+        window instead of the library size. Due retries are not moved
+        ahead of new work, since the plan is never complete up front.
+        """
+        timer = self._timer
+        with timer.phase('db_flush'):
+            self._load_pending()
+            self._start_checkpoint()
+
+        plan = SyncPlan(keep_operations=False, reminder_uuids=set())
+        fetch_timings = {}
+        reminders = self.reminders_reader.iter_reminders(self._calendar_names(), timings=fetch_timings)
+        copies, newer = {}, {}
+        operations = self._stream_operations(plan, reminders, copies, newer)
+
+        if self._dry_run():
+            for _ in operations:
+                pass
+            timer.move('fetch', 'convert', fetch_timings.get('convert', 0.0))
+            logger.info(str(plan))
+            self.stats = plan.to_stats()
+            self.stats.timings = timer.as_ms()
+            logger.info(f"Dry run complete: {self.stats}")
+            return self.stats
+
+        with self.db.buffered_writes():
+            self._apply_all(operations, self._max_workers() > 1)
+            if newer:
+                # Every first copy is recorded; plan the newer ones against it
+                with timer.phase('db_flush'):
+                    self.db.flush()
+                    mappings = self.db.get_mappings(newer)
+                operations = self._plan_newer_copies(newer, copies, mappings)
+                for op in operations:
+                    plan.add(op)
+                self._apply_all(operations, False)
+            with timer.phase('db_flush'):
+                self.db.flush()
+        timer.move('fetch', 'convert', fetch_timings.get('convert', 0.0))
+
+        self.stats.total_reminders = plan.total_reminders
+        logger.info(str(plan))
+        return self._finish_run(plan)
+
+    def _sync_fetched(self, calendar_names: Optional[List[str]]) -> SyncStats:
+        """Fetch every reminder of `calendar_names`, then plan and apply them as a whole."""
+        timer = self._timer
+
+        # The reader reports how much of the fetch was spent converting
+        # EventKit objects; the rest is EventKit itself
+        fetch_timings = {}
+        with timer.phase('fetch'):
+            reminders = self.reminders_reader.fetch_reminders(calendar_names, timings=fetch_timings)
+        timer.move('fetch', 'convert', fetch_timings.get('convert', 0.0))
+
+        logger.info(f"Fetched {len(reminders)} reminders")
+
+        with timer.phase('db_flush'):
+            if self._index is None:
+                # Load all mappings once; the whole diff runs against this index
+                self._index = self.db.load_index()
+                self._load_pending()
+            self._start_checkpoint()
+        logger.debug(f"Loaded {len(self._index)} mappings")
+
+        with timer.phase('diff'):
+            plan = self.plan(reminders, self._index)
+        # Reminders fetched twice count once
+        self.stats.total_reminders = plan.total_reminders
+        logger.info(str(plan))
+
+        if self._dry_run():
+            # Plan-only run: no API calls, no mapping or history writes
+            self.stats = plan.to_stats()
+            self.stats.timings = timer.as_ms()
+            logger.info(f"Dry run complete: {self.stats}")
+            return self.stats
+
+        # Mapping writes are batched and flushed even if the run fails
+        with self.db.buffered_writes():
+            self.apply(plan)
+            with timer.phase('db_flush'):
+                self.db.flush()
+
+        return self._finish_run(plan)
+
+    def _shard_options(self, title: str) -> Dict:
+        return (self.config.get('sync', {}).get('shards') or {}).get(title) or {}
+
+    def _shard_due(self, title: str, now: datetime) -> bool:
+        """Whether a list's `interval` (seconds) has passed since its shard last synced."""
+        interval = float(self._shard_options(title).get('interval') or 0)
+        if interval <= 0:
+            return True
+        try:
+            last = self.db.get_meta(META_SHARD_SYNCED_PREFIX + title)
+            return last is None or now - datetime.fromisoformat(last) >= timedelta(seconds=interval)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Could not read when list '{title}' last synced: {e}")
+            return True
+
+    def _backfill_list_titles(self):
+        """
+        Record the list of mappings written before lists were recorded.
+
+        Without a list such a mapping is a removal candidate in every
+        shard, costing each shard a reader lookup per mapping. One lookup
+        for all of them settles it: the mappings still left without a list
+        are those whose reminders are gone, and the first shard deletes
+        their events.
+        """
+        unlisted = [uuid for uuid, record in self._index.items() if record.list_title is None]
+        if not unlisted:
+            return
+        found = self.reminders_reader.find_reminders(unlisted)
+        logger.info(f"Recording the list of {len(found)} of {len(unlisted)} mappings without one")
+        if self._dry_run():
+            return
+        with self.db.buffered_writes():
+            for uuid, reminder in found.items():
+                self._save_record(self._index[uuid]._replace(list_title=reminder.calendar_title))
+
+    def _sync_shards(self) -> SyncStats:
+        """
+        Sync each reminder list as an independent shard.
+
+        Used by sync() when `sync.shard_by_list` is set. The lists are
+        `reminders.sync_lists`, or every list. A list is due once
+        `sync.shards.<list>.interval` seconds have passed since its shard
+        last synced (every run without an interval); each due list is
+        fetched, planned and applied on its own, with its own watermark,
+        its own sync_history row (shard = list title), and an error budget
+        (`sync.shards.<list>.max_errors`) after which the rest of its
+        operations are deferred. A list that fails is logged and the
+        others still sync. A list that deferred work stays due.
+
+        Returns:
+            Totals over the lists synced this run
+        """
+        lists = list(self._calendar_names() or self.reminders_reader.get_all_calendars())
+        now = datetime.now()
+        due = [title for title in lists if self._shard_due(title, now)]
+
+        with self._timer.phase('db_flush'):
+            self._index = self.db.load_index()
+            self._load_pending()
+            resumed = self.db.load_checkpoint()
+        self._backfill_list_titles()
+        if resumed is not None and resumed[0].shard in lists:
+            # The interrupted list goes first, so its own run resumes the
+            # checkpoint before another list's run replaces it
+            interrupted = resumed[0].shard
+            due = [interrupted] + [title for title in due if title != interrupted]
+        logger.info(f"{len(due)} of {len(lists)} lists due: {', '.join(due)}")
+        totals = SyncStats()
+        totals.timings = self._timer.as_ms()
+        finished = 0
+        for position, title in enumerate(due):
+            if self._stop_requested.is_set() or self._deadline_passed():
+                reason = "Sync stopped" if self._stop_requested.is_set() else "Time budget spent"
+                logger.warning(f"{reason}; {len(due) - position} lists left for the next sync")
+                break
+            self._shard = title
+            self._error_budget = int(self._shard_options(title).get('max_errors') or 0)
+            self.stats = SyncStats()
+            self._timer = PhaseTimer()
+            logger.info(f"Syncing list '{title}'")
+            try:
+                stats = self._sync_fetched([title])
+            except Exception as e:
+                logger.error(f"Sync of list '{title}' failed: {e}")
+                stats = self.stats
+                stats.errors += 1
+                stats.timings = self._timer.as_ms()
+                # Nothing resumes a failed list's checkpoint; don't hand it to the next list
+                self.db.clear_checkpoint()
+                self.db.save_sync_stats(stats, shard=title)
+            else:
+                finished += 1
+                if not self._dry_run() and not stats.deferred:
+                    self.db.set_meta(META_SHARD_SYNCED_PREFIX + title, now.isoformat())
+            totals.add(stats)
+
+        self._shard = None
+        self._error_budget = 0
+        self.stats = totals
+        if self._dry_run():
+            logger.info(f"Dry run complete: {totals}")
+            return totals
+        if finished == len(lists):
+            # Only a run over every list knows which queued retries are stale
+            self._clear_stale_pending(self._shard_planned)
+        self._prune_history()
+        self._maybe_maintain()
+        logger.info(f"Sync complete ({finished} of {len(lists)} lists): {totals}")
+        return totals
+
+    def sync(self) -> SyncStats:
+        """
+        Perform full sync operation.
+
+        Returns:
+            SyncStats object with operation statistics
+        """
+        logger.info("Starting sync operation")
+        self.stats = SyncStats()
+        self._timer = PhaseTimer()
+        self._start_deadline()
+        self._start_incremental()
+
+        try:
+            sync_config = self.config.get('sync', {})
+            if sync_config.get('shard_by_list', False):
+                return self._sync_shards()
+            if sync_config.get('streaming', False):
+                return self._sync_streaming()
+            return self._sync_fetched(self._calendar_names())
 
         except Exception as e:
             logger.error(f"Sync operation failed: {e}")
             raise
 
+        finally:
+            self._index = None
+            self._run_started = None
+            self._pending = {}
+            self._checkpoint = None
+            self._resumed = set()
+            self._deadline = None
+            self._shard = None
+            self._error_budget = 0
+            self._shard_planned = set()
+
 
 def main():
     """Test function."""
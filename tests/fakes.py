@@ -0,0 +1,253 @@
+"""
+In-process fakes of the Google Calendar service and the Reminders reader.
+
+FakeCalendarService implements the slice of the Calendar API client used by
+GoogleCalendarWriter (events().insert/get/list/update/patch/delete/move(...).execute() and
+new_batch_http_request()), with optional per-request latency, so engines can be tested and benchmarked
+end to end without network access.
+"""
+
+import copy
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def make_http_error(status: int, reason: str = '', headers: dict = None) -> HttpError:
+    """Build the HttpError the API client raises for an HTTP status."""
+    response = httplib2.Response({'status': status, 'reason': reason, **(headers or {})})
+    return HttpError(response, reason.encode())
+
+
+class _Request:
+    def __init__(self, service, action):
+        self._service = service
+        self._action = action
+
+    def execute(self):
+        if self._service.latency:
+            time.sleep(self._service.latency)
+        with self._service.lock:
+            self._service.requests += 1
+            self._service._check_quota()
+        return self._action()
+
+
+class _Batch:
+    """Batch of requests sent as one HTTP round trip, like BatchHttpRequest."""
+
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self._requests.append((request, callback or self._callback, request_id or str(len(self._requests))))
+
+    def execute(self):
+        if self._service.latency:
+            time.sleep(self._service.latency)
+        with self._service.lock:
+            self._service.batches += 1
+        for request, callback, request_id in self._requests:
+            try:
+                with self._service.lock:
+                    self._service.requests += 1
+                    self._service._check_quota()
+                response, exception = request._action(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+class _Events:
+    def __init__(self, service):
+        self._service = service
+
+    def insert(self, calendarId, body):
+        return _Request(self._service, lambda: self._service._insert(calendarId, body))
+
+    def get(self, calendarId, eventId):
+        return _Request(self._service, lambda: self._service._get(calendarId, eventId))
+
+    def list(self, calendarId, maxResults=250, pageToken=None, fields=None, **kwargs):
+        return _Request(self._service, lambda: self._service._list(calendarId, maxResults, pageToken))
+
+    def update(self, calendarId, eventId, body):
+        return _Request(self._service, lambda: self._service._update(calendarId, eventId, body))
+
+    def patch(self, calendarId, eventId, body):
+        return _Request(self._service, lambda: self._service._patch(calendarId, eventId, body))
+
+    def delete(self, calendarId, eventId):
+        return _Request(self._service, lambda: self._service._delete(calendarId, eventId))
+
+    def move(self, calendarId, eventId, destination):
+        return _Request(self._service, lambda: self._service._move(calendarId, eventId, destination))
+
+
+class FakeCalendarService:
+    """Thread-safe in-memory Calendar service with injected latency."""
+
+    def __init__(self, latency: float = 0.0, quota_per_second: Optional[int] = None):
+        """
+        Args:
+            latency: Seconds each request sleeps before it is served
+            quota_per_second: Requests allowed in any one-second window;
+                beyond it requests fail with 429 like the real API
+        """
+        self.latency = latency
+        self.quota_per_second = quota_per_second
+        self.lock = threading.Lock()
+        # (calendar ID, event ID) -> event body
+        self.stored = {}
+        self.requests = 0
+        self.batches = 0
+        self.rejected = 0
+        # Request bodies of patches, in order
+        self.patched_bodies = []
+        self._window = deque()
+
+    def _check_quota(self):
+        """Reject the request if the sliding one-second window is full (lock held)."""
+        if self.quota_per_second is None:
+            return
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= 1.0:
+            self._window.popleft()
+        if len(self._window) >= self.quota_per_second:
+            self.rejected += 1
+            raise make_http_error(429, 'rateLimitExceeded')
+        self._window.append(now)
+
+    def events(self):
+        return _Events(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    @staticmethod
+    def _event_id(body):
+        # Derive IDs from the reminder UUID so independent runs agree
+        uuid = body.get('extendedProperties', {}).get('private', {}).get('reminderUUID')
+        return f"evt-{uuid}"
+
+    def _insert(self, calendar_id, body):
+        event = dict(copy.deepcopy(body), id=self._event_id(body))
+        with self.lock:
+            self.stored[(calendar_id, event['id'])] = event
+        return copy.deepcopy(event)
+
+    def _get(self, calendar_id, event_id):
+        with self.lock:
+            if (calendar_id, event_id) not in self.stored:
+                raise make_http_error(404, 'Not Found')
+            return copy.deepcopy(self.stored[(calendar_id, event_id)])
+
+    def _list(self, calendar_id, max_results, page_token):
+        """One page of a calendar's events in ID order; the token is an offset."""
+        start = int(page_token or 0)
+        with self.lock:
+            ids = sorted(event_id for calendar, event_id in self.stored if calendar == calendar_id)
+            items = [copy.deepcopy(self.stored[(calendar_id, event_id)]) for event_id in ids[start:start + max_results]]
+        response = {'items': items}
+        if start + max_results < len(ids):
+            response['nextPageToken'] = str(start + max_results)
+        return response
+
+    def _update(self, calendar_id, event_id, body):
+        with self.lock:
+            if (calendar_id, event_id) not in self.stored:
+                raise make_http_error(404, 'Not Found')
+            self.stored[(calendar_id, event_id)] = dict(copy.deepcopy(body), id=event_id)
+            return copy.deepcopy(self.stored[(calendar_id, event_id)])
+
+    @staticmethod
+    def _merge(target, changes):
+        """Apply PATCH semantics: objects merge, null clears a field."""
+        for key, value in changes.items():
+            if value is None:
+                target.pop(key, None)
+            elif isinstance(value, dict) and isinstance(target.get(key), dict):
+                FakeCalendarService._merge(target[key], value)
+            else:
+                target[key] = copy.deepcopy(value)
+
+    def _patch(self, calendar_id, event_id, body):
+        with self.lock:
+            if (calendar_id, event_id) not in self.stored:
+                raise make_http_error(404, 'Not Found')
+            self.patched_bodies.append(copy.deepcopy(body))
+            self._merge(self.stored[(calendar_id, event_id)], body)
+            return copy.deepcopy(self.stored[(calendar_id, event_id)])
+
+    def _move(self, calendar_id, event_id, destination):
+        with self.lock:
+            if (calendar_id, event_id) not in self.stored:
+                raise make_http_error(404, 'Not Found')
+            event = self.stored[(destination, event_id)] = self.stored.pop((calendar_id, event_id))
+            return copy.deepcopy(event)
+
+    def _delete(self, calendar_id, event_id):
+        with self.lock:
+            if self.stored.pop((calendar_id, event_id), None) is None:
+                raise make_http_error(410, 'Deleted')
+        return ''
+
+
+class FakeRemindersReader:
+    """Serves a fixed list of reminders through the RemindersReader interface."""
+
+    def __init__(self, reminders, delay: float = 0.0):
+        """
+        Args:
+            reminders: Reminder-like objects to return
+            delay: Seconds to sleep before each reminder is yielded
+        """
+        self.reminders = list(reminders)
+        self.delay = delay
+
+    def get_all_calendars(self):
+        return list(dict.fromkeys(reminder.calendar_title for reminder in self.reminders))
+
+    def iter_reminders(self, calendar_names=None, timings=None):
+        for reminder in self.reminders:
+            if calendar_names and reminder.calendar_title not in calendar_names:
+                continue
+            if self.delay:
+                time.sleep(self.delay)
+            yield reminder
+        if timings is not None:
+            timings['convert'] = 0.0
+
+    def fetch_reminders(self, calendar_names=None, timings=None):
+        return list(self.iter_reminders(calendar_names, timings))
+
+    def find_reminders(self, uuids):
+        uuids = set(uuids)
+        return {reminder.uuid: reminder for reminder in self.reminders if reminder.uuid in uuids}
+
+
+def make_reminder(uuid: str, **fields) -> SimpleNamespace:
+    """Build a reminder with the attributes the engine reads."""
+    defaults = dict(
+        uuid=uuid,
+        title=f"Reminder {uuid}",
+        notes="",
+        due_date=datetime(2025, 1, 20, 15, 0),
+        priority=0,
+        completed=False,
+        completion_date=None,
+        location=None,
+        calendar_title="Reminders",
+        modification_date=datetime(2025, 1, 1, 9, 0),
+    )
+    defaults.update(fields)
+    return SimpleNamespace(**defaults)
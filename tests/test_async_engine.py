@@ -0,0 +1,149 @@
+"""
+Unit tests for async_engine module.
+"""
+
+import unittest
+import threading
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add src and tests to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from async_engine import AsyncSyncEngine
+from gcal_writer import GoogleCalendarWriter
+from sync_engine import MemoryMappingStore, SyncEngine
+from fakes import FakeCalendarService, FakeRemindersReader, make_reminder
+
+
+def first_run():
+    return [make_reminder(f"r{i}", priority=i % 10) for i in range(40)]
+
+
+def second_run():
+    """
+    Edit some reminders, complete some and drop others.
+
+    Completed reminders are also fetched first in their stale incomplete
+    state, as when completed while EventKit was being read.
+    """
+    reminders = []
+    stale = []
+    for i, reminder in enumerate(first_run()):
+        if i % 10 == 3:
+            continue
+        if i % 10 == 5:
+            reminder.title = f"Edited {i}"
+            reminder.modification_date = datetime(2025, 1, 2, 9, 0)
+        if i % 10 == 7:
+            stale.append(make_reminder(reminder.uuid, priority=reminder.priority))
+            reminder.completed = True
+            reminder.modification_date = datetime(2025, 1, 2, 9, 0)
+        reminders.append(reminder)
+    reminders += [make_reminder(f"new{i}") for i in range(5)]
+    return stale + reminders
+
+
+def mapping_state(store):
+    """Mappings without the wall-clock last_synced column."""
+    return {
+        uuid: (record.event_id, record.last_modified, record.checksum, record.checksum_version)
+        for uuid, record in store.load_index().items()
+    }
+
+
+class TestAsyncSyncEngine(unittest.TestCase):
+    """Test cases for AsyncSyncEngine."""
+
+    def make_engine(self, engine_class, reminders, service, store, max_workers=8):
+        writer = GoogleCalendarWriter(service, service_factory=lambda: service)
+        config = {'sync': {'max_workers': max_workers, 'completed_action': 'delete'}}
+        return engine_class(FakeRemindersReader(reminders), writer, store, config)
+
+    def run_both_runs(self, engine_class):
+        service = FakeCalendarService(latency=0.002)
+        store = MemoryMappingStore()
+        stats = [
+            self.make_engine(engine_class, reminders, service, store).sync()
+            for reminders in (first_run(), second_run())
+        ]
+        return service, store, stats
+
+    def test_matches_thread_engine(self):
+        """Async and thread engines leave identical mappings and events."""
+        thread_service, thread_store, thread_stats = self.run_both_runs(SyncEngine)
+        async_service, async_store, async_stats = self.run_both_runs(AsyncSyncEngine)
+
+        self.assertEqual(mapping_state(async_store), mapping_state(thread_store))
+        self.assertEqual(async_service.stored, thread_service.stored)
+        for thread_run, async_run in zip(thread_stats, async_stats):
+            self.assertEqual(
+                (async_run.total_reminders, async_run.created, async_run.updated,
+                 async_run.deleted, async_run.skipped, async_run.errors),
+                (thread_run.total_reminders, thread_run.created, thread_run.updated,
+                 thread_run.deleted, thread_run.skipped, thread_run.errors),
+            )
+        self.assertEqual(async_stats[1].errors, 0)
+        self.assertGreater(async_stats[1].deleted, 0)
+        self.assertGreater(async_stats[1].updated, 0)
+
+    def test_in_flight_requests_bounded(self):
+        """No more than sync.max_workers requests run at once."""
+        service = FakeCalendarService(latency=0.01)
+        engine = self.make_engine(AsyncSyncEngine, first_run(), service, MemoryMappingStore(), max_workers=3)
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, peak
+        create_event = engine.gcal_writer.create_event
+
+        def tracking_create(**kwargs):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            try:
+                return create_event(**kwargs)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        engine.gcal_writer.create_event = tracking_create
+        stats = engine.sync()
+
+        self.assertEqual(stats.created, 40)
+        self.assertEqual(in_flight[1], 3)
+
+    def test_removed_reminders_deleted_in_batches(self):
+        """Deletes of removed reminders share batch requests, as in the thread engine."""
+        service = FakeCalendarService()
+        store = MemoryMappingStore()
+        self.make_engine(AsyncSyncEngine, first_run(), service, store).sync()
+        service.batches = 0
+
+        stats = self.make_engine(AsyncSyncEngine, first_run()[:10], service, store).sync()
+
+        self.assertEqual((stats.deleted, stats.errors), (30, 0))
+        self.assertEqual(service.batches, 1)
+        self.assertEqual(len(store.load_index()), 10)
+
+    def test_failed_request_counts_as_error(self):
+        """A request that raises is recorded as an error, not a mapping."""
+        service = FakeCalendarService()
+        store = MemoryMappingStore()
+        engine = self.make_engine(AsyncSyncEngine, first_run()[:3], service, store)
+        create_event = engine.gcal_writer.create_event
+
+        def flaky_create(**kwargs):
+            if kwargs['reminder_uuid'] == 'r1':
+                raise RuntimeError("boom")
+            return create_event(**kwargs)
+
+        engine.gcal_writer.create_event = flaky_create
+        stats = engine.sync()
+
+        self.assertEqual((stats.created, stats.errors), (2, 1))
+        self.assertEqual(set(store.load_index()), {'r0', 'r2'})
+
+
+if __name__ == '__main__':
+    unittest.main()
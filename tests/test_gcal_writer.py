@@ -3,15 +3,18 @@ Unit tests for gcal_writer module.
 """
 
 import unittest
+import threading
 from datetime import datetime, timedelta
 from unittest.mock import Mock, MagicMock, patch
 from pathlib import Path
 import sys
 
-# Add src to path
+# Add src and tests to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
 
 from gcal_writer import GoogleCalendarWriter
+from fakes import FakeCalendarService, make_http_error
 
 
 class TestGoogleCalendarWriter(unittest.TestCase):
@@ -28,6 +31,26 @@ class TestGoogleCalendarWriter(unittest.TestCase):
         self.assertEqual(self.writer.service, self.mock_service)
         self.assertEqual(self.writer.calendar_id, self.calendar_id)
 
+    def test_service_per_thread_with_factory(self):
+        """Test worker threads get their own service from service_factory."""
+        factory = Mock(side_effect=lambda: Mock())
+        writer = GoogleCalendarWriter(self.mock_service, self.calendar_id, service_factory=factory)
+        self.assertIs(writer.service, self.mock_service)
+
+        services = []
+        def use_service():
+            services.append(writer.service)
+            services.append(writer.service)
+        for _ in range(2):
+            thread = threading.Thread(target=use_service)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(factory.call_count, 2)
+        self.assertIs(services[0], services[1])
+        self.assertIsNot(services[0], services[2])
+        self.assertNotIn(self.mock_service, services)
+
     def test_get_priority_color_default(self):
         """Test default priority color mapping."""
         # No custom colors
@@ -242,6 +265,79 @@ class TestGoogleCalendarWriter(unittest.TestCase):
         result = self.writer.delete_event('event-id')
         self.assertFalse(result)
 
+    def test_delete_event_already_gone(self):
+        """Test 404 and 410 on delete count as success."""
+        for status in (404, 410):
+            self.mock_service.events.return_value.delete.return_value.execute.side_effect = make_http_error(status)
+            self.assertTrue(self.writer.delete_event('event-id'))
+
+        self.mock_service.events.return_value.delete.return_value.execute.side_effect = make_http_error(403)
+        self.assertFalse(self.writer.delete_event('event-id'))
+
+    def test_batch_delete_events(self):
+        """Test deletes share one batch request and missing events count as deleted."""
+        service = FakeCalendarService()
+        for event_id in ('evt-a', 'evt-b'):
+            service.stored[(self.calendar_id, event_id)] = {'id': event_id}
+        writer = GoogleCalendarWriter(service, self.calendar_id)
+
+        results = writer.batch_delete_events(['evt-a', 'evt-b', 'evt-missing'])
+
+        self.assertEqual(results, {'evt-a': True, 'evt-b': True, 'evt-missing': True})
+        self.assertEqual((service.batches, service.requests), (1, 3))
+        self.assertEqual(service.stored, {})
+
+    def test_batch_delete_falls_back_to_single_deletes(self):
+        """Test deletes a batch did not settle are sent one by one."""
+        # A Mock batch never calls back, like a batch whose request failed
+        self.mock_service.events.return_value.delete.return_value.execute.return_value = ''
+
+        results = self.writer.batch_delete_events(['evt-a', 'evt-b'])
+
+        self.assertEqual(results, {'evt-a': True, 'evt-b': True})
+        self.assertEqual(self.mock_service.events.return_value.delete.return_value.execute.call_count, 2)
+
+    def test_patch_event_sends_only_given_fields(self):
+        """Test a patch is one request carrying just the fields passed."""
+        service = FakeCalendarService()
+        event_id = GoogleCalendarWriter(service, self.calendar_id).create_event(
+            summary="Old", description="Long notes", start_datetime=datetime(2025, 1, 20, 15, 0),
+            reminder_uuid='r1'
+        )['id']
+        writer = GoogleCalendarWriter(service, self.calendar_id)
+        service.requests = 0
+
+        patched = writer.patch_event(event_id, summary="New")
+
+        self.assertEqual(service.requests, 1)
+        self.assertEqual(service.patched_bodies, [{'summary': "New"}])
+        self.assertEqual((patched['summary'], patched['description']), ("New", "Long notes"))
+
+        # Switching to all-day clears the timed form
+        patched = writer.patch_event(event_id, start_datetime=datetime(2025, 1, 21), all_day=True)
+        self.assertEqual(patched['start'], {'date': '2025-01-21'})
+
+        with self.assertRaises(TypeError):
+            writer.patch_event(event_id, title="typo")
+
+    def test_iter_event_pages_requests_projection(self):
+        """Test listing pages with the reconcile projection until no token is left."""
+        mock_list = self.mock_service.events.return_value.list
+        mock_list.return_value.execute.side_effect = [
+            {'items': [{'id': 'a'}, {'id': 'b'}], 'nextPageToken': 'next'},
+            {'items': [{'id': 'c'}]},
+        ]
+
+        pages = list(self.writer.iter_event_pages(page_size=5000))
+
+        self.assertEqual(pages, [[{'id': 'a'}, {'id': 'b'}], [{'id': 'c'}]])
+        first, second = mock_list.call_args_list
+        self.assertEqual(first.kwargs['maxResults'], 2500)
+        self.assertIsNone(first.kwargs['pageToken'])
+        self.assertEqual(second.kwargs['pageToken'], 'next')
+        self.assertIn('extendedProperties/private/reminderUUID', first.kwargs['fields'])
+        self.assertEqual(first.kwargs['calendarId'], self.calendar_id)
+
 
     def test_create_event_without_end_datetime(self):
         """Test creating event without explicit end time."""
@@ -47,6 +47,7 @@ class TestEndToEndSync(unittest.TestCase):
 
     def tearDown(self):
         """Clean up test fixtures."""
+        self.db.close()
         if self.db_path.exists():
             self.db_path.unlink()
         Path(self.temp_dir).rmdir()
@@ -63,6 +64,7 @@ class TestEndToEndSync(unittest.TestCase):
         mock_reminder1.completed = False
         mock_reminder1.location = 'Supermarket'
         mock_reminder1.modification_date = datetime.now()
+        mock_reminder1.calendar_title = 'Reminders'
 
         mock_reminder2 = Mock()
         mock_reminder2.uuid = 'reminder-2'
@@ -73,6 +75,7 @@ class TestEndToEndSync(unittest.TestCase):
         mock_reminder2.completed = False
         mock_reminder2.location = 'Hospital'
         mock_reminder2.modification_date = datetime.now()
+        mock_reminder2.calendar_title = 'Reminders'
 
         self.mock_reminders_reader.fetch_reminders.return_value = [
             mock_reminder1,
@@ -125,6 +128,7 @@ class TestEndToEndSync(unittest.TestCase):
         mock_reminder.completed = False
         mock_reminder.location = 'New location'
         mock_reminder.modification_date = datetime.now()
+        mock_reminder.calendar_title = 'Reminders'
 
         self.mock_reminders_reader.fetch_reminders.return_value = [mock_reminder]
 
@@ -246,6 +250,7 @@ class TestEndToEndSync(unittest.TestCase):
         mock_existing.completed = False
         mock_existing.location = None
         mock_existing.modification_date = datetime.now()
+        mock_existing.calendar_title = 'Reminders'
 
         mock_new = Mock()
         mock_new.uuid = 'new-reminder'
@@ -256,6 +261,7 @@ class TestEndToEndSync(unittest.TestCase):
         mock_new.completed = False
         mock_new.location = None
         mock_new.modification_date = datetime.now()
+        mock_new.calendar_title = 'Reminders'
 
         self.mock_reminders_reader.fetch_reminders.return_value = [
             mock_existing,
@@ -318,11 +324,12 @@ class TestDatabasePersistence(unittest.TestCase):
         db1.save_mapping('test-uuid', 'test-event-id')
 
         # Close and reopen database
-        del db1
+        db1.close()
         db2 = MappingDatabase(str(self.db_path))
 
         # Verify data persists
         result = db2.get_event_id('test-uuid')
+        db2.close()
         self.assertEqual(result, 'test-event-id')
 
 
@@ -0,0 +1,430 @@
+"""
+Unit tests for mapping_store module.
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from datetime import datetime, timedelta
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from mapping_store import (
+    JournalMappingStore, MappingDatabase, MappingStore, MemoryMappingStore, PendingOperation, SyncCheckpoint,
+    CHECKSUM_VERSION_MD5, META_SYNCS_SINCE_MAINTENANCE, TIMING_KEYS, open_mapping_store
+)
+from sync_engine import SyncStats
+
+
+class MappingStoreContract:
+    """Behaviour every backend must share. Mixed into one TestCase per backend."""
+
+    def make_store(self, **options):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_get_mapping(self):
+        """Test a saved mapping round-trips with its checksum bytes."""
+        modified = datetime(2025, 1, 1, 9, 0)
+        self.store.save_mapping("uuid-1", "event-1", modified, b'\x01\x02\x03\x04\x05\x06\x07\x08')
+
+        record = self.store.get_mapping("uuid-1")
+        self.assertEqual(record.event_id, "event-1")
+        self.assertEqual(record.last_modified, modified)
+        self.assertEqual(record.checksum, b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.assertIsInstance(record.last_synced, datetime)
+        self.assertEqual(self.store.get_event_id("uuid-1"), "event-1")
+        self.assertIsNone(self.store.get_mapping("missing"))
+
+    def test_calendar_id_round_trips(self):
+        """Test a mapping keeps the calendar its event was routed to."""
+        self.store.save_mapping("uuid-1", "event-1", calendar_id="work@group.calendar.google.com")
+        self.store.save_mapping("uuid-2", "event-2")
+
+        index = self.store.load_index()
+        self.assertEqual(index["uuid-1"].calendar_id, "work@group.calendar.google.com")
+        self.assertIsNone(index["uuid-2"].calendar_id)
+
+    def test_fingerprint_round_trips(self):
+        """Test a mapping keeps its per-field fingerprint bytes."""
+        self.store.save_mapping("uuid-1", "event-1", fingerprint=b'\x01' * 20)
+        self.store.save_mapping("uuid-2", "event-2")
+
+        self.assertEqual(self.store.get_mapping("uuid-1").fingerprint, b'\x01' * 20)
+        self.assertIsNone(self.store.load_index()["uuid-2"].fingerprint)
+
+    def test_list_title_round_trips(self):
+        """Test a mapping keeps the reminder list it was synced from."""
+        self.store.save_mapping("uuid-1", "event-1", list_title="Groceries")
+        self.store.save_mapping("uuid-2", "event-2")
+
+        self.assertEqual(self.store.get_mapping("uuid-1").list_title, "Groceries")
+        self.assertIsNone(self.store.load_index()["uuid-2"].list_title)
+
+    def test_legacy_string_checksum(self):
+        """Test MD5 hex checksums keep their type and version."""
+        self.store.save_mapping("uuid-1", "event-1", None, "a" * 32, CHECKSUM_VERSION_MD5)
+        record = self.store.get_mapping("uuid-1")
+        self.assertEqual(record.checksum, "a" * 32)
+        self.assertEqual(record.checksum_version, CHECKSUM_VERSION_MD5)
+
+    def test_update_and_delete(self):
+        """Test upsert replaces a mapping and delete removes it."""
+        self.store.save_mapping("uuid-1", "event-1")
+        self.store.save_mapping("uuid-1", "event-2")
+        self.assertEqual(self.store.get_event_id("uuid-1"), "event-2")
+        self.assertEqual(self.store.count_mappings(), 1)
+
+        self.store.delete_mapping("uuid-1")
+        self.assertIsNone(self.store.get_mapping("uuid-1"))
+        self.assertEqual(self.store.count_mappings(), 0)
+
+    def test_buffered_writes_visible_to_reads(self):
+        """Test reads inside a buffered block see queued writes."""
+        with self.store.buffered_writes():
+            for i in range(5):
+                self.store.save_mapping(f"uuid-{i}", f"event-{i}")
+            self.store.delete_mapping("uuid-0")
+            self.assertEqual(set(self.store.load_index()), {f"uuid-{i}" for i in range(1, 5)})
+        self.assertEqual(self.store.get_all_reminder_uuids(), {f"uuid-{i}" for i in range(1, 5)})
+
+    def test_failed_flush_keeps_block_error(self):
+        """Test a flush failing while a block unwinds does not replace the block's exception."""
+        def failing_flush():
+            raise OSError("disk full")
+
+        with self.assertRaisesRegex(RuntimeError, "boom"), self.assertLogs('mapping_store', 'ERROR'):
+            with self.store.buffered_writes():
+                self.store.save_mapping("uuid-1", "event-1")
+                self.store.flush = failing_flush
+                raise RuntimeError("boom")
+
+        # Without an exception in flight, the flush error propagates
+        with self.assertRaises(OSError):
+            with self.store.buffered_writes():
+                self.store.save_mapping("uuid-2", "event-2")
+        del self.store.flush
+
+    def test_lookups(self):
+        """Test bulk, reverse and staleness lookups."""
+        for i in range(3):
+            self.store.save_mapping(f"uuid-{i}", f"event-{i}")
+
+        records = self.store.get_mappings(["uuid-0", "uuid-2", "missing"])
+        self.assertEqual(set(records), {"uuid-0", "uuid-2"})
+        self.assertEqual(self.store.find_by_event_id("event-1").reminder_uuid, "uuid-1")
+        self.assertIsNone(self.store.find_by_event_id("missing"))
+
+        stale = self.store.get_stale_mappings(datetime.now() + timedelta(seconds=1), limit=2)
+        self.assertEqual([r.reminder_uuid for r in stale], ["uuid-0", "uuid-1"])
+        self.assertEqual(self.store.get_stale_mappings(datetime.now() - timedelta(days=1)), [])
+
+    def test_history_and_rollups(self):
+        """Test sync stats land in history and both rollups."""
+        self.store.save_sync_stats(SyncStats(total_reminders=10, created=2, updated=1))
+        self.store.save_sync_stats(SyncStats(total_reminders=10, deleted=1, errors=1))
+
+        history = self.store.get_recent_history(5)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history[0][1:], (10, 0, 0, 1, 1, None))
+
+        (daily,) = self.store.get_rollups('daily', 7)
+        self.assertEqual(daily[0], datetime.now().strftime('%Y-%m-%d'))
+        self.assertEqual(daily[1:], (2, 1, 20, 2, 1, 1, 1))
+        self.assertEqual(len(self.store.get_rollups('hourly', 24)), 1)
+
+    def test_history_records_shard(self):
+        """Test a list shard's stats are kept apart in history."""
+        self.store.save_sync_stats(SyncStats(total_reminders=3, created=3), shard="Groceries")
+        self.assertEqual(self.store.get_recent_history(1)[0][1:], (3, 3, 0, 0, 0, "Groceries"))
+
+        self.assertEqual(self.store.prune_history(0), 0)
+        self.assertEqual(self.store.prune_history(30), 0)
+
+    def test_recent_timings(self):
+        """Test only runs with timings are returned, newest first."""
+        timings = dict(zip(TIMING_KEYS, range(1, len(TIMING_KEYS) + 1)))
+        self.store.save_sync_stats(SyncStats(total_reminders=1))
+        self.store.save_sync_stats(SyncStats(total_reminders=2, timings=timings))
+
+        (row,) = self.store.get_recent_timings(10)
+        self.assertEqual(row[1:], tuple(range(1, len(TIMING_KEYS) + 1)))
+
+    def test_meta_and_maintain(self):
+        """Test metadata round-trips and maintain() resets the sync counter."""
+        self.assertEqual(self.store.get_meta('missing', 'x'), 'x')
+        self.store.set_meta(META_SYNCS_SINCE_MAINTENANCE, '41')
+        self.store.save_mapping("uuid-1", "event-1")
+
+        report = self.store.maintain()
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.backend, self.store.backend)
+        self.assertEqual(self.store.get_meta(META_SYNCS_SINCE_MAINTENANCE), '0')
+        self.assertEqual(self.store.get_event_id("uuid-1"), "event-1")
+
+    def test_pending_ops(self):
+        """Test the retry queue stores one replaceable entry per reminder."""
+        due = datetime(2025, 1, 1, 9, 0)
+        self.store.save_pending_op(PendingOperation("uuid-1", 'create', None, 1, due, "HTTP 500"))
+        self.store.save_pending_op(PendingOperation("uuid-2", 'delete', "event-2", 1, due))
+        self.store.save_pending_op(
+            PendingOperation("uuid-1", 'create', None, 2, due + timedelta(minutes=2), "HTTP 503")
+        )
+        self.store.delete_pending_op("uuid-2")
+        self.store.delete_pending_op("missing")
+
+        self.assertEqual(
+            self.store.load_pending_ops(),
+            {"uuid-1": PendingOperation("uuid-1", 'create', None, 2, due + timedelta(minutes=2), "HTTP 503")}
+        )
+
+
+    def test_checkpoint_commits_with_mapping_batch(self):
+        """Test a buffered checkpoint is written with the mappings it describes."""
+        started = datetime(2025, 1, 1, 9, 0)
+        self.assertIsNone(self.store.load_checkpoint())
+
+        with self.store.buffered_writes():
+            self.store.save_mapping("uuid-1", "event-1")
+            self.store.save_checkpoint(SyncCheckpoint("run-1", started, created=1), ["uuid-1"])
+            self.store.save_mapping("uuid-2", "event-2")
+            self.store.save_checkpoint(SyncCheckpoint("run-1", started, created=2), ["uuid-2"])
+
+        self.assertEqual(
+            self.store.load_checkpoint(),
+            (SyncCheckpoint("run-1", started, 2, 0, 0), {"uuid-1", "uuid-2"})
+        )
+        self.assertEqual(self.store.count_mappings(), 2)
+
+        self.store.clear_checkpoint()
+        self.assertIsNone(self.store.load_checkpoint())
+
+
+class TestSQLiteMappingStore(MappingStoreContract, unittest.TestCase):
+    """Run the store contract against MappingDatabase."""
+
+    def make_store(self, **options):
+        return MappingDatabase(str(Path(self.temp_dir) / 'mapping.db'), options)
+
+
+    def churn(self, count=3000):
+        with self.store.buffered_writes():
+            for i in range(count):
+                self.store.save_mapping(f"uuid-{i}", f"event-{i}", None, b'\x00' * 8)
+        with self.store.buffered_writes():
+            for i in range(count):
+                self.store.delete_mapping(f"uuid-{i}")
+
+    def test_maintain_reclaims_free_pages(self):
+        """Test maintenance returns pages freed by deletes to the file system."""
+        self.churn()
+        report = self.store.maintain()
+
+        self.assertGreater(report.free_pages_before, 0)
+        self.assertEqual(report.free_pages_after, 0)
+        self.assertLess(report.size_after, report.size_before)
+        self.assertIn('incremental_vacuum', report.steps)
+        self.assertIn('quick_check', report.steps)
+
+    def test_maintain_converts_legacy_auto_vacuum(self):
+        """Test a file created without auto_vacuum is converted with one VACUUM."""
+        self.store.close()
+        Path(self.temp_dir, 'mapping.db').unlink()
+        self.store = self.make_store(auto_vacuum='NONE')
+
+        self.assertIn('vacuum', self.store.maintain().steps)
+        self.assertEqual(self.store._conn.execute('PRAGMA auto_vacuum').fetchone()[0], 2)
+        self.assertIn('incremental_vacuum', self.store.maintain().steps)
+
+
+class TestMemoryMappingStore(MappingStoreContract, unittest.TestCase):
+    """Run the store contract against MemoryMappingStore."""
+
+    def make_store(self, **options):
+        return MemoryMappingStore(options)
+
+
+class TestJournalMappingStore(MappingStoreContract, unittest.TestCase):
+    """Run the store contract against JournalMappingStore, plus journal specifics."""
+
+    def make_store(self, **options):
+        options.setdefault('fsync', False)
+        return JournalMappingStore(str(self.journal_path), options)
+
+    @property
+    def journal_path(self):
+        return Path(self.temp_dir) / 'mapping.journal'
+
+    def reopen(self, **options):
+        self.store.close()
+        self.store = self.make_store(**options)
+
+    def test_state_survives_reopen(self):
+        """Test mappings, history and rollups are replayed from the journal."""
+        self.store.save_mapping(
+            "uuid-1", "event-1", datetime(2025, 1, 1), b'\xff' * 8, calendar_id="work", list_title="Work",
+            fingerprint=b'\x02' * 20
+        )
+        self.store.save_mapping("uuid-2", "event-2")
+        self.store.delete_mapping("uuid-2")
+        self.store.save_sync_stats(SyncStats(total_reminders=1, created=1), shard="Work")
+        self.reopen()
+
+        self.assertEqual(set(self.store.load_index()), {"uuid-1"})
+        self.assertEqual(self.store.get_checksum("uuid-1"), b'\xff' * 8)
+        self.assertEqual(self.store.get_mapping("uuid-1").calendar_id, "work")
+        self.assertEqual(self.store.get_mapping("uuid-1").list_title, "Work")
+        self.assertEqual(self.store.get_mapping("uuid-1").fingerprint, b'\x02' * 20)
+        self.assertEqual([row[6] for row in self.store.get_recent_history(5)], ["Work"])
+        self.assertEqual(self.store.get_rollups('daily')[0][1:3], (1, 0))
+
+    def test_checkpoint_survives_reopen_and_compaction(self):
+        """Test a checkpoint is replayed, kept in snapshots and cleared durably."""
+        checkpoint = SyncCheckpoint("run-1", datetime(2025, 1, 1), 1, 2, 3)
+        self.store.save_checkpoint(checkpoint, ["uuid-1"])
+        self.store.save_checkpoint(checkpoint, ["uuid-2"])
+        self.reopen()
+        self.assertEqual(self.store.load_checkpoint(), (checkpoint, {"uuid-1", "uuid-2"}))
+
+        self.store.compact()
+        self.reopen()
+        self.assertEqual(self.store.load_checkpoint(), (checkpoint, {"uuid-1", "uuid-2"}))
+
+        self.store.clear_checkpoint()
+        self.reopen()
+        self.assertIsNone(self.store.load_checkpoint())
+
+    def test_pending_ops_survive_reopen_and_compaction(self):
+        """Test the retry queue is replayed and kept in snapshots."""
+        pending = PendingOperation("uuid-1", 'update', "event-1", 3, datetime(2025, 1, 1), "timeout")
+        self.store.save_pending_op(pending)
+        self.store.save_pending_op(pending._replace(reminder_uuid="uuid-2"))
+        self.store.delete_pending_op("uuid-2")
+        self.reopen()
+        self.assertEqual(self.store.load_pending_ops(), {"uuid-1": pending})
+
+        self.store.compact()
+        self.reopen()
+        self.assertEqual(self.store.load_pending_ops(), {"uuid-1": pending})
+
+    def test_timings_survive_compaction(self):
+        """Test phase timings are kept in the compacted snapshot."""
+        timings = dict.fromkeys(TIMING_KEYS, 7)
+        self.store.save_sync_stats(SyncStats(total_reminders=1, timings=timings))
+        self.store.compact()
+        self.reopen()
+        self.assertEqual(self.store.get_recent_timings(5)[0][1:], (7,) * len(TIMING_KEYS))
+
+    def test_maintain_compacts_journal(self):
+        """Test maintenance rewrites the journal as a snapshot."""
+        for i in range(20):
+            self.store.save_mapping("uuid-1", f"event-{i}")
+        report = self.store.maintain()
+
+        self.assertIn('compact', report.steps)
+        self.assertLess(report.size_after, report.size_before)
+        self.reopen()
+        self.assertEqual(self.store.get_meta(META_SYNCS_SINCE_MAINTENANCE), '0')
+
+    def test_buffered_batch_is_one_append(self):
+        """Test a flushed batch is written with a single file write."""
+        with self.store.buffered_writes():
+            for i in range(10):
+                self.store.save_mapping(f"uuid-{i}", f"event-{i}")
+        self.assertEqual(len(self.journal_path.read_text().splitlines()), 10)
+
+    def test_compaction_drops_superseded_entries(self):
+        """Test the journal is rewritten once it outgrows the live state."""
+        self.reopen(compact_min_entries=10, compact_ratio=2.0)
+        for i in range(30):
+            self.store.save_mapping("uuid-1", f"event-{i}")
+        self.store.save_sync_stats(SyncStats(total_reminders=1))
+
+        lines = self.journal_path.read_text().splitlines()
+        self.assertLessEqual(len(lines), 10)
+        self.assertFalse(self.journal_path.with_name('mapping.journal.tmp').exists())
+
+        self.reopen()
+        self.assertEqual(self.store.get_event_id("uuid-1"), "event-29")
+        self.assertEqual(len(self.store.get_recent_history(5)), 1)
+        # Rollups restored from the snapshot are not double counted
+        self.assertEqual(self.store.get_rollups('daily')[0][1], 1)
+
+    def test_torn_last_line_is_skipped(self):
+        """Test a partially written final entry does not lose earlier ones."""
+        self.store.save_mapping("uuid-1", "event-1")
+        self.store.close()
+        with open(self.journal_path, 'a') as f:
+            f.write('{"op":"put","uuid":"uuid-2","ev')
+
+        with self.assertLogs('mapping_store', level='WARNING'):
+            self.store = self.make_store()
+        self.assertEqual(set(self.store.load_index()), {"uuid-1"})
+
+        # The damaged line was compacted away, so new appends replay cleanly
+        self.store.save_mapping("uuid-3", "event-3")
+        self.reopen()
+        self.assertEqual(set(self.store.load_index()), {"uuid-1", "uuid-3"})
+
+    def test_prune_is_replayed(self):
+        """Test pruned history stays pruned after reopening."""
+        self.store._record_stats(datetime.now() - timedelta(days=40), (1, 0, 0, 0, 0))
+        self.store.save_sync_stats(SyncStats(total_reminders=2))
+        self.store.compact()
+
+        self.assertEqual(self.store.prune_history(30), 1)
+        self.reopen()
+        self.assertEqual([row[1] for row in self.store.get_recent_history(5)], [2])
+
+
+class TestOpenMappingStore(unittest.TestCase):
+    """Test backend selection from the `database:` config section."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_backend_selection(self):
+        """Test each backend name builds the matching store under base_dir."""
+        with open_mapping_store({'path': 'data/m.db'}, base_dir=self.temp_dir) as store:
+            self.assertIsInstance(store, MappingDatabase)
+            self.assertEqual(store.db_path, Path(self.temp_dir) / 'data' / 'm.db')
+
+        config = {'backend': 'journal', 'journal_path': 'data/m.journal'}
+        with open_mapping_store(config, base_dir=self.temp_dir) as store:
+            self.assertIsInstance(store, JournalMappingStore)
+            self.assertEqual(store.journal_path, Path(self.temp_dir) / 'data' / 'm.journal')
+
+        with open_mapping_store({'backend': 'memory'}) as store:
+            self.assertIsInstance(store, MemoryMappingStore)
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with self.assertRaises(ValueError):
+            open_mapping_store({'backend': 'redis'})
+
+    def test_incomplete_backend_is_rejected(self):
+        """Test a backend missing a storage method fails when created, not mid-sync."""
+        class PartialStore(MappingStore):
+            def get_mapping(self, reminder_uuid):
+                return None
+
+        with self.assertRaisesRegex(TypeError, 'load_index'):
+            PartialStore()
+
+
+if __name__ == '__main__':
+    unittest.main()
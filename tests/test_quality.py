@@ -101,10 +101,12 @@ class TestDatabaseIntegrity(unittest.TestCase):
         """Test that database initialization creates all required tables."""
         from sync_engine import MappingDatabase
         import sqlite3
+        from contextlib import closing
 
         db = MappingDatabase(str(self.db_path))
+        db.close()
 
-        with sqlite3.connect(self.db_path) as conn:
+        with closing(sqlite3.connect(self.db_path)) as conn:
             cursor = conn.cursor()
 
             # Check for mappings table
@@ -132,6 +134,8 @@ class TestDatabaseIntegrity(unittest.TestCase):
         db.save_mapping('uuid-2', 'event-2')
         result2 = db.get_event_id('uuid-2')
 
+        db.close()
+
         self.assertEqual(result1, 'event-1')
         self.assertEqual(result2, 'event-2')
 
@@ -163,6 +167,7 @@ class TestErrorHandling(unittest.TestCase):
 
         # This should create parent directories
         db = MappingDatabase('/tmp/test_deep/nested/path/db.db')
+        db.close()
 
         self.assertTrue(Path('/tmp/test_deep/nested/path').exists())
 
@@ -254,6 +259,7 @@ class TestAppFunctionality(unittest.TestCase):
         self.assertEqual(checksum1, checksum2)
 
         # Cleanup
+        engine.close()
         db_path.unlink()
         Path(temp_dir).rmdir()
 
@@ -0,0 +1,171 @@
+"""
+Unit tests for rate_limiter module.
+"""
+
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+
+# Add src and tests to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from googleapiclient.errors import HttpError
+
+from fakes import make_http_error
+from gcal_writer import GoogleCalendarWriter
+from rate_limiter import (
+    AdaptiveRateLimiter, TokenBucket, build_rate_limiter, is_rate_limited, retry_after_seconds
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_request(*outcomes):
+    """Request whose execute() raises or returns each outcome in turn."""
+    request = Mock()
+    request.execute.side_effect = list(outcomes)
+    return request
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_steady_rate(self):
+        """Test a full bucket serves `burst` at once, then `rate` per second."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(7)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(clock.now, 2.0)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimitDetection(unittest.TestCase):
+    """Test cases for rate-limit response parsing."""
+
+    def test_classifies_responses(self):
+        self.assertTrue(is_rate_limited(make_http_error(429)))
+        self.assertTrue(is_rate_limited(make_http_error(403, 'rateLimitExceeded')))
+        self.assertFalse(is_rate_limited(make_http_error(403, 'forbidden')))
+        self.assertFalse(is_rate_limited(make_http_error(500)))
+
+    def test_retry_after_seconds_and_date(self):
+        self.assertEqual(retry_after_seconds(make_http_error(429, headers={'retry-after': '7'})), 7.0)
+        self.assertEqual(
+            retry_after_seconds(make_http_error(429, headers={'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'})),
+            0.0
+        )
+        self.assertIsNone(retry_after_seconds(make_http_error(429)))
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """Test cases for AdaptiveRateLimiter."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(
+            {'requests_per_second': 10, 'burst': 10, 'max_concurrency': 8},
+            clock=self.clock,
+            sleep=self.clock.sleep
+        )
+
+    def test_retries_after_retry_after_and_backs_off(self):
+        """Test a 429 halves concurrency and rate and waits for Retry-After."""
+        request = make_request(make_http_error(429, headers={'retry-after': '3'}), {'id': 'ok'})
+
+        self.assertEqual(self.limiter.execute(request), {'id': 'ok'})
+
+        self.assertEqual(request.execute.call_count, 2)
+        self.assertGreaterEqual(self.clock.now, 3.0)
+        self.assertEqual((self.limiter.concurrency, self.limiter.rate), (4, 5.0))
+        self.assertEqual((self.limiter.throttled, self.limiter.retries), (1, 1))
+
+    def test_zero_retry_after_still_backs_off(self):
+        """Test a Retry-After of 0 is retried after the exponential backoff, not at once."""
+        request = make_request(make_http_error(429, headers={'retry-after': '0'}), {'id': 'ok'})
+
+        self.assertEqual(self.limiter.execute(request), {'id': 'ok'})
+
+        self.assertEqual(request.execute.call_count, 2)
+        self.assertGreater(self.clock.now, 0.0)
+
+    def test_simultaneous_throttles_decrease_once(self):
+        """Test a burst of throttles inside the hold window counts as one signal."""
+        for _ in range(5):
+            self.limiter.on_throttle()
+        self.assertEqual(self.limiter.concurrency, 4)
+
+        self.clock.sleep(1.5)
+        self.limiter.on_throttle()
+        self.assertEqual(self.limiter.concurrency, 2)
+
+    def test_additive_increase_back_to_ceiling(self):
+        """Test successes grow concurrency by one per round up to max_concurrency."""
+        self.limiter.on_throttle()
+        self.limiter.on_throttle()
+        for _ in range(100):
+            self.limiter.execute(make_request({}))
+
+        self.assertEqual(self.limiter.concurrency, 8)
+        self.assertEqual(self.limiter.rate, 10.0)
+
+    def test_other_errors_are_not_retried(self):
+        """Test non-quota errors propagate immediately."""
+        request = make_request(make_http_error(403, 'forbidden'))
+
+        with self.assertRaises(HttpError):
+            self.limiter.execute(request)
+        self.assertEqual(request.execute.call_count, 1)
+        self.assertEqual(self.limiter.concurrency, 8)
+
+    def test_gives_up_after_max_retries(self):
+        """Test a persistent rate limit is raised after max_retries."""
+        self.limiter.options['max_retries'] = 2
+        request = make_request(*[make_http_error(403, 'userRateLimitExceeded')] * 3)
+
+        with self.assertRaises(HttpError):
+            self.limiter.execute(request)
+        self.assertEqual(request.execute.call_count, 3)
+
+    def test_writer_retries_through_limiter(self):
+        """Test GoogleCalendarWriter requests go through the limiter."""
+        service = Mock()
+        service.events.return_value.delete.return_value = make_request(make_http_error(429), '')
+        writer = GoogleCalendarWriter(service, rate_limiter=self.limiter)
+
+        self.assertTrue(writer.delete_event('event-1'))
+        self.assertEqual(self.limiter.retries, 1)
+
+
+class TestBuildRateLimiter(unittest.TestCase):
+    """Test cases for build_rate_limiter()."""
+
+    def test_defaults_concurrency_to_max_workers(self):
+        limiter = build_rate_limiter({'sync': {'max_workers': 6}})
+        self.assertEqual(limiter.max_concurrency, 6)
+        self.assertEqual(limiter.max_rate, 5.0)
+
+    def test_disabled(self):
+        self.assertIsNone(build_rate_limiter({'google_calendar': {'rate_limit': {'enabled': False}}}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit tests for reconcile module.
+"""
+
+import copy
+import unittest
+from pathlib import Path
+import sys
+
+# Add src and tests to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gcal_writer import GoogleCalendarWriter
+from reconcile import reconcile, synced_calendars
+from sync_engine import MemoryMappingStore, SyncEngine
+from fakes import FakeCalendarService, FakeRemindersReader, make_reminder
+
+
+class TestReconcile(unittest.TestCase):
+    """Test cases for reconcile()."""
+
+    def setUp(self):
+        """Sync ten reminders so every one has an event and a mapping."""
+        self.service = FakeCalendarService()
+        self.writer = GoogleCalendarWriter(self.service, 'primary')
+        self.store = MemoryMappingStore()
+        self.reminders = [make_reminder(f"r{i}") for i in range(10)]
+        SyncEngine(FakeRemindersReader(self.reminders), self.writer, self.store, {}).sync()
+        self.synced = {uuid: record.event_id for uuid, record in self.store.load_index().items()}
+
+    def damage(self):
+        """Lose two mappings, delete one event and copy another."""
+        self.store.delete_mapping('r0')
+        self.store.delete_mapping('r1')
+        del self.service.stored[('primary', self.synced['r2'])]
+        copy_of_r3 = dict(copy.deepcopy(self.service.stored[('primary', self.synced['r3'])]), id='copy-r3')
+        self.service.stored[('primary', 'copy-r3')] = copy_of_r3
+        # An event the user created by hand is not the sync's business
+        self.service.stored[('primary', 'manual')] = {'id': 'manual', 'summary': "Dentist"}
+
+    def test_clean_store_is_ok(self):
+        """Test a store matching the calendar reports nothing."""
+        report = reconcile(self.writer, self.store)
+
+        self.assertTrue(report.ok)
+        self.assertEqual((report.events_scanned, report.matched), (10, 10))
+
+    def test_verify_reports_without_writing(self):
+        """Test orphaned, missing and duplicated events are reported, mappings untouched."""
+        self.damage()
+        before = self.store.load_index()
+
+        report = reconcile(self.writer, self.store)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(sorted(report.orphaned), ['r0', 'r1'])
+        self.assertEqual(report.missing, ['r2'])
+        # The mapped event is kept, the copy reported
+        self.assertEqual(report.duplicates, {'r3': ['copy-r3']})
+        self.assertEqual((report.events_scanned, report.tagged), (11, 10))
+        self.assertEqual(self.store.load_index(), before)
+
+    def test_rebuild_restores_mappings(self):
+        """Test a rebuild maps orphans, drops missing mappings and the next sync heals the rest."""
+        self.damage()
+
+        report = reconcile(self.writer, self.store, rebuild=True)
+
+        self.assertTrue(report.rebuilt)
+        index = self.store.load_index()
+        self.assertEqual(index['r0'].event_id, self.synced['r0'])
+        self.assertIsNone(index['r0'].checksum)
+        self.assertNotIn('r2', index)
+        self.assertTrue(reconcile(self.writer, self.store).duplicates)
+
+        # Rebuilt mappings are rewritten once and the lost event recreated,
+        # without creating further duplicates
+        stats = SyncEngine(FakeRemindersReader(self.reminders), self.writer, self.store, {}).sync()
+        self.assertEqual((stats.created, stats.updated, stats.errors), (1, 2, 0))
+        self.assertEqual(len(self.service.stored), 12)
+
+    def test_one_request_per_page(self):
+        """Test the listing costs ceil(N / page_size) requests."""
+        self.service.requests = 0
+
+        report = reconcile(self.writer, self.store, page_size=4)
+
+        self.assertEqual(report.pages, 3)
+        self.assertEqual(self.service.requests, 3)
+        self.assertTrue(report.ok)
+
+    def test_routed_calendars_are_scanned(self):
+        """Test events found in another synced calendar repoint their mapping."""
+        event_id = self.synced['r4']
+        self.service.stored[('work', event_id)] = self.service.stored.pop(('primary', event_id))
+        config = {'google_calendar': {'calendar_id': 'primary', 'routes': {'Work': 'work', 'Home': 'primary'}}}
+        self.assertEqual(synced_calendars(config), [None, 'work'])
+
+        report = reconcile(self.writer, self.store, synced_calendars(config), rebuild=True)
+
+        self.assertEqual(report.repointed, ['r4'])
+        self.assertEqual(report.missing, [])
+        self.assertEqual(self.store.get_mapping('r4').calendar_id, 'work')
+
+
+if __name__ == '__main__':
+    unittest.main()
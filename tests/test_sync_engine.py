@@ -2,18 +2,28 @@
 Unit tests for sync_engine module.
 """
 
+import copy
 import unittest
 import tempfile
+import threading
+import time
 import sqlite3
+from contextlib import closing
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import Mock, MagicMock, patch
 import sys
 
-# Add src to path
+# Add src and tests to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
 
-from sync_engine import MappingDatabase, SyncEngine, SyncStats
+from sync_engine import (
+    MappingDatabase, MappingRecord, MemoryMappingStore, OperationKind, PendingOperation, PhaseTimer,
+    SyncEngine, SyncStats, coalesce, CHECKSUM_VERSION, CHECKSUM_VERSION_MD5, SCHEMA_VERSION, SYNC_PHASES, TIMING_KEYS
+)
+from fakes import FakeCalendarService, FakeRemindersReader, make_reminder, make_http_error
+from gcal_writer import GoogleCalendarWriter
 
 
 class TestSyncStats(unittest.TestCase):
@@ -45,6 +55,29 @@ class TestSyncStats(unittest.TestCase):
         self.assertIn("3 updated", result)
 
 
+class TestPhaseTimer(unittest.TestCase):
+    """Test PhaseTimer."""
+
+    def test_nested_phases_are_exclusive(self):
+        """Test time in a nested phase is not also charged to its parent."""
+        timer = PhaseTimer()
+        with patch('sync_engine.time.perf_counter', side_effect=[0.0, 1.0, 3.0, 4.0]):
+            with timer.phase('diff'):
+                with timer.phase('apply'):
+                    pass
+        self.assertEqual(timer.seconds, {'diff': 2.0, 'apply': 2.0})
+
+        timer.move('diff', 'convert', 0.5)
+        self.assertEqual(timer.seconds['diff'], 1.5)
+        self.assertEqual(timer.seconds['convert'], 0.5)
+
+    def test_as_ms_reports_every_phase(self):
+        """Test untouched phases are reported as zero."""
+        timings = PhaseTimer().as_ms()
+        self.assertEqual(list(timings), list(TIMING_KEYS))
+        self.assertTrue(all(timings[name] == 0 for name in SYNC_PHASES))
+
+
 class TestMappingDatabase(unittest.TestCase):
     """Test MappingDatabase class."""
 
@@ -56,6 +89,7 @@ class TestMappingDatabase(unittest.TestCase):
 
     def tearDown(self):
         """Clean up test database."""
+        self.db.close()
         if self.db_path.exists():
             self.db_path.unlink()
         Path(self.temp_dir).rmdir()
@@ -64,7 +98,7 @@ class TestMappingDatabase(unittest.TestCase):
         """Test database is created and tables exist."""
         self.assertTrue(self.db_path.exists())
 
-        with sqlite3.connect(self.db_path) as conn:
+        with closing(sqlite3.connect(self.db_path)) as conn:
             cursor = conn.cursor()
 
             # Check mappings table exists
@@ -157,7 +191,7 @@ class TestMappingDatabase(unittest.TestCase):
         self.db.save_sync_stats(stats)
 
         # Verify saved in database
-        with sqlite3.connect(self.db_path) as conn:
+        with closing(sqlite3.connect(self.db_path)) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM sync_history')
             result = cursor.fetchone()
@@ -168,6 +202,238 @@ class TestMappingDatabase(unittest.TestCase):
             self.assertEqual(result[4], 5)   # updated
             self.assertEqual(result[5], 2)   # deleted
 
+    def test_save_sync_stats_updates_rollups(self):
+        """Test each run is folded into the hourly and daily rollups."""
+        self.db.save_sync_stats(SyncStats(total_reminders=10, created=2, errors=0))
+        self.db.save_sync_stats(SyncStats(total_reminders=12, updated=3, errors=4))
+
+        for period in ('hourly', 'daily'):
+            rollups = self.db.get_rollups(period)
+            self.assertEqual(len(rollups), 1)
+            _, runs, failed_runs, total, created, updated, deleted, errors = rollups[0]
+            self.assertEqual((runs, failed_runs), (2, 1))
+            self.assertEqual((total, created, updated, deleted, errors), (22, 2, 3, 0, 4))
+
+    def test_prune_history_keeps_rollups(self):
+        """Test pruning removes old history rows but keeps daily totals."""
+        self.db.save_sync_stats(SyncStats(total_reminders=5, created=5))
+        old_time = datetime(2020, 1, 1, 12, 0)
+        self.db._conn.execute('UPDATE sync_history SET sync_time = ?', (old_time,))
+        self.db._conn.commit()
+        self.db.save_sync_stats(SyncStats(total_reminders=6))
+
+        deleted = self.db.prune_history(retention_days=30)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(len(self.db.get_recent_history(10)), 1)
+        self.assertEqual(self.db.get_rollups('daily')[0][1], 2)
+
+    def test_recent_history_uses_sync_time_index(self):
+        """Test the status query is served by the sync_time index."""
+        plan = self.db._conn.execute(
+            'EXPLAIN QUERY PLAN SELECT sync_time, total_reminders, created, updated, deleted, errors '
+            'FROM sync_history ORDER BY sync_time DESC LIMIT 5'
+        ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        self.assertIn('idx_sync_history_sync_time', details)
+        self.assertNotIn('TEMP B-TREE', details)
+
+    def test_migrations_record_schema_version(self):
+        """Test every migration is applied once and recorded."""
+        versions = [row[0] for row in self.db._conn.execute(
+            'SELECT version FROM schema_version ORDER BY version'
+        )]
+        self.assertEqual(versions, list(range(1, SCHEMA_VERSION + 1)))
+
+    def test_reopen_runs_single_version_check(self):
+        """Test opening a migrated database costs one query, not DDL."""
+        statements = []
+        self.db._conn.set_trace_callback(statements.append)
+        try:
+            self.db._init_db()
+        finally:
+            self.db._conn.set_trace_callback(None)
+
+        self.assertEqual(len(statements), 1)
+        self.assertIn('schema_version', statements[0])
+
+    def test_migrates_pre_versioned_database(self):
+        """Test a database created before migrations existed is upgraded in place."""
+        self.db.close()
+        self.db_path.unlink()
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute('''
+                CREATE TABLE mappings (
+                    reminder_uuid TEXT PRIMARY KEY,
+                    event_id TEXT NOT NULL,
+                    last_synced TIMESTAMP NOT NULL,
+                    last_modified TIMESTAMP,
+                    checksum TEXT
+                )
+            ''')
+            conn.execute(
+                "INSERT INTO mappings VALUES ('legacy-uuid', 'legacy-event', '2025-01-01 00:00:00', NULL, NULL)"
+            )
+            conn.commit()
+
+        self.db = MappingDatabase(str(self.db_path))
+
+        self.assertEqual(self.db.get_event_id('legacy-uuid'), 'legacy-event')
+        self.assertEqual(self.db._schema_version(), SCHEMA_VERSION)
+
+    def test_reverse_lookup_uses_event_id_index(self):
+        """Test find_by_event_id is served by the event_id index."""
+        self.db.save_mapping('uuid-1', 'event-1')
+
+        self.assertEqual(self.db.find_by_event_id('event-1').reminder_uuid, 'uuid-1')
+        self.assertIsNone(self.db.find_by_event_id('missing'))
+
+        plan = self.db._conn.execute(
+            'EXPLAIN QUERY PLAN SELECT reminder_uuid FROM mappings WHERE event_id = ?', ('event-1',)
+        ).fetchall()
+        self.assertIn('idx_mappings_event_id', ' '.join(row[-1] for row in plan))
+
+    def test_get_stale_mappings(self):
+        """Test staleness scan returns mappings synced before the cutoff."""
+        self.db.save_mapping('uuid-old', 'event-old')
+        self.db._conn.execute(
+            "UPDATE mappings SET last_synced = '2020-01-01 00:00:00' WHERE reminder_uuid = 'uuid-old'"
+        )
+        self.db._conn.commit()
+        self.db.save_mapping('uuid-new', 'event-new')
+
+        stale = self.db.get_stale_mappings(datetime(2024, 1, 1))
+
+        self.assertEqual([record.reminder_uuid for record in stale], ['uuid-old'])
+
+    def test_connection_uses_wal_and_configured_pragmas(self):
+        """Test connection PRAGMAs come from the database options."""
+        self.db.close()
+        self.db = MappingDatabase(str(self.db_path), {
+            'synchronous': 'FULL',
+            'cache_size': -2000,
+            'mmap_size': 0
+        })
+
+        conn = self.db._conn
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 2)  # FULL
+        self.assertEqual(conn.execute('PRAGMA cache_size').fetchone()[0], -2000)
+
+    def test_single_connection_reused(self):
+        """Test all operations share one long-lived connection."""
+        conn = self.db._conn
+
+        with patch('mapping_store.sqlite3.connect') as mock_connect:
+            self.db.save_mapping('uuid-a', 'event-a')
+            self.db.get_event_id('uuid-a')
+            self.db.delete_mapping('uuid-a')
+            mock_connect.assert_not_called()
+
+        self.assertIs(self.db._conn, conn)
+
+    def test_load_index(self):
+        """Test load_index returns every mapping keyed by UUID."""
+        self.db.save_mapping('uuid-1', 'event-1', checksum='sum-1')
+        self.db.save_mapping('uuid-2', 'event-2')
+
+        index = self.db.load_index()
+
+        self.assertEqual(set(index), {'uuid-1', 'uuid-2'})
+        self.assertEqual(index['uuid-1'].event_id, 'event-1')
+        self.assertEqual(index['uuid-1'].checksum, 'sum-1')
+        self.assertIsNone(index['uuid-2'].checksum)
+
+    def test_get_mapping_returns_full_record(self):
+        """Test get_mapping returns every column in one record."""
+        modified = datetime(2025, 1, 15, 10, 30)
+        self.db.save_mapping('uuid-1', 'event-1', modified, 'sum-1')
+
+        record = self.db.get_mapping('uuid-1')
+
+        self.assertIsInstance(record, MappingRecord)
+        self.assertEqual(record.event_id, 'event-1')
+        self.assertEqual(record.last_modified, modified)
+        self.assertEqual(record.checksum, 'sum-1')
+        self.assertIsInstance(record.last_synced, datetime)
+        self.assertIsNone(self.db.get_mapping('missing'))
+
+    def test_get_mappings_chunks_lookups(self):
+        """Test get_mappings splits large UUID sets into IN (...) chunks."""
+        self.db.LOOKUP_CHUNK_SIZE = 4
+        with self.db.buffered_writes():
+            for i in range(10):
+                self.db.save_mapping(f"uuid-{i}", f"event-{i}")
+
+        statements = []
+        self.db._conn.set_trace_callback(statements.append)
+        try:
+            records = self.db.get_mappings([f"uuid-{i}" for i in range(10)] + ['missing'])
+        finally:
+            self.db._conn.set_trace_callback(None)
+
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records['uuid-7'].event_id, 'event-7')
+        self.assertEqual(len([sql for sql in statements if ' IN (' in sql]), 3)
+
+    def _count_rows_on_disk(self):
+        """Count mapping rows through an independent connection."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute('SELECT COUNT(*) FROM mappings').fetchone()[0]
+
+    def test_buffered_writes_flush_in_batches(self):
+        """Test buffered writes reach disk every write_batch_size operations."""
+        self.db.write_batch_size = 3
+
+        with self.db.buffered_writes():
+            self.db.save_mapping('uuid-1', 'event-1')
+            self.db.save_mapping('uuid-2', 'event-2')
+            self.assertEqual(self._count_rows_on_disk(), 0)
+
+            self.db.save_mapping('uuid-3', 'event-3')
+            self.assertEqual(self._count_rows_on_disk(), 3)
+
+            self.db.save_mapping('uuid-4', 'event-4')
+            self.db.delete_mapping('uuid-1')
+
+        self.assertEqual(self.db.get_all_reminder_uuids(), {'uuid-2', 'uuid-3', 'uuid-4'})
+
+    def test_buffered_writes_flush_on_exception(self):
+        """Test buffered writes are flushed when the block raises."""
+        with self.assertRaises(RuntimeError):
+            with self.db.buffered_writes():
+                self.db.save_mapping('uuid-crash', 'event-crash')
+                raise RuntimeError("sync crashed")
+
+        self.assertEqual(self._count_rows_on_disk(), 1)
+
+    def test_upsert_updates_row_in_place(self):
+        """Test re-saving a mapping updates the row instead of replacing it."""
+        self.db.save_mapping('uuid-1', 'event-1', checksum='old')
+        rowid = self.db._conn.execute(
+            "SELECT rowid FROM mappings WHERE reminder_uuid = 'uuid-1'"
+        ).fetchone()[0]
+
+        self.db.save_mapping('uuid-1', 'event-1', checksum='new')
+
+        row = self.db._conn.execute(
+            "SELECT rowid, checksum FROM mappings WHERE reminder_uuid = 'uuid-1'"
+        ).fetchone()
+        self.assertEqual(row, (rowid, 'new'))
+
+    def test_close_and_context_manager(self):
+        """Test close() is idempotent and the context manager closes."""
+        self.db.close()
+        self.db.close()
+        self.assertIsNone(self.db._conn)
+
+        with MappingDatabase(str(self.db_path)) as db:
+            db.save_mapping('uuid-ctx', 'event-ctx')
+        self.assertIsNone(db._conn)
+
+        self.db = MappingDatabase(str(self.db_path))
+        self.assertEqual(self.db.get_event_id('uuid-ctx'), 'event-ctx')
+
 
 class TestSyncEngine(unittest.TestCase):
     """Test SyncEngine class."""
@@ -205,6 +471,7 @@ class TestSyncEngine(unittest.TestCase):
 
     def tearDown(self):
         """Clean up test fixtures."""
+        self.engine.close()
         if self.db_path.exists():
             self.db_path.unlink()
         Path(self.temp_dir).rmdir()
@@ -230,6 +497,45 @@ class TestSyncEngine(unittest.TestCase):
         checksum3 = self.engine._generate_checksum(reminder)
         self.assertNotEqual(checksum1, checksum3)
 
+    def test_checksum_is_compact_digest(self):
+        """Test checksums are short binary digests."""
+        checksum = self.engine._generate_checksum(make_reminder('uuid-1'))
+        self.assertIsInstance(checksum, bytes)
+        self.assertEqual(len(checksum), 8)
+
+    def test_legacy_checksum_upgraded_without_api_call(self):
+        """Test an unchanged reminder with an MD5 checksum is upgraded locally."""
+        reminder = make_reminder('uuid-legacy')
+        self.db.save_mapping(
+            reminder.uuid, 'event-legacy',
+            checksum=self.engine._generate_legacy_checksum(reminder),
+            checksum_version=CHECKSUM_VERSION_MD5
+        )
+
+        self.engine._sync_reminder(reminder)
+
+        self.mock_gcal_writer.update_event.assert_not_called()
+        self.assertEqual(self.engine.stats.skipped, 1)
+        record = self.db.get_mapping(reminder.uuid)
+        self.assertEqual(record.checksum_version, CHECKSUM_VERSION)
+        self.assertEqual(record.checksum, self.engine._generate_checksum(reminder))
+
+    def test_legacy_checksum_mismatch_triggers_update(self):
+        """Test a reminder that changed since its MD5 checksum is still updated."""
+        reminder = make_reminder('uuid-legacy', title="Old title")
+        legacy_checksum = self.engine._generate_legacy_checksum(reminder)
+        self.db.save_mapping(
+            reminder.uuid, 'event-legacy',
+            checksum=legacy_checksum, checksum_version=CHECKSUM_VERSION_MD5
+        )
+        reminder.title = "New title"
+        self.mock_gcal_writer.patch_event.return_value = {'id': 'event-legacy'}
+
+        self.engine._sync_reminder(reminder)
+
+        self.mock_gcal_writer.patch_event.assert_called_once()
+        self.assertEqual(self.engine.stats.updated, 1)
+
     def test_should_skip_old_completed_reminder(self):
         """Test skipping old completed reminders."""
         reminder = Mock()
@@ -268,6 +574,7 @@ class TestSyncEngine(unittest.TestCase):
         reminder.completed = False
         reminder.location = "Office"
         reminder.modification_date = datetime.now()
+        reminder.calendar_title = "Reminders"
 
         # Mock gcal_writer to return success
         self.mock_gcal_writer.create_event.return_value = {
@@ -299,19 +606,25 @@ class TestSyncEngine(unittest.TestCase):
         reminder.completed = False
         reminder.location = "Home"
         reminder.modification_date = datetime.now()
+        reminder.calendar_title = "Reminders"
 
         # Pre-save mapping
         self.db.save_mapping(reminder.uuid, "existing-event-456")
 
         # Mock gcal_writer
-        self.mock_gcal_writer.update_event.return_value = True
+        self.mock_gcal_writer.patch_event.return_value = True
         self.mock_gcal_writer.get_priority_color.return_value = None
 
         # Sync the reminder
         self.engine._sync_reminder(reminder)
 
-        # Verify update_event was called
-        self.mock_gcal_writer.update_event.assert_called_once()
+        # Without a stored fingerprint every field is patched, with no get
+        self.mock_gcal_writer.patch_event.assert_called_once()
+        self.mock_gcal_writer.update_event.assert_not_called()
+        args, kwargs = self.mock_gcal_writer.patch_event.call_args
+        self.assertEqual(args, ("existing-event-456",))
+        self.assertEqual(kwargs['description'], "Updated notes")
+        self.assertEqual(kwargs['location'], "Home")
 
         # Verify stats
         self.assertEqual(self.engine.stats.updated, 1)
@@ -347,6 +660,854 @@ class TestSyncEngine(unittest.TestCase):
         # Verify stats
         self.assertEqual(self.engine.stats.deleted, 1)
 
+    def test_no_change_sync_runs_single_select(self):
+        """Test a steady-state sync reads the mapping table exactly once."""
+        reminders = [make_reminder(f"uuid-{i}") for i in range(50)]
+        self.mock_reminders_reader.fetch_reminders.return_value = reminders
+        self.mock_gcal_writer.create_event.side_effect = (
+            {'id': f"event-{i}"} for i in range(50)
+        )
+
+        self.engine.sync()
+        self.assertEqual(self.engine.stats.created, 50)
+
+        statements = []
+        self.db._conn.set_trace_callback(statements.append)
+        try:
+            stats = self.engine.sync()
+        finally:
+            self.db._conn.set_trace_callback(None)
+
+        selects = [
+            sql for sql in statements
+            if sql.lstrip().upper().startswith('SELECT') and 'FROM mappings' in sql
+        ]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(stats.skipped, 50)
+        self.mock_gcal_writer.update_event.assert_not_called()
+
+    def test_cleanup_uses_index_for_removed_reminders(self):
+        """Test removed reminders are found from the index, not per-UUID queries."""
+        self.db.save_mapping('kept', 'event-kept')
+        self.db.save_mapping('gone', 'event-gone')
+        self.mock_reminders_reader.fetch_reminders.return_value = [make_reminder('kept')]
+        self.mock_gcal_writer.batch_delete_events.return_value = {'event-gone': True}
+
+        with patch.object(self.db, 'get_event_id') as mock_get_event_id:
+            stats = self.engine.sync()
+            mock_get_event_id.assert_not_called()
+
+        self.mock_gcal_writer.batch_delete_events.assert_called_once_with(['event-gone'])
+        self.mock_gcal_writer.delete_event.assert_not_called()
+        self.assertEqual(stats.deleted, 1)
+        self.assertEqual(self.db.get_all_reminder_uuids(), {'kept'})
+
+    def test_removed_batch_commits_together(self):
+        """Test one batch of removed reminders has its mapping deletes written in one store batch."""
+        for uuid in ('a', 'b', 'c'):
+            self.db.save_mapping(uuid, f"event-{uuid}")
+        self.config['sync']['batch_size'] = 3
+        # The created mapping would otherwise fill the buffer mid-batch
+        self.db.write_batch_size = 3
+        self.mock_reminders_reader.fetch_reminders.return_value = [make_reminder('new')]
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-new'}
+        self.mock_gcal_writer.batch_delete_events.return_value = dict.fromkeys(['event-a', 'event-b', 'event-c'], True)
+
+        with patch.object(self.db, '_write_batch', wraps=self.db._write_batch) as write_batch:
+            stats = self.engine.sync()
+
+        self.assertEqual((stats.created, stats.deleted), (1, 3))
+        deletes = [sorted(call.args[1]) for call in write_batch.call_args_list if call.args[1]]
+        self.assertEqual(deletes, [['a', 'b', 'c']])
+
+    def test_fetch_timeout_deletes_nothing(self):
+        """Test a reader timeout aborts the sync instead of reading as an empty library."""
+        self.db.save_mapping('kept', 'event-kept')
+        self.mock_reminders_reader.fetch_reminders.side_effect = TimeoutError("Timed out")
+
+        with self.assertRaises(TimeoutError):
+            self.engine.sync()
+
+        self.mock_gcal_writer.batch_delete_events.assert_not_called()
+        self.mock_gcal_writer.delete_event.assert_not_called()
+        self.assertEqual(self.db.get_all_reminder_uuids(), {'kept'})
+
+    def test_removed_event_already_gone_is_not_an_error(self):
+        """Test a 410 on a removed reminder's delete drops the mapping without a retry."""
+        self.db.save_mapping('gone', 'event-deleted-in-calendar')
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+        engine = SyncEngine(
+            self.mock_reminders_reader, GoogleCalendarWriter(FakeCalendarService()), self.db, self.config
+        )
+
+        stats = engine.sync()
+
+        self.assertEqual((stats.deleted, stats.errors), (1, 0))
+        self.assertEqual(self.db.count_mappings(), 0)
+        self.assertEqual(self.db.load_pending_ops(), {})
+
+    def test_sync_reminder_uses_single_mapping_lookup(self):
+        """Test _sync_reminder reads the mapping once instead of per column."""
+        reminder = make_reminder('uuid-1')
+        self.db.save_mapping('uuid-1', 'event-1', checksum=self.engine._generate_checksum(reminder))
+
+        with patch.object(self.db, 'get_event_id') as mock_get_event_id, \
+                patch.object(self.db, 'get_checksum') as mock_get_checksum, \
+                patch.object(self.db, 'get_mapping', wraps=self.db.get_mapping) as mock_get_mapping:
+            self.engine._sync_reminder(reminder)
+
+        mock_get_mapping.assert_called_once_with('uuid-1')
+        mock_get_event_id.assert_not_called()
+        mock_get_checksum.assert_not_called()
+        self.assertEqual(self.engine.stats.skipped, 1)
+
+    def test_sync_prunes_history_with_configured_retention(self):
+        """Test history retention prefers database.history_retention_days."""
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+
+        self.config['logging'] = {'retention_days': 30}
+        with patch.object(self.db, 'prune_history') as mock_prune:
+            self.engine.sync()
+        mock_prune.assert_called_once_with(30, 90)
+
+        self.config['database'] = {'history_retention_days': 7}
+        with patch.object(self.db, 'prune_history') as mock_prune:
+            self.engine.sync()
+        mock_prune.assert_called_once_with(7, 90)
+
+    def test_sync_flushes_mappings_when_run_fails(self):
+        """Test mappings for created events survive a failure later in the run."""
+        self.mock_reminders_reader.fetch_reminders.return_value = [
+            make_reminder('uuid-1'), make_reminder('uuid-2')
+        ]
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-1'}
+
+        # Interrupted (e.g. Ctrl-C) after the first event was created
+        apply_operation = self.engine._apply_operation
+        def apply_then_interrupt(op):
+            apply_operation(op)
+            raise KeyboardInterrupt
+
+        with patch.object(self.engine, '_apply_operation', side_effect=apply_then_interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.engine.sync()
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            row = conn.execute(
+                "SELECT event_id FROM mappings WHERE reminder_uuid = 'uuid-1'"
+            ).fetchone()
+        self.assertEqual(row, ('event-1',))
+
+    def test_sync_records_phase_timings(self):
+        """Test each run stores its per-phase timings with the history row."""
+        def fetch(calendar_names, timings):
+            timings['convert'] = 0.0
+            return [make_reminder('uuid-1')]
+
+        self.mock_reminders_reader.fetch_reminders.side_effect = fetch
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-1'}
+
+        stats = self.engine.sync()
+
+        self.assertEqual(set(stats.timings), set(TIMING_KEYS))
+        # Phases are exclusive, so they never add up to more than the run
+        # (allowing for per-phase rounding)
+        phase_sum = sum(stats.timings[name] for name in SYNC_PHASES)
+        self.assertLessEqual(phase_sum, stats.timings['total'] + len(SYNC_PHASES))
+        (row,) = self.db.get_recent_timings(5)
+        self.assertEqual(row[1:], tuple(stats.timings[key] for key in TIMING_KEYS))
+
+    def test_sync_runs_maintenance_on_interval(self):
+        """Test maintenance runs once every `maintenance_interval` syncs."""
+        self.config['database'] = {'maintenance_interval': 3}
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+
+        with patch.object(self.db, 'maintain', wraps=self.db.maintain) as mock_maintain:
+            for _ in range(7):
+                self.engine.sync()
+        self.assertEqual(mock_maintain.call_count, 2)
+
+    def test_incremental_sync_skips_unmodified_without_hashing(self):
+        """Test reminders no newer than their mapping skip the checksum."""
+        reminders = [make_reminder(f"uuid-{i}") for i in range(5)]
+        self.mock_reminders_reader.fetch_reminders.return_value = reminders
+        self.mock_gcal_writer.create_event.side_effect = ({'id': f"event-{i}"} for i in range(5))
+        self.engine.sync()
+
+        reminders[0].title = "Edited"
+        reminders[0].modification_date = datetime(2025, 1, 2, 9, 0)
+        self.mock_gcal_writer.update_event.return_value = {'id': 'event-0'}
+        with patch.object(self.engine, '_generate_checksum', wraps=self.engine._generate_checksum) as mock_hash:
+            stats = self.engine.sync()
+
+        self.assertEqual(mock_hash.call_count, 1)
+        self.assertEqual((stats.updated, stats.skipped), (1, 4))
+        self.assertEqual(self.db.get_meta('watermark:Reminders'), '2025-01-02T09:00:00')
+
+    def test_full_verify_catches_edit_with_stale_modification_date(self):
+        """Test every `full_verify_every`-th sync checksums every reminder."""
+        self.config['sync']['full_verify_every'] = 3
+        reminder = make_reminder('uuid-1')
+        self.mock_reminders_reader.fetch_reminders.return_value = [reminder]
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-1'}
+        self.mock_gcal_writer.update_event.return_value = {'id': 'event-1'}
+        self.engine.sync()
+
+        # Edited on a device whose clock was behind
+        reminder.title = "Edited"
+        self.assertEqual(self.engine.sync().updated, 0)
+        self.assertEqual(self.engine.sync().updated, 1)
+        self.assertEqual(self.engine.sync().updated, 0)
+
+    def test_watermark_regression_requests_full_verify(self):
+        """Test a list watermark moving back makes the next sync verify everything."""
+        newest = make_reminder('uuid-new', modification_date=datetime(2025, 3, 1))
+        older = make_reminder('uuid-old')
+        self.mock_reminders_reader.fetch_reminders.return_value = [newest, older]
+        self.mock_gcal_writer.create_event.side_effect = [{'id': 'event-new'}, {'id': 'event-old'}]
+        self.engine.sync()
+
+        self.mock_reminders_reader.fetch_reminders.return_value = [older]
+        self.mock_gcal_writer.batch_delete_events.return_value = {'event-new': True}
+        self.engine.sync()
+        self.assertEqual(self.db.get_meta('full_verify_requested'), '1')
+
+        older.title = "Edited"
+        self.mock_gcal_writer.update_event.return_value = {'id': 'event-old'}
+        self.assertEqual(self.engine.sync().updated, 1)
+        self.assertEqual(self.db.get_meta('full_verify_requested'), '0')
+
+    def test_future_last_modified_is_not_trusted(self):
+        """Test a mapping stamped in the future is always checksummed."""
+        future = datetime(2999, 1, 1)
+        reminder = make_reminder('uuid-1', title="Edited", modification_date=future)
+        self.db.save_mapping('uuid-1', 'event-1', future, b'stale!!!')
+
+        plan = self.engine.plan([reminder])
+
+        self.assertEqual(plan.operations[0].kind, OperationKind.UPDATE)
+
+    def test_failed_operation_is_queued_with_backoff(self):
+        """Test a failed request is retried only once its backoff has passed."""
+        reminder = make_reminder('uuid-1')
+        self.mock_reminders_reader.fetch_reminders.return_value = [reminder]
+        self.mock_gcal_writer.create_event.return_value = None
+
+        self.assertEqual(self.engine.sync().errors, 1)
+        pending = self.db.load_pending_ops()['uuid-1']
+        self.assertEqual((pending.kind, pending.attempts), ('create', 1))
+        self.assertGreater(pending.next_attempt, datetime.now())
+
+        # Not due yet: held back without a request
+        stats = self.engine.sync()
+        self.assertEqual((stats.errors, stats.skipped), (0, 1))
+        self.assertEqual(self.mock_gcal_writer.create_event.call_count, 1)
+
+        self.db.save_pending_op(pending._replace(next_attempt=datetime(2000, 1, 1)))
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-1'}
+        self.assertEqual(self.engine.sync().created, 1)
+        self.assertEqual(self.db.load_pending_ops(), {})
+
+    def test_repeated_failures_back_off_exponentially(self):
+        """Test each failure raises the attempt count and delay."""
+        self.config['sync']['retry_backoff_base'] = 100
+        self.mock_reminders_reader.fetch_reminders.return_value = [make_reminder('uuid-1')]
+        self.mock_gcal_writer.create_event.side_effect = RuntimeError("HTTP 503")
+
+        delays = []
+        for _ in range(3):
+            self.engine.sync()
+            pending = self.db.load_pending_ops()['uuid-1']
+            delays.append((pending.next_attempt - datetime.now()).total_seconds())
+            self.db.save_pending_op(pending._replace(next_attempt=datetime(2000, 1, 1)))
+
+        self.assertEqual(pending.attempts, 3)
+        self.assertEqual(pending.last_error, "HTTP 503")
+        # base * 2^(attempt - 1), jittered down by up to half
+        for delay, ceiling in zip(delays, (100, 200, 400)):
+            self.assertGreater(delay, ceiling / 2 - 5)
+            self.assertLessEqual(delay, ceiling)
+
+    def test_due_retries_run_first(self):
+        """Test due queued operations are planned ahead of other work."""
+        self.db.save_pending_op(PendingOperation('retry', 'create', None, 1, datetime(2000, 1, 1)))
+        self.engine._pending = self.db.load_pending_ops()
+
+        plan = self.engine.plan([make_reminder('new'), make_reminder('retry')])
+
+        self.assertEqual([op.reminder_uuid for op in plan.operations], ['retry', 'new'])
+
+    def test_coalesce_rules(self):
+        """Test a queued operation and a newer one fold into one net operation."""
+        create, update, delete = OperationKind.CREATE, OperationKind.UPDATE, OperationKind.DELETE
+        self.assertIs(coalesce(create, update), create)
+        self.assertIs(coalesce(update, update), update)
+        self.assertIsNone(coalesce(create, delete))
+        self.assertIs(coalesce(update, delete), delete)
+        self.assertIs(coalesce(delete, create), create)
+
+    def test_delete_supersedes_queued_update(self):
+        """Test a reminder removed after a failed update is deleted without waiting out the backoff."""
+        self.db.save_mapping('uuid-1', 'event-1')
+        self.db.save_pending_op(PendingOperation('uuid-1', 'update', 'event-1', 3, datetime(2999, 1, 1)))
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+        self.mock_gcal_writer.batch_delete_events.return_value = {'event-1': True}
+
+        stats = self.engine.sync()
+
+        self.assertEqual((stats.deleted, stats.errors), (1, 0))
+        self.mock_gcal_writer.update_event.assert_not_called()
+        self.assertEqual(self.db.load_pending_ops(), {})
+
+    def test_failure_of_new_operation_replaces_queued_one(self):
+        """Test the retry queue keeps one net operation, restarting its backoff when it changes."""
+        self.db.save_mapping('uuid-1', 'event-1')
+        self.db.save_pending_op(PendingOperation('uuid-1', 'update', 'event-1', 3, datetime(2999, 1, 1)))
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+        self.mock_gcal_writer.batch_delete_events.return_value = {'event-1': False}
+
+        self.assertEqual(self.engine.sync().errors, 1)
+
+        pending = self.db.load_pending_ops()
+        self.assertEqual(list(pending), ['uuid-1'])
+        self.assertEqual((pending['uuid-1'].kind, pending['uuid-1'].attempts), ('delete', 1))
+
+    def test_reminder_fetched_twice_gets_one_operation(self):
+        """Test a reminder in both the incomplete and completed fetch is planned once, newest state."""
+        self.db.save_mapping('uuid-1', 'event-1')
+        incomplete = make_reminder('uuid-1')
+        completed = make_reminder(
+            'uuid-1', completed=True, completion_date=datetime.now(), modification_date=datetime.now()
+        )
+
+        plan = self.engine.plan([completed, incomplete])
+
+        self.assertEqual([(op.kind, op.reason) for op in plan.operations], [(OperationKind.DELETE, 'completed')])
+        self.assertEqual(plan.total_reminders, 1)
+
+    def test_stale_pending_entry_is_dropped(self):
+        """Test queued retries for reminders that vanished unmapped are removed."""
+        self.db.save_pending_op(PendingOperation('gone', 'create', None, 2, datetime(2999, 1, 1)))
+        self.mock_reminders_reader.fetch_reminders.return_value = []
+
+        self.engine.sync()
+
+        self.assertEqual(self.db.load_pending_ops(), {})
+
+    def test_interrupted_sync_resumes_from_checkpoint(self):
+        """Test a killed run's progress is committed and the next run carries on."""
+        reminders = [make_reminder(f"uuid-{i}") for i in range(5)]
+        self.mock_reminders_reader.fetch_reminders.return_value = reminders
+        created = iter([{'id': 'event-0'}, {'id': 'event-1'}, {'id': 'event-2'}])
+
+        def create_event(**kwargs):
+            try:
+                return next(created)
+            except StopIteration:
+                raise KeyboardInterrupt
+
+        self.mock_gcal_writer.create_event.side_effect = create_event
+        with self.assertRaises(KeyboardInterrupt):
+            self.engine.sync()
+
+        checkpoint, processed = self.db.load_checkpoint()
+        self.assertEqual(checkpoint.created, 3)
+        self.assertEqual(processed, {'uuid-0', 'uuid-1', 'uuid-2'})
+        self.assertEqual(self.db.get_recent_history(5), [])
+
+        self.mock_gcal_writer.create_event.side_effect = None
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-new'}
+        stats = self.engine.sync()
+
+        self.assertEqual(self.mock_gcal_writer.create_event.call_count, 6)
+        self.assertEqual((stats.total_reminders, stats.created, stats.skipped), (5, 5, 0))
+        self.assertIsNone(self.db.load_checkpoint())
+        self.assertEqual(self.db.get_recent_history(1)[0][2], 5)
+
+    def test_time_budget_runs_urgent_first_and_defers_rest(self):
+        """Test sync.time_budget orders by due date, then recency, and defers the rest."""
+        now = datetime.now()
+        reminders = [
+            make_reminder('old', due_date=None, modification_date=datetime(2024, 1, 1)),
+            make_reminder('later', due_date=now + timedelta(days=3)),
+            make_reminder('overdue', due_date=datetime(2020, 1, 1), modification_date=datetime(2023, 1, 1)),
+            make_reminder('recent', due_date=None, modification_date=now - timedelta(hours=1)),
+            make_reminder('soon', due_date=now + timedelta(days=1)),
+        ]
+        self.mock_reminders_reader.fetch_reminders.return_value = reminders
+        self.config['sync']['time_budget'] = 25
+        clock = [0.0]
+        created = []
+
+        def create_event(**kwargs):
+            # Each request takes ten seconds of the budget
+            clock[0] += 10
+            created.append(kwargs['reminder_uuid'])
+            return {'id': f"event-{kwargs['reminder_uuid']}"}
+
+        self.mock_gcal_writer.create_event.side_effect = create_event
+        with patch('sync_engine.time.monotonic', lambda: clock[0]):
+            stats = self.engine.sync()
+
+        self.assertEqual(created, ['soon', 'later', 'recent'])
+        self.assertEqual((stats.created, stats.deferred), (3, 2))
+        self.assertIn("2 deferred", str(stats))
+        self.assertIsNone(self.db.get_mapping('old'))
+
+        # Deferred operations are planned again by the next run
+        del self.config['sync']['time_budget']
+        stats = self.engine.sync()
+        self.assertEqual(created[3:], ['old', 'overdue'])
+        self.assertEqual((stats.created, stats.deferred), (2, 0))
+
+    def test_stop_defers_rest_and_keeps_created_mappings(self):
+        """Test stop() mid-run defers what is left and saves the events already created."""
+        self.mock_reminders_reader.fetch_reminders.return_value = [make_reminder(f"uuid-{i}") for i in range(5)]
+
+        def create_event(**kwargs):
+            if kwargs['reminder_uuid'] == 'uuid-1':
+                self.engine.stop()
+            return {'id': f"event-{kwargs['reminder_uuid']}"}
+
+        self.mock_gcal_writer.create_event.side_effect = create_event
+        stats = self.engine.sync()
+
+        self.assertEqual((stats.created, stats.deferred), (2, 3))
+        reopened = MappingDatabase(str(self.db_path))
+        self.assertEqual(reopened.get_all_reminder_uuids(), {'uuid-0', 'uuid-1'})
+        reopened.close()
+
+        # The next run creates only the deferred events
+        self.mock_gcal_writer.create_event.side_effect = None
+        self.mock_gcal_writer.create_event.return_value = {'id': 'event-new'}
+        stats = SyncEngine(self.mock_reminders_reader, self.mock_gcal_writer, self.db, self.config).sync()
+        self.assertEqual((stats.created, stats.skipped), (3, 2))
+
+    def test_plan_is_typed_and_ordered(self):
+        """Test plan() classifies every reminder without side effects."""
+        self.db.save_mapping('changed', 'event-changed', None, b'stale!!!')
+        unchanged = make_reminder('unchanged')
+        self.db.save_mapping('unchanged', 'event-unchanged', None, self.engine._generate_checksum(unchanged))
+        self.db.save_mapping('done', 'event-done')
+        self.db.save_mapping('gone', 'event-gone')
+        reminders = [
+            make_reminder('new'),
+            make_reminder('changed'),
+            unchanged,
+            make_reminder('done', completed=True, completion_date=datetime.now()),
+        ]
+
+        plan = self.engine.plan(reminders)
+
+        self.assertEqual(
+            [(op.kind, op.reminder_uuid) for op in plan.operations],
+            [
+                (OperationKind.CREATE, 'new'),
+                (OperationKind.UPDATE, 'changed'),
+                (OperationKind.SKIP, 'unchanged'),
+                (OperationKind.DELETE, 'done'),
+                (OperationKind.DELETE, 'gone'),
+            ]
+        )
+        self.assertEqual(plan.operations[-1].event_id, 'event-gone')
+        self.assertEqual(plan.estimated_api_calls, 4)
+        self.assertIn('~4 API calls', str(plan))
+        self.assertEqual(self.mock_gcal_writer.method_calls, [])
+        self.assertEqual(self.db.count_mappings(), 4)
+
+    def test_dry_run_plans_without_applying(self):
+        """Test sync.dry_run reports the plan but makes no API calls or writes."""
+        self.config['sync'] = {'dry_run': True}
+        self.db.save_mapping('gone', 'event-gone')
+        self.mock_reminders_reader.fetch_reminders.return_value = [make_reminder('new')]
+
+        stats = self.engine.sync()
+
+        self.assertEqual((stats.created, stats.deleted), (1, 1))
+        self.mock_gcal_writer.create_event.assert_not_called()
+        self.mock_gcal_writer.batch_delete_events.assert_not_called()
+        self.assertEqual(self.db.get_all_reminder_uuids(), {'gone'})
+        self.assertEqual(self.db.get_recent_history(5), [])
+
+    def test_concurrent_apply_writes_mappings_in_plan_order(self):
+        """Test sync.max_workers runs requests on threads but records results in order."""
+        self.config['sync']['max_workers'] = 4
+        reminders = [make_reminder(f"uuid-{i}") for i in range(20)]
+        self.mock_reminders_reader.fetch_reminders.return_value = reminders
+        threads = set()
+
+        def create_event(**kwargs):
+            threads.add(threading.current_thread().name)
+            # Later requests finish first, so completion order != plan order
+            index = int(kwargs['reminder_uuid'].split('-')[1])
+            time.sleep(0.001 * (20 - index))
+            if index == 7:
+                return None
+            return {'id': f"event-{index}"}
+
+        self.mock_gcal_writer.create_event.side_effect = create_event
+        with patch.object(self.db, 'save_mapping', wraps=self.db.save_mapping) as mock_save:
+            stats = self.engine.sync()
+        saved = [call.args[0] for call in mock_save.call_args_list]
+
+        self.assertGreater(len(threads), 1)
+        self.assertNotIn(threading.current_thread().name, threads)
+        self.assertEqual((stats.created, stats.errors), (19, 1))
+        self.assertEqual(saved, [f"uuid-{i}" for i in range(20) if i != 7])
+        self.assertIsNone(self.db.get_mapping('uuid-7'))
+        self.assertEqual(self.db.get_event_id('uuid-19'), 'event-19')
+
+
+class TestStreamingSync(unittest.TestCase):
+    """Test SyncEngine with sync.streaming enabled."""
+
+    @staticmethod
+    def runs():
+        first = [make_reminder(f"r{i}", priority=i % 10) for i in range(45)]
+        # Completed reminders are fetched first in their stale state too
+        second = [copy.copy(first[i]) for i in range(7, 45, 10)]
+        for i, reminder in enumerate(make_reminder(f"r{i}", priority=i % 10) for i in range(45)):
+            if i % 10 == 3:
+                continue
+            if i % 10 in (5, 7):
+                reminder.title = f"Edited {i}"
+                reminder.completed = i % 10 == 7
+                reminder.modification_date = datetime(2025, 1, 2, 9, 0)
+            second.append(reminder)
+        return first, second + [make_reminder(f"new{i}") for i in range(5)]
+
+    def sync_runs(self, streaming, max_workers=1):
+        service = FakeCalendarService()
+        store = MemoryMappingStore()
+        writer = GoogleCalendarWriter(service, service_factory=lambda: service)
+        config = {'sync': {
+            'streaming': streaming, 'stream_batch_size': 7,
+            'max_workers': max_workers, 'completed_action': 'delete'
+        }}
+        stats = [SyncEngine(FakeRemindersReader(run), writer, store, config).sync() for run in self.runs()]
+        mappings = {uuid: (r.event_id, r.checksum) for uuid, r in store.load_index().items()}
+        return mappings, service.stored, [
+            (s.total_reminders, s.created, s.updated, s.deleted, s.skipped, s.errors) for s in stats
+        ]
+
+    def test_streaming_matches_list_mode(self):
+        """Streamed and list-mode syncs leave the same mappings, events and stats."""
+        expected = self.sync_runs(streaming=False)
+        self.assertEqual(self.sync_runs(streaming=True), expected)
+        self.assertEqual(self.sync_runs(streaming=True, max_workers=4), expected)
+        self.assertEqual(expected[2][1], (45, 5, 4, 9, 32, 0))
+
+    def test_requests_start_after_first_batch(self):
+        """The first API request is made before the reader is exhausted."""
+        reminders = [make_reminder(f"r{i}") for i in range(50)]
+        yielded = []
+
+        class CountingReader(FakeRemindersReader):
+            def iter_reminders(self, calendar_names=None, timings=None):
+                for reminder in super().iter_reminders(calendar_names, timings):
+                    yielded.append(reminder.uuid)
+                    yield reminder
+
+        service = FakeCalendarService()
+        writer = GoogleCalendarWriter(service, service_factory=lambda: service)
+        create_event = writer.create_event
+        read_at_first_request = []
+
+        def tracking_create(**kwargs):
+            read_at_first_request.append(len(yielded))
+            return create_event(**kwargs)
+
+        writer.create_event = tracking_create
+        config = {'sync': {'streaming': True, 'stream_batch_size': 10}}
+        stats = SyncEngine(CountingReader(reminders), writer, MemoryMappingStore(), config).sync()
+
+        self.assertEqual(stats.created, 50)
+        self.assertEqual(read_at_first_request[0], 10)
+
+
+class TestCalendarRouting(unittest.TestCase):
+    """Test google_calendar.routes fan-out to several calendars."""
+
+    def setUp(self):
+        self.service = FakeCalendarService()
+        self.store = MemoryMappingStore()
+        self.config = {
+            'sync': {'completed_action': 'delete'},
+            'google_calendar': {'calendar_id': 'primary', 'routes': {'Work': 'work-cal', 'Home': 'primary'}},
+        }
+
+    def sync(self, reminders):
+        writer = GoogleCalendarWriter(self.service, 'primary')
+        return SyncEngine(FakeRemindersReader(reminders), writer, self.store, self.config).sync()
+
+    def test_lists_route_to_calendars(self):
+        """Test each list's reminders land in its routed calendar, unrouted ones in the default."""
+        stats = self.sync([
+            make_reminder('w', calendar_title='Work'),
+            make_reminder('h', calendar_title='Home'),
+            make_reminder('r', calendar_title='Reminders'),
+        ])
+
+        self.assertEqual(stats.created, 3)
+        self.assertEqual(set(self.service.stored), {('work-cal', 'evt-w'), ('primary', 'evt-h'), ('primary', 'evt-r')})
+        index = self.store.load_index()
+        self.assertEqual((index['w'].calendar_id, index['h'].calendar_id), ('work-cal', None))
+
+    def test_list_change_moves_event(self):
+        """Test a reminder moved to another list moves its event instead of recreating it."""
+        self.sync([make_reminder('a'), make_reminder('b')])
+        requests = self.service.requests
+
+        moved = make_reminder('a', calendar_title='Work', modification_date=datetime(2025, 1, 2))
+        edited = make_reminder('b', calendar_title='Work', title='Edited', modification_date=datetime(2025, 1, 2))
+        stats = self.sync([moved, edited])
+
+        self.assertEqual((stats.created, stats.updated, stats.deleted, stats.errors), (0, 2, 0, 0))
+        # One move for the unchanged reminder; move and update for the edited one
+        self.assertEqual(self.service.requests - requests, 3)
+        self.assertEqual(set(self.service.stored), {('work-cal', 'evt-a'), ('work-cal', 'evt-b')})
+        self.assertEqual(self.service.stored[('work-cal', 'evt-b')]['summary'], 'Edited')
+        self.assertEqual(self.store.get_mapping('a').calendar_id, 'work-cal')
+
+        # Removing the reminder deletes the event from the calendar it is in
+        stats = self.sync([moved])
+        self.assertEqual((stats.deleted, stats.errors), (1, 0))
+        self.assertEqual(set(self.service.stored), {('work-cal', 'evt-a')})
+
+    def test_failed_patch_after_move_records_calendar(self):
+        """Test an update failing after its move leaves the mapping on the new calendar."""
+        self.config['sync']['retry_backoff_base'] = 0
+        self.sync([make_reminder('a')])
+        patch = self.service._patch
+
+        def fail_once(calendar_id, event_id, body):
+            self.service._patch = patch
+            raise make_http_error(500, 'backendError')
+
+        self.service._patch = fail_once
+        edited = make_reminder('a', calendar_title='Work', title='Edited', modification_date=datetime(2025, 1, 2))
+        stats = self.sync([edited])
+
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(set(self.service.stored), {('work-cal', 'evt-a')})
+        self.assertEqual(self.store.get_mapping('a').calendar_id, 'work-cal')
+
+        # The retry patches the event where it is now
+        stats = self.sync([edited])
+        self.assertEqual((stats.updated, stats.errors), (1, 0))
+        self.assertEqual(self.service.stored[('work-cal', 'evt-a')]['summary'], 'Edited')
+        self.assertEqual(self.sync([edited]).errors, 0)
+
+    def test_move_of_event_already_moved(self):
+        """Test a move finding the event already in its destination counts as done."""
+        self.sync([make_reminder('a')])
+        self.service.stored[('work-cal', 'evt-a')] = self.service.stored.pop(('primary', 'evt-a'))
+
+        stats = self.sync([make_reminder('a', calendar_title='Work', modification_date=datetime(2025, 1, 2))])
+
+        self.assertEqual((stats.updated, stats.errors), (1, 0))
+        self.assertEqual(self.store.get_mapping('a').calendar_id, 'work-cal')
+
+
+class TestShardedSync(unittest.TestCase):
+    """Test sync.shard_by_list: each reminder list synced as its own shard."""
+
+    def setUp(self):
+        self.service = FakeCalendarService()
+        self.store = MemoryMappingStore()
+        self.config = {'sync': {'completed_action': 'delete', 'shard_by_list': True, 'shards': {}}}
+
+    def make_engine(self, reminders):
+        writer = GoogleCalendarWriter(self.service, 'primary')
+        return SyncEngine(FakeRemindersReader(reminders), writer, self.store, self.config)
+
+    def sync(self, reminders):
+        return self.make_engine(reminders).sync()
+
+    @staticmethod
+    def library():
+        return [make_reminder(f"g{i}", calendar_title='Groceries') for i in range(3)] + [
+            make_reminder(f"w{i}", calendar_title='Work') for i in range(2)
+        ]
+
+    def test_lists_sync_and_report_separately(self):
+        """Test every list is synced and gets its own history row."""
+        stats = self.sync(self.library())
+
+        self.assertEqual((stats.total_reminders, stats.created, stats.errors), (5, 5, 0))
+        history = self.store.get_recent_history(5)
+        self.assertEqual(sorted((row[6], row[2]) for row in history), [('Groceries', 3), ('Work', 2)])
+        self.assertEqual(self.store.get_mapping('g0').list_title, 'Groceries')
+        self.assertIsNotNone(self.store.get_meta('watermark:Work'))
+
+    def test_interval_holds_list_back_until_due(self):
+        """Test a list with an interval is only synced once it has passed."""
+        self.config['sync']['shards'] = {'Groceries': {'interval': 3600}}
+        self.sync(self.library())
+
+        reminders = self.library() + [
+            make_reminder('g-new', calendar_title='Groceries'),
+            make_reminder('w-new', calendar_title='Work'),
+        ]
+        stats = self.sync(reminders)
+        self.assertEqual((stats.total_reminders, stats.created), (3, 1))
+        self.assertIsNone(self.store.get_mapping('g-new'))
+
+        self.store.set_meta('shard_synced:Groceries', (datetime.now() - timedelta(hours=2)).isoformat())
+        stats = self.sync(reminders)
+        self.assertEqual((stats.total_reminders, stats.created), (7, 1))
+        self.assertIsNotNone(self.store.get_mapping('g-new'))
+
+    def test_removed_reminders_scoped_to_list(self):
+        """Test a list's shard deletes its removed reminders but not ones moved to another list."""
+        self.sync(self.library())
+
+        reminders = self.library()
+        reminders[0].calendar_title = 'Work'
+        del reminders[1]
+        stats = self.sync(reminders)
+
+        self.assertEqual((stats.created, stats.deleted, stats.errors), (0, 1, 0))
+        self.assertNotIn(('primary', 'evt-g1'), self.service.stored)
+        self.assertIn(('primary', 'evt-g0'), self.service.stored)
+        self.assertEqual(self.store.get_mapping('g0').list_title, 'Work')
+
+    def test_mappings_without_list_looked_up_once(self):
+        """Test mappings from before lists were recorded get their list in one reader lookup."""
+        self.config['sync']['completed_action'] = 'keep'
+        reminders = self.library()
+        self.sync(reminders)
+        reminders[2].completed = True
+        reminders[2].modification_date = datetime(2025, 1, 2)
+        for record in self.store.load_index().values():
+            self.store.save_mapping(
+                record.reminder_uuid, record.event_id, record.last_modified, record.checksum,
+                calendar_id=record.calendar_id, fingerprint=record.fingerprint
+            )
+        lookups = []
+
+        def sync():
+            engine = self.make_engine(reminders)
+            find_reminders = engine.reminders_reader.find_reminders
+            engine.reminders_reader.find_reminders = lambda uuids: lookups.append(len(uuids)) or find_reminders(uuids)
+            self.assertEqual(engine.sync().errors, 0)
+
+        sync()
+        sync()
+        self.assertEqual(lookups, [5])
+        self.assertEqual(
+            {uuid: record.list_title for uuid, record in self.store.load_index().items()},
+            {'g0': 'Groceries', 'g1': 'Groceries', 'g2': 'Groceries', 'w0': 'Work', 'w1': 'Work'}
+        )
+
+        # A kept completed reminder moved to another list is recorded there
+        reminders[2].calendar_title = 'Work'
+        sync()
+        sync()
+        self.assertEqual(lookups, [5, 1])
+        self.assertEqual(self.store.get_mapping('g2').list_title, 'Work')
+        self.assertIn(('primary', 'evt-g2'), self.service.stored)
+
+    def test_error_budget_defers_rest_of_list(self):
+        """Test a list that uses up its error budget stops without holding back the others."""
+        self.config['sync']['shards'] = {'Groceries': {'interval': 3600, 'max_errors': 1}}
+        engine = self.make_engine(self.library())
+        create_event = engine.gcal_writer.create_event
+
+        def failing_create(**kwargs):
+            if kwargs['reminder_uuid'].startswith('g'):
+                raise RuntimeError("boom")
+            return create_event(**kwargs)
+
+        engine.gcal_writer.create_event = failing_create
+        stats = engine.sync()
+
+        self.assertEqual((stats.created, stats.errors, stats.deferred), (2, 1, 2))
+        # Deferred work keeps the list due for the next run
+        self.assertIsNone(self.store.get_meta('shard_synced:Groceries'))
+        history = {row[6]: row for row in self.store.get_recent_history(5)}
+        self.assertEqual(history['Groceries'][5], 1)
+        self.assertEqual(history['Work'][5], 0)
+
+    def test_interrupted_list_resumes_its_own_checkpoint(self):
+        """Test an interrupted list runs first, resumes its checkpoint and skips what it synced."""
+        engine = self.make_engine(self.library())
+        create_event = engine.gcal_writer.create_event
+
+        def interrupted_create(**kwargs):
+            if kwargs['reminder_uuid'] == 'w1':
+                raise KeyboardInterrupt
+            return create_event(**kwargs)
+
+        engine.gcal_writer.create_event = interrupted_create
+        with self.assertRaises(KeyboardInterrupt):
+            engine.sync()
+        checkpoint, processed = self.store.load_checkpoint()
+        self.assertEqual((checkpoint.shard, checkpoint.created, processed), ('Work', 1, {'w0'}))
+
+        engine = self.make_engine(self.library())
+        planned = []
+        plan_reminder = engine._plan_reminder
+        engine._plan_reminder = lambda reminder, *args: planned.append(reminder.uuid) or plan_reminder(reminder, *args)
+        stats = engine.sync()
+
+        self.assertEqual(planned[0], 'w1')
+        self.assertNotIn('w0', planned)
+        # Work's total carries on from its checkpoint
+        self.assertEqual((stats.created, stats.errors), (2, 0))
+        self.assertIn(('primary', 'evt-w0'), self.service.stored)
+        self.assertIsNone(self.store.load_checkpoint())
+        # The resumed counts stay with the list they belong to
+        history = [(row[6], row[2]) for row in self.store.get_recent_history(3)]
+        self.assertEqual(sorted(history[:2]), [('Groceries', 0), ('Work', 2)])
+
+
+class TestFieldPatches(unittest.TestCase):
+    """Test updates patch only the event fields that changed."""
+
+    def setUp(self):
+        self.service = FakeCalendarService()
+        self.store = MemoryMappingStore()
+        self.config = {'sync': {'completed_action': 'keep'}}
+
+    def sync(self, reminders):
+        writer = GoogleCalendarWriter(self.service, 'primary')
+        return SyncEngine(FakeRemindersReader(reminders), writer, self.store, self.config).sync()
+
+    def test_only_changed_fields_are_sent(self):
+        """Test an edit is a single patch of the edited fields, with no get."""
+        notes = "Long notes " * 500
+        self.sync([make_reminder('a', notes=notes), make_reminder('b')])
+        requests = self.service.requests
+
+        edited = make_reminder('a', notes=notes, title="Renamed", modification_date=datetime(2025, 1, 2))
+        stats = self.sync([edited, make_reminder('b')])
+
+        self.assertEqual((stats.updated, stats.errors), (1, 0))
+        self.assertEqual(self.service.requests - requests, 1)
+        self.assertEqual(self.service.patched_bodies, [{'summary': "Renamed"}])
+        event = self.service.stored[('primary', 'evt-a')]
+        self.assertEqual((event['summary'], event['description']), ("Renamed", notes))
+
+        moved = make_reminder(
+            'a', notes=notes, title="Renamed", due_date=datetime(2025, 1, 22), modification_date=datetime(2025, 1, 3)
+        )
+        self.sync([moved, make_reminder('b')])
+        self.assertEqual(set(self.service.patched_bodies[-1]), {'start', 'end'})
+        self.assertEqual(self.service.stored[('primary', 'evt-a')]['start'], {'date': '2025-01-22'})
+
+    def test_change_the_event_does_not_show_makes_no_request(self):
+        """Test a reminder completed and reopened is stored without a request."""
+        self.sync([make_reminder('a')])
+        self.sync([make_reminder('a', completed=True, modification_date=datetime(2025, 1, 2))])
+        requests = self.service.requests
+
+        stats = self.sync([make_reminder('a', modification_date=datetime(2025, 1, 3))])
+
+        self.assertEqual((stats.updated, stats.skipped), (0, 1))
+        self.assertEqual(self.service.requests, requests)
+        self.assertEqual(self.store.get_mapping('a').last_modified, datetime(2025, 1, 3))
+
 
 if __name__ == '__main__':
     unittest.main()